@@ -13,14 +13,22 @@ Steps:
 import os
 import sys
 import argparse
+import io
 import json
-import tempfile
-from pdf_converter import convert_to_pdfa3b
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from facturxapp.services.ghostscript import GS_PRESETS
+from facturxapp.utils.save_profiles import DEFAULT_SAVE_PROFILE, SAVE_PROFILES
+from facturxapp.validators.invoice_preflight import preflight_invoice
+from facturxapp.validators.pdfa_checker import is_pdfa3b
+from pdf_converter import DEFAULT_PRESET, convert_bytes_to_pdfa3b
 from generate_facturx_xml import generate_facturx_xml
 from embed_xml import embed_xml_in_pdf
 from validate_facturx import validate_facturx_pdf
 
-def create_facturx_invoice(input_pdf, json_file, output_pdf, profile="EN16931", validate=True):
+def create_facturx_invoice(input_pdf, json_file, output_pdf, profile="EN16931", validate=True,
+                           preset=DEFAULT_PRESET, save_profile=DEFAULT_SAVE_PROFILE):
     """
     Create a Factur-X compliant invoice
     
@@ -30,40 +38,54 @@ def create_facturx_invoice(input_pdf, json_file, output_pdf, profile="EN16931",
         output_pdf (str): Path where the final PDF will be saved
         profile (str): Factur-X profile (MINIMUM, BASIC_WL, EN16931)
         validate (bool): Whether to validate the final PDF
+        preset (str): Image preset for the PDF/A-3B conversion (fast, archive, lossless)
+        save_profile (str): How the output PDF is written (default, small, fast, web)
         
     Returns:
         bool: True if successful, False otherwise
     """
-    # Create temporary directory for intermediate files
-    temp_dir = tempfile.mkdtemp()
-    pdfa_pdf = os.path.join(temp_dir, "pdfa.pdf")
-    xml_file = os.path.join(temp_dir, "factur-x.xml")
+    # Step 0: Load and pre-flight the invoice data before any expensive stage
+    try:
+        with open(json_file, 'r') as f:
+            invoice_data = json.load(f)
+    except Exception as e:
+        print(f"Error processing JSON file: {e}")
+        return False
     
+    issues = preflight_invoice(invoice_data, profile=profile, layout="flat")
+    if issues:
+        print("Invoice data failed pre-flight checks:")
+        for issue in issues:
+            print(f"  - {issue.field}: {issue.message}")
+        return False
+    
+    # Intermediate PDF and XML stay in memory; nothing is written until the output
     try:
         print("\n====== CREATING FACTUR-X INVOICE ======\n")
         
-        # Step 1: Convert to PDF/A-3B
+        # Step 1: Convert to PDF/A-3B (skipped when the input already is)
         print("\n--- Step 1: Converting PDF to PDF/A-3B ---")
-        if not convert_to_pdfa3b(input_pdf, pdfa_pdf):
-            print("Failed to convert PDF to PDF/A-3B")
-            return False
+        if is_pdfa3b(input_pdf):
+            print("Input is already PDF/A-3B, skipping conversion")
+            pdfa_pdf = input_pdf
+        else:
+            with open(input_pdf, 'rb') as f:
+                pdfa_pdf = convert_bytes_to_pdfa3b(f.read(), preset)
+            if pdfa_pdf is None:
+                print("Failed to convert PDF to PDF/A-3B")
+                return False
         
         # Step 2: Generate Factur-X XML
         print("\n--- Step 2: Generating Factur-X XML ---")
-        try:
-            with open(json_file, 'r') as f:
-                invoice_data = json.load(f)
-            
-            if not generate_facturx_xml(invoice_data, xml_file):
-                print("Failed to generate Factur-X XML")
-                return False
-        except Exception as e:
-            print(f"Error processing JSON file: {e}")
+        xml_buffer = io.BytesIO()
+        if not generate_facturx_xml(invoice_data, xml_buffer):
+            print("Failed to generate Factur-X XML")
             return False
         
         # Step 3: Embed XML into PDF/A-3B
         print("\n--- Step 3: Embedding XML into PDF/A-3B ---")
-        if not embed_xml_in_pdf(pdfa_pdf, xml_file, output_pdf, profile):
+        if not embed_xml_in_pdf(pdfa_pdf, xml_buffer.getvalue(), output_pdf, profile,
+                                save_profile=save_profile):
             print("Failed to embed XML into PDF")
             return False
         
@@ -88,13 +110,6 @@ def create_facturx_invoice(input_pdf, json_file, output_pdf, profile="EN16931",
     except Exception as e:
         print(f"Error creating Factur-X invoice: {e}")
         return False
-    finally:
-        # Clean up temporary files
-        try:
-            import shutil
-            shutil.rmtree(temp_dir)
-        except:
-            pass
 
 def main():
     parser = argparse.ArgumentParser(description="Create Factur-X compliant invoice in PDF/A-3B format")
@@ -104,6 +119,10 @@ def main():
     parser.add_argument("--profile", "-p", choices=["MINIMUM", "BASIC_WL", "EN16931"], 
                        default="EN16931", help="Factur-X profile (default: EN16931)")
     parser.add_argument("--no-validate", action="store_true", help="Skip validation step")
+    parser.add_argument("--preset", choices=sorted(GS_PRESETS), default=DEFAULT_PRESET,
+                       help=f"Image handling for the PDF/A-3B conversion (default: {DEFAULT_PRESET})")
+    parser.add_argument("--save-profile", choices=sorted(SAVE_PROFILES), default=DEFAULT_SAVE_PROFILE,
+                       help=f"How the output PDF is written (default: {DEFAULT_SAVE_PROFILE})")
     
     args = parser.parse_args()
     
@@ -122,7 +141,9 @@ def main():
         json_file, 
         output_pdf, 
         args.profile, 
-        not args.no_validate
+        not args.no_validate,
+        args.preset,
+        args.save_profile
     )
     
     return 0 if success else 1
@@ -6,97 +6,38 @@ This script embeds a Factur-X XML into a PDF/A-3B document and adds the required
 """
 
 import os
+import sys
 import argparse
-import pikepdf
-from pikepdf import Pdf, Dictionary, Name, Array
 
-def embed_xml_in_pdf(pdf_path, xml_path, output_path, profile="EN16931"):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from facturxapp.services.embedding import embed_facturx
+from facturxapp.utils.save_profiles import DEFAULT_SAVE_PROFILE, SAVE_PROFILES
+
+def embed_xml_in_pdf(pdf_path, xml_path, output_path, profile="EN16931", incremental=False,
+                     save_profile=None):
     """
     Embed Factur-X XML into a PDF/A-3B document and add required metadata
     
     Args:
-        pdf_path (str): Path to the PDF/A-3B file
-        xml_path (str): Path to the Factur-X XML file
+        pdf_path (str | bytes): Path to the PDF/A-3B file, or its bytes
+        xml_path (str | bytes): Path to the Factur-X XML file, or its bytes
         output_path (str): Path where the final PDF will be saved
         profile (str): Factur-X profile (MINIMUM, BASIC_WL, EN16931)
+        incremental (bool): Append to the original instead of rewriting it
+        save_profile (str): Save settings (default, small, fast, web)
     
     Returns:
         bool: True if successful, False otherwise
     """
-    print(f"Embedding XML {xml_path} into PDF {pdf_path}...")
+    if isinstance(pdf_path, bytes) or isinstance(xml_path, bytes):
+        print("Embedding in-memory XML into PDF...")
+    else:
+        print(f"Embedding XML {xml_path} into PDF {pdf_path}...")
     
     try:
-        # Open the PDF
-        pdf = Pdf.open(pdf_path)
-        
-        # Read the XML file
-        with open(xml_path, 'rb') as xml_file:
-            xml_content = xml_file.read()
-        
-        # Create file specification dictionary
-        filespec = Dictionary(
-            Type=Name.Filespec,
-            F=pikepdf.String("factur-x.xml"),
-            UF=pikepdf.String("factur-x.xml"),
-            Desc=pikepdf.String("Factur-X Invoice XML"),
-            AFRelationship=Name.Data,
-            EF=Dictionary(
-                F=pdf.make_stream(
-                    xml_content,
-                    Dictionary(
-                        Type=Name.EmbeddedFile,
-                        Subtype=pikepdf.String("application/xml"),
-                        ModDate=pdf.make_indirect(Dictionary())
-                    )
-                )
-            )
-        )
-        
-        # Add to EmbeddedFiles name tree
-        if "/Names" not in pdf.Root:
-            pdf.Root["/Names"] = Dictionary()
-            
-        if "/EmbeddedFiles" not in pdf.Root["/Names"]:
-            pdf.Root["/Names"]["/EmbeddedFiles"] = Dictionary()
-        
-        # Create or update the EmbeddedFiles name tree
-        ef_dict = pdf.Root["/Names"]["/EmbeddedFiles"]
-        
-        # Create Names array if it doesn't exist
-        if "/Names" not in ef_dict:
-            ef_dict["/Names"] = Array([])
-            
-        # Add the file spec to the names array
-        names = ef_dict["/Names"]
-        names.append(pikepdf.String("factur-x.xml"))
-        names.append(pdf.make_indirect(filespec))
-
-        # Add file attachment annotation
-        if "/AF" not in pdf.Root:
-            pdf.Root["/AF"] = Array([])
-        
-        pdf.Root["/AF"].append(pdf.make_indirect(filespec))
-        
-        # Add PDF/A and Factur-X metadata
-        with pdf.open_metadata() as meta:
-            # Add PDF/A-3B conformance metadata
-            meta["pdfaid:part"] = "3"
-            meta["pdfaid:conformance"] = "B"
-            
-            # Add Factur-X metadata
-            meta["fx:conformance"] = profile
-            meta["fx:documentfilename"] = "factur-x.xml"
-            meta["fx:documenttype"] = "INVOICE"
-            meta["fx:version"] = "1.0.0"
-            
-            # Other required XMP metadata
-            meta["dc:title"] = "Factur-X Invoice"
-            meta["dc:description"] = f"Invoice with embedded Factur-X {profile} XML"
-            meta["xmp:CreatorTool"] = "Python PikePDF Factur-X Generator"
-            meta["pdf:Producer"] = "Python PikePDF"
-        
-        # Save the PDF with embedded XML
-        pdf.save(output_path)
+        embed_facturx(pdf_path, xml_path, output_path, profile, incremental=incremental,
+                      save_profile=save_profile)
         print(f"Successfully embedded XML and saved to {output_path}")
         return True
         
@@ -111,6 +52,10 @@ def main():
     parser.add_argument("--output", "-o", help="Path to output PDF file (default: <original_filename>_facturx.pdf)")
     parser.add_argument("--profile", "-p", choices=["MINIMUM", "BASIC_WL", "EN16931"], 
                         default="EN16931", help="Factur-X profile (default: EN16931)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Append the attachment as an incremental update instead of rewriting the PDF")
+    parser.add_argument("--save-profile", choices=sorted(SAVE_PROFILES), default=DEFAULT_SAVE_PROFILE,
+                        help=f"How the output PDF is written (default: {DEFAULT_SAVE_PROFILE})")
     
     args = parser.parse_args()
     
@@ -124,7 +69,7 @@ def main():
         filename, ext = os.path.splitext(pdf_file)
         output_file = f"{filename}_facturx{ext}"
     
-    embed_xml_in_pdf(pdf_file, xml_file, output_file, args.profile)
+    embed_xml_in_pdf(pdf_file, xml_file, output_file, args.profile, args.incremental, args.save_profile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
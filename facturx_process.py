@@ -5,54 +5,106 @@ Factur-X Invoice Creator (5-step process)
 This script follows the 5-step process to create a Factur-X (EN16931) compliant invoice:
 1. Convert a regular PDF to PDF/A-3B using Ghostscript
 2. Generate Factur-X XML using Mustangproject CLI
-3. Embed the XML into the PDF using pikepdf with AFRelationship = Data
-4. Add the XMP metadata to declare the Factur-X profile
+3. Embed the XML into the PDF (AF array, EmbeddedFiles name tree)
+4. Add the XMP metadata to declare the Factur-X profile (same pass as step 3)
 5. Validate the final PDF
 """
 
+import io
 import os
 import sys
 import json
-import tempfile
 import subprocess
-import pikepdf
-from pikepdf import Pdf, Dictionary, Name, Array
+from pikepdf import Name
 
-def convert_to_pdfa3b(input_pdf, output_pdf):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from facturxapp.services.embedding import CONFORMANCE_LEVELS, embed_facturx
+from facturxapp.services.ghostscript import GS_PRESETS, GS_TIMEOUT, convert_pdf_bytes, preset_args
+from facturxapp.utils.pdf_io import open_pdf
+from facturxapp.utils.save_profiles import SAVE_PROFILES
+from facturxapp.utils.xmp import read_xmp_properties
+from facturxapp.validators.invoice_preflight import preflight_invoice
+from facturxapp.validators.pdfa_checker import is_pdfa3b
+
+# Ghostscript flags for PDF/A-3B conversion, without executable and files
+GS_PDFA3B_ARGS = [
+    "-dPDFA=3", "-dBATCH", "-dNOPAUSE", "-dNOOUTERSAVE",
+    "-sProcessColorModel=DeviceRGB", "-sDEVICE=pdfwrite",
+    "-dPDFACompatibilityPolicy=1",
+]
+
+def gs_args(preset=None):
+    """
+    Ghostscript flags for PDF/A-3B conversion with an optional image preset
+    
+    Args:
+        preset (str): "fast", "archive" or "lossless" (see GS_PRESETS);
+            None keeps Ghostscript's own image handling
+    """
+    if preset is None:
+        return list(GS_PDFA3B_ARGS)
+    return [*GS_PDFA3B_ARGS, *preset_args(preset)]
+
+def convert_to_pdfa3b(input_pdf, output_pdf, preset=None):
     """
     Convert a regular PDF to PDF/A-3B using Ghostscript
     
     Args:
         input_pdf (str): Path to the input PDF file
         output_pdf (str): Path where the PDF/A-3B compliant file will be saved
+        preset (str): Image preset, "fast", "archive" or "lossless"
     """
     print(f"Converting {input_pdf} to PDF/A-3B format...")
     
     # Ghostscript command for PDF/A-3B conversion
-    gs_command = [
-        "gs", "-dPDFA=3", "-dBATCH", "-dNOPAUSE", "-dNOOUTERSAVE",
-        "-sProcessColorModel=DeviceRGB", "-sDEVICE=pdfwrite",
-        "-dPDFACompatibilityPolicy=1", "-sOutputFile=" + output_pdf,
-        input_pdf
-    ]
+    gs_command = ["gs", *gs_args(preset), "-sOutputFile=" + output_pdf, input_pdf]
     
     try:
-        result = subprocess.run(gs_command, check=True, capture_output=True, text=True)
+        result = subprocess.run(gs_command, check=True, capture_output=True, text=True,
+                                timeout=GS_TIMEOUT)
         print(f"Successfully converted to PDF/A-3B: {output_pdf}")
         return True
+    except subprocess.TimeoutExpired:
+        print(f"Error converting to PDF/A-3B: Ghostscript did not finish within {GS_TIMEOUT:.0f}s")
+        return False
     except subprocess.CalledProcessError as e:
         print(f"Error converting to PDF/A-3B: {e}")
         print(f"Ghostscript output: {e.stdout}")
         print(f"Ghostscript error: {e.stderr}")
         return False
 
+def convert_bytes_to_pdfa3b(pdf_bytes, preset=None):
+    """
+    Convert an in-memory PDF to PDF/A-3B using Ghostscript, without temp files
+    
+    Args:
+        pdf_bytes (bytes): Input PDF
+        preset (str): Image preset, "fast", "archive" or "lossless"
+        
+    Returns:
+        bytes: The PDF/A-3B document, or None if the conversion failed
+    """
+    print("Converting PDF to PDF/A-3B format in memory...")
+    try:
+        pdfa_bytes = convert_pdf_bytes(pdf_bytes, base_args=gs_args(preset), timeout=GS_TIMEOUT)
+        print("Successfully converted to PDF/A-3B in memory")
+        return pdfa_bytes
+    except subprocess.TimeoutExpired:
+        print(f"Error converting to PDF/A-3B: Ghostscript did not finish within {GS_TIMEOUT:.0f}s")
+        return None
+    except subprocess.CalledProcessError as e:
+        print(f"Error converting to PDF/A-3B: {e}")
+        print(f"Ghostscript error: {e.stderr.decode('utf-8', 'replace')}")
+        return None
+
 def generate_facturx_xml(json_file, xml_file):
     """
     Generate Factur-X XML using our Python script
     
     Args:
         json_file (str): Path to the JSON file with invoice data
-        xml_file (str): Path where the XML file will be saved
+        xml_file (str): Path where the XML file will be saved, or a text file object
     """
     print(f"Generating Factur-X XML from invoice data...")
     
@@ -206,96 +258,40 @@ def generate_facturx_xml(json_file, xml_file):
     </rsm:SupplyChainTradeTransaction>
 </rsm:CrossIndustryInvoice>'''
         
-        # Write to file
-        with open(xml_file, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
-        
-        print(f"Successfully generated Factur-X XML: {xml_file}")
+        # Write to file, or to the given file object
+        if isinstance(xml_file, str):
+            with open(xml_file, 'w', encoding='utf-8') as f:
+                f.write(xml_content)
+            print(f"Successfully generated Factur-X XML: {xml_file}")
+        else:
+            xml_file.write(xml_content)
+            print("Successfully generated Factur-X XML in memory")
         return True
     except Exception as e:
         print(f"Error generating Factur-X XML: {e}")
         return False
 
-def embed_xml_in_pdf(pdf_file, xml_file, output_file, profile="EN16931"):
+def embed_xml_in_pdf(pdf_file, xml_file, output_file, profile="EN16931", incremental=False,
+                     save_profile=None):
     """
     Embed Factur-X XML into PDF/A-3B and add required metadata
     
     Args:
-        pdf_file (str): Path to the PDF/A-3B file
-        xml_file (str): Path to the Factur-X XML file
+        pdf_file (str | bytes): Path to the PDF/A-3B file, or its bytes
+        xml_file (str | bytes): Path to the Factur-X XML file, or its bytes
         output_file (str): Path where the final PDF will be saved
         profile (str): Factur-X profile (EN16931, etc.)
+        incremental (bool): Append to the original instead of rewriting it
+        save_profile (str): Save settings (default, small, fast, web)
     """
-    print(f"Embedding XML {xml_file} into PDF {pdf_file}...")
+    if isinstance(pdf_file, bytes) or isinstance(xml_file, bytes):
+        print("Embedding in-memory XML into PDF...")
+    else:
+        print(f"Embedding XML {xml_file} into PDF {pdf_file}...")
     
     try:
-        # Open the PDF
-        pdf = Pdf.open(pdf_file)
-        
-        # Read the XML file
-        with open(xml_file, 'rb') as f:
-            xml_content = f.read()
-        
-        # Create embedded file
-        xml_stream = pdf.make_stream(xml_content)
-        xml_stream_dict = pikepdf.Dictionary()
-        xml_stream_dict[Name.Type] = Name.EmbeddedFile
-        xml_stream_dict[Name.Subtype] = pikepdf.String("application/xml")
-        
-        # Create filespec
-        filespec = pikepdf.Dictionary()
-        filespec[Name.Type] = Name.Filespec
-        filespec[Name.F] = pikepdf.String("factur-x.xml")
-        filespec[Name.UF] = pikepdf.String("factur-x.xml")
-        filespec[Name.AFRelationship] = Name.Data
-        filespec[Name.Desc] = pikepdf.String("Factur-X Invoice Data")
-        
-        # Add file to filespec
-        ef_dict = pikepdf.Dictionary()
-        ef_dict[Name.F] = xml_stream
-        filespec[Name.EF] = ef_dict
-        
-        # Add to root AF array
-        if Name.AF not in pdf.Root:
-            pdf.Root[Name.AF] = pikepdf.Array()
-        
-        # Make the filespec indirect before adding it to avoid reference issues
-        pdf.Root[Name.AF].append(pdf.make_indirect(filespec))
-        
-        # Add to Names tree
-        if Name.Names not in pdf.Root:
-            pdf.Root[Name.Names] = pikepdf.Dictionary()
-        
-        if Name.EmbeddedFiles not in pdf.Root[Name.Names]:
-            pdf.Root[Name.Names][Name.EmbeddedFiles] = pikepdf.Dictionary()
-        
-        efDict = pdf.Root[Name.Names][Name.EmbeddedFiles]
-        
-        if Name.Names not in efDict:
-            efDict[Name.Names] = pikepdf.Array()
-        
-        # Add to names array
-        efDict[Name.Names].append(pikepdf.String("factur-x.xml"))
-        efDict[Name.Names].append(pdf.make_indirect(filespec))
-        
-        # Add XMP metadata
-        with pdf.open_metadata() as meta:
-            # Factur-X metadata
-            meta["fx:conformance"] = profile
-            meta["fx:documentfilename"] = "factur-x.xml"
-            meta["fx:documenttype"] = "INVOICE"
-            meta["fx:version"] = "1.0.0"
-            
-            # PDF/A-3B conformance metadata
-            meta["pdfaid:part"] = "3"
-            meta["pdfaid:conformance"] = "B"
-            
-            # Other required metadata
-            meta["dc:title"] = "Factur-X Invoice"
-            meta["dc:description"] = "Invoice with embedded Factur-X XML"
-        
-        # Save to output file
-        pdf.save(output_file)
+        embed_facturx(pdf_file, xml_file, output_file, profile, incremental=incremental,
+                      save_profile=save_profile)
         print(f"Successfully embedded XML and saved to {output_file}")
         return True
         
@@ -306,23 +302,16 @@ def embed_xml_in_pdf(pdf_file, xml_file, output_file, profile="EN16931"):
 def validate_facturx_pdf(pdf_path):
     """Simple validation to check if embedded XML exists"""
     try:
-        with pikepdf.open(pdf_path) as pdf:
-            # Check metadata
-            with pdf.open_metadata() as meta:
-                meta_dict = {k: v for k, v in meta.items()}
-                
-                # Check PDF/A compliance (check both with and without namespaces)
-                pdfa_id_ns = "{http://www.aiim.org/pdfa/ns/id/}"
-                has_pdfa = (("pdfaid:part" in meta_dict and meta_dict["pdfaid:part"] == "3" and
-                           "pdfaid:conformance" in meta_dict and meta_dict["pdfaid:conformance"] == "B") or
-                          (f"{pdfa_id_ns}part" in meta_dict and meta_dict[f"{pdfa_id_ns}part"] == "3" and
-                           f"{pdfa_id_ns}conformance" in meta_dict and meta_dict[f"{pdfa_id_ns}conformance"] == "B"))
-                
-                # Check Factur-X metadata (using simple names without 'fx:' prefix)
-                has_facturx = False
-                if (("fx:conformance" in meta_dict and "fx:documentfilename" in meta_dict and "fx:documenttype" in meta_dict) or
-                   ("conformance" in meta_dict and "documentfilename" in meta_dict and "documenttype" in meta_dict)):
-                    has_facturx = True
+        with open_pdf(pdf_path) as pdf:
+            # Check metadata; keys carry the standard prefix whatever the packet binds
+            meta_dict = read_xmp_properties(pdf)
+            
+            # Check PDF/A compliance
+            has_pdfa = meta_dict.get("pdfaid:part") == "3" and meta_dict.get("pdfaid:conformance") == "B"
+            
+            # Check Factur-X metadata
+            has_facturx = all(key in meta_dict for key in
+                              ("fx:ConformanceLevel", "fx:DocumentFileName", "fx:DocumentType"))
                 
             # Simplified check for embedded files
             has_xml = False
@@ -351,8 +340,7 @@ def validate_facturx_pdf(pdf_path):
             
             if has_facturx:
                 # Try to find the profile with or without prefix
-                fx_profile = meta_dict.get("fx:conformance", 
-                                          meta_dict.get("conformance", "Unknown"))
+                fx_profile = meta_dict.get("fx:ConformanceLevel", "Unknown")
                 status.append(f"✅ Factur-X metadata: PASS (Profile: {fx_profile})")
             else:
                 status.append("❌ Factur-X metadata: FAIL")
@@ -371,7 +359,8 @@ def validate_facturx_pdf(pdf_path):
         print(f"Error validating PDF: {e}")
         return False
 
-def create_facturx_invoice(input_pdf, json_file, output_pdf, profile="EN16931"):
+def create_facturx_invoice(input_pdf, json_file, output_pdf, profile="EN16931", preset=None,
+                           save_profile=None):
     """
     Create a Factur-X compliant invoice following the 5-step process
     
@@ -380,30 +369,51 @@ def create_facturx_invoice(input_pdf, json_file, output_pdf, profile="EN16931"):
         json_file (str): Path to JSON file with invoice data
         output_pdf (str): Path where the final PDF will be saved
         profile (str): Factur-X profile (default: EN16931)
+        preset (str): Image preset for the PDF/A-3B conversion (default: Ghostscript's own)
+        save_profile (str): How the output PDF is written (default: pikepdf's defaults)
     """
-    # Create temporary directory for intermediate files
-    temp_dir = tempfile.mkdtemp()
-    pdfa_pdf = os.path.join(temp_dir, "pdfa3b.pdf")
-    xml_file = os.path.join(temp_dir, "factur-x.xml")
+    # Pre-flight the invoice data before spending time in Ghostscript
+    try:
+        with open(json_file, 'r') as f:
+            invoice_data = json.load(f)
+    except Exception as e:
+        print(f"❌ Error reading invoice data: {e}")
+        return False
+    
+    issues = preflight_invoice(invoice_data, profile=profile, layout="mustang")
+    if issues:
+        print("❌ Invoice data failed pre-flight checks:")
+        for issue in issues:
+            print(f"  - {issue.field}: {issue.message}")
+        return False
     
+    # Intermediate PDF and XML stay in memory; nothing is written until the output
     try:
         print("\n====== CREATING FACTUR-X INVOICE ======\n")
         
-        # Step 1: Convert to PDF/A-3B
+        # Step 1: Convert to PDF/A-3B (skipped when the input already is)
         print("\n=== Step 1: Converting PDF to PDF/A-3B ===")
-        if not convert_to_pdfa3b(input_pdf, pdfa_pdf):
-            print("❌ Failed to convert PDF to PDF/A-3B")
-            return False
+        if is_pdfa3b(input_pdf):
+            print("Input is already PDF/A-3B, skipping conversion")
+            pdfa_pdf = input_pdf
+        else:
+            with open(input_pdf, 'rb') as f:
+                pdfa_pdf = convert_bytes_to_pdfa3b(f.read(), preset)
+            if pdfa_pdf is None:
+                print("❌ Failed to convert PDF to PDF/A-3B")
+                return False
         
         # Step 2: Generate Factur-X XML
         print("\n=== Step 2: Generating Factur-X XML using Mustangproject ===")
-        if not generate_facturx_xml(json_file, xml_file):
+        xml_buffer = io.StringIO()
+        if not generate_facturx_xml(json_file, xml_buffer):
             print("❌ Failed to generate Factur-X XML")
             return False
         
         # Step 3 & 4: Embed XML and add metadata
         print("\n=== Step 3 & 4: Embedding XML and adding Factur-X metadata ===")
-        if not embed_xml_in_pdf(pdfa_pdf, xml_file, output_pdf, profile):
+        if not embed_xml_in_pdf(pdfa_pdf, xml_buffer.getvalue().encode('utf-8'), output_pdf, profile,
+                                save_profile=save_profile):
             print("❌ Failed to embed XML into PDF")
             return False
         
@@ -420,14 +430,12 @@ def create_facturx_invoice(input_pdf, json_file, output_pdf, profile="EN16931"):
     except Exception as e:
         print(f"\n❌ Error creating Factur-X invoice: {e}")
         return False
-    finally:
-        # Clean up temporary files
-        import shutil
-        shutil.rmtree(temp_dir)
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
-        print("Usage: python facturx_process.py <input_pdf> <json_file> [output_pdf] [profile]")
+        print("Usage: python facturx_process.py <input_pdf> <json_file> [output_pdf] [profile] [preset] [save_profile]")
+        print(f"Presets: {', '.join(sorted(GS_PRESETS))}")
+        print(f"Save profiles: {', '.join(sorted(SAVE_PROFILES))}")
         sys.exit(1)
     
     input_pdf = sys.argv[1]
@@ -435,6 +443,17 @@ if __name__ == "__main__":
     
     output_pdf = sys.argv[3] if len(sys.argv) > 3 else "facturx_invoice.pdf"
     profile = sys.argv[4] if len(sys.argv) > 4 else "EN16931"
+    if profile not in CONFORMANCE_LEVELS:
+        print(f"Unknown profile: {profile} (choose from {', '.join(CONFORMANCE_LEVELS)})")
+        sys.exit(1)
+    preset = sys.argv[5] if len(sys.argv) > 5 else None
+    if preset is not None and preset not in GS_PRESETS:
+        print(f"Unknown preset: {preset} (choose from {', '.join(sorted(GS_PRESETS))})")
+        sys.exit(1)
+    save_profile = sys.argv[6] if len(sys.argv) > 6 else None
+    if save_profile is not None and save_profile not in SAVE_PROFILES:
+        print(f"Unknown save profile: {save_profile} (choose from {', '.join(sorted(SAVE_PROFILES))})")
+        sys.exit(1)
     
-    success = create_facturx_invoice(input_pdf, json_file, output_pdf, profile)
+    success = create_facturx_invoice(input_pdf, json_file, output_pdf, profile, preset, save_profile)
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -32,7 +32,7 @@ def generate_facturx_xml(invoice_data, output_file):
     
     Args:
         invoice_data (dict): Invoice data in dictionary format
-        output_file (str): Path where the XML file will be saved
+        output_file (str): Path where the XML file will be saved, or a binary file object
     """
     print(f"Generating Factur-X XML from invoice data...")
     
@@ -243,7 +243,10 @@ def generate_facturx_xml(invoice_data, output_file):
     tree = etree.ElementTree(root)
     tree.write(output_file, pretty_print=True, xml_declaration=True, encoding='UTF-8')
     
-    print(f"Successfully generated Factur-X XML: {output_file}")
+    if isinstance(output_file, str):
+        print(f"Successfully generated Factur-X XML: {output_file}")
+    else:
+        print("Successfully generated Factur-X XML in memory")
     return True
 
 def main():
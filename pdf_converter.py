@@ -6,35 +6,57 @@ This script converts a standard PDF to PDF/A-3B format using Ghostscript.
 """
 
 import os
+import sys
 import subprocess
 import argparse
 from ghostscript import Ghostscript
 
-def convert_to_pdfa3b(input_pdf, output_pdf):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from facturxapp.services.ghostscript import GS_PRESETS, convert_pdf_bytes, preset_args
+
+# Ghostscript flags used for the conversion, without executable, files and
+# the image handling flags of the preset
+CONVERTER_ARGS = [
+    "-dPDFA=3",                    # PDF/A-3 mode
+    "-dBATCH",                     # Exit after processing
+    "-dNOPAUSE",                   # No interactive prompts
+    "-dNOOUTERSAVE",              # No output file saving
+    "-dPDFACompatibilityPolicy=1", # Make PDF/A compatible
+    "-sColorConversionStrategy=RGB",  # Convert colors to RGB
+    "-sDEVICE=pdfwrite",           # Output device is PDF writer
+]
+
+# Image preset used when none is given: downsample and recompress as JPEG
+DEFAULT_PRESET = "archive"
+
+def converter_args(preset=DEFAULT_PRESET):
+    """
+    Ghostscript flags for a conversion with the given image preset
+    
+    Args:
+        preset (str): "fast", "archive" or "lossless" (see GS_PRESETS)
+        
+    Returns:
+        list: Flags without executable and files
+    """
+    return [*CONVERTER_ARGS, *preset_args(preset)]
+
+def convert_to_pdfa3b(input_pdf, output_pdf, preset=DEFAULT_PRESET):
     """
     Convert a regular PDF to PDF/A-3B using Ghostscript
     
     Args:
         input_pdf (str): Path to the input PDF file
         output_pdf (str): Path where the PDF/A-3B compliant file will be saved
+        preset (str): Image preset, "fast", "archive" or "lossless"
     """
-    print(f"Converting {input_pdf} to PDF/A-3B format...")
+    print(f"Converting {input_pdf} to PDF/A-3B format ({preset} preset)...")
     
     # Using Python's ghostscript module
     args = [
         "gs",                          # Ghostscript command
-        "-dPDFA=3",                    # PDF/A-3 mode
-        "-dBATCH",                     # Exit after processing
-        "-dNOPAUSE",                   # No interactive prompts
-        "-dNOOUTERSAVE",              # No output file saving
-        "-dPDFACompatibilityPolicy=1", # Make PDF/A compatible
-        "-sColorConversionStrategy=RGB",  # Convert colors to RGB
-        "-sDEVICE=pdfwrite",           # Output device is PDF writer
-        "-dPDFSETTINGS=/printer",      # Optimize for printing
-        "-dAutoFilterColorImages=true",
-        "-dAutoFilterGrayImages=true",
-        "-dColorImageFilter=/DCTEncode",
-        "-dGrayImageFilter=/DCTEncode",
+        *converter_args(preset),
         f"-sOutputFile={output_pdf}",  # Output file
         input_pdf                      # Input file
     ]
@@ -54,21 +76,46 @@ def convert_to_pdfa3b(input_pdf, output_pdf):
         
         # If the ghostscript module fails, try using the command line directly
         try:
-            subprocess.run(["gs", "-dPDFA=3", "-dBATCH", "-dNOPAUSE", 
-                           "-dNOOUTERSAVE", "-dPDFACompatibilityPolicy=1",
-                           "-sColorConversionStrategy=RGB", "-sDEVICE=pdfwrite",
-                           "-dPDFSETTINGS=/printer", f"-sOutputFile={output_pdf}",
-                           input_pdf], check=True)
+            subprocess.run(args, check=True)
             print(f"Successfully converted to PDF/A-3B using subprocess: {output_pdf}")
             return True
         except Exception as sub_e:
             print(f"Error with subprocess conversion: {sub_e}")
             return False
 
+def convert_bytes_to_pdfa3b(pdf_bytes, preset=DEFAULT_PRESET):
+    """
+    Convert an in-memory PDF to PDF/A-3B without writing any file
+    
+    Ghostscript reads the input from a memfd (or stdin) and writes the
+    result to stdout.
+    
+    Args:
+        pdf_bytes (bytes): Input PDF
+        preset (str): Image preset, "fast", "archive" or "lossless"
+        
+    Returns:
+        bytes: The PDF/A-3B document, or None if the conversion failed
+    """
+    print("Converting PDF to PDF/A-3B format in memory...")
+    try:
+        pdfa_bytes = convert_pdf_bytes(pdf_bytes, base_args=converter_args(preset))
+        print("Successfully converted to PDF/A-3B in memory")
+        return pdfa_bytes
+    except subprocess.TimeoutExpired as e:
+        print(f"Error converting to PDF/A-3B: Ghostscript did not finish within {e.timeout:.0f}s")
+        return None
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Error converting to PDF/A-3B: {e}")
+        return None
+
 def main():
     parser = argparse.ArgumentParser(description="Convert PDF to PDF/A-3B format")
     parser.add_argument("input_pdf", help="Path to input PDF file")
     parser.add_argument("--output", "-o", help="Path to output PDF/A-3B file (default: input_pdf_PDFA3B.pdf)")
+    parser.add_argument("--preset", choices=sorted(GS_PRESETS), default=DEFAULT_PRESET,
+                        help=f"Image handling: fast (no recompression), archive (downsample and "
+                             f"recompress) or lossless (default: {DEFAULT_PRESET})")
     
     args = parser.parse_args()
     
@@ -80,7 +127,7 @@ def main():
         filename, ext = os.path.splitext(input_pdf)
         output_pdf = f"{filename}_PDFA3B{ext}"
     
-    convert_to_pdfa3b(input_pdf, output_pdf)
+    convert_to_pdfa3b(input_pdf, output_pdf, args.preset)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Factur-X XML Replacer
+
+This script swaps the embedded factur-x.xml of finished Factur-X invoices for a corrected XML,
+without converting or rewriting the PDF. It works on one PDF or on a directory of PDFs.
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from facturxapp.services.embedding import CONFORMANCE_LEVELS, replace_facturx_xml
+from facturxapp.services.xml_replacement import pair_by_stem, replace_many
+
+def replace_xml_in_pdf(pdf_path, xml_path, output_path=None, profile=None):
+    """
+    Replace the embedded Factur-X XML of a PDF
+
+    Args:
+        pdf_path (str): Path to the Factur-X PDF
+        xml_path (str): Path to the corrected Factur-X XML file
+        output_path (str): Path where the corrected PDF will be saved (default: update in place)
+        profile (str): Factur-X profile (default: the one the PDF declares)
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    print(f"Replacing XML in {pdf_path} with {xml_path}...")
+    try:
+        replace_facturx_xml(pdf_path, xml_path, output_path, profile)
+        print(f"Successfully replaced XML and saved to {output_path or pdf_path}")
+        return True
+    except Exception as e:
+        print(f"Error replacing XML: {e}")
+        return False
+
+def replace_xml_in_directory(pdf_dir, xml_dir, output_dir=None, profile=None, workers=None):
+    """
+    Replace the embedded XML of every PDF in pdf_dir that has a same-named XML in xml_dir
+
+    Returns:
+        bool: True if every replacement succeeded, False otherwise
+    """
+    pairs = pair_by_stem(pdf_dir, xml_dir)
+    print(f"Found {len(pairs)} PDFs with a corrected XML")
+    failed = 0
+    for result in replace_many(pairs, output_dir, profile, workers):
+        if result.success:
+            print(f"✅ {result.pdf.name}")
+        else:
+            failed += 1
+            print(f"❌ {result.pdf.name}: {result.error}")
+    print(f"Replaced {len(pairs) - failed} of {len(pairs)}")
+    return failed == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Replace the embedded Factur-X XML without rewriting the PDF")
+    parser.add_argument("pdf", help="Factur-X PDF, or a directory of them")
+    parser.add_argument("xml", help="Corrected XML, or a directory of XML files named like the PDFs")
+    parser.add_argument("--output", "-o", help="Output PDF, or output directory (default: update in place)")
+    parser.add_argument("--profile", "-p", choices=sorted(CONFORMANCE_LEVELS),
+                        help="Factur-X profile (default: the one the PDF declares)")
+    parser.add_argument("--workers", type=int, help="Concurrent replacements for directories (default: CPU count)")
+
+    args = parser.parse_args()
+
+    if os.path.isdir(args.pdf):
+        success = replace_xml_in_directory(args.pdf, args.xml, args.output, args.profile, args.workers)
+    else:
+        success = replace_xml_in_pdf(args.pdf, args.xml, args.output, args.profile)
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Benchmarks for the Factur-X pipeline. Run them as `python -m facturxapp.benchmarks.<name>` from src/."""
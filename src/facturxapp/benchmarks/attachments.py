@@ -0,0 +1,83 @@
+"""
+Peak memory of attaching a large supplementary file.
+
+A file of random bytes is attached to the sample Factur-X PDF, once with
+attach_files (streamed from disk as an incremental update) and once the
+in-memory way: read the file, add it with pikepdf and save the whole PDF.
+Each mode runs in a fresh process, so the peak RSS values are not shared.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.attachments --size-mb 500
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import pikepdf
+
+from facturxapp.services.attachments import Attachment, attach_files
+
+# Repository root, where the sample files live
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+_SAMPLE = _REPO_ROOT / "attached_assets" / "zugferd1_invoice_pdfa3b.pdf"
+
+
+def _streamed(pdf_path: Path, attachment: Path, output: Path) -> None:
+    attach_files(pdf_path, [Attachment(attachment)], output)
+
+
+def _in_memory(pdf_path: Path, attachment: Path, output: Path) -> None:
+    with pikepdf.open(pdf_path) as pdf:
+        spec = pikepdf.AttachedFileSpec(pdf, attachment.read_bytes(), filename=attachment.name)
+        spec.obj[pikepdf.Name.AFRelationship] = pikepdf.Name.Supplement
+        pdf.attachments[attachment.name] = spec
+        pdf.save(output)
+
+
+MODES = {"streamed": _streamed, "in-memory": _in_memory}
+
+
+def _run(mode: str, pdf_path: str, attachment: str, output: str) -> Dict[str, float]:
+    """Attach in a fresh worker process and report time and peak RSS."""
+    start = time.perf_counter()
+    MODES[mode](Path(pdf_path), Path(attachment), Path(output))
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    return {"seconds": seconds, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak memory when attaching a large file")
+    parser.add_argument("--size-mb", type=int, default=200, help="Size of the attachment (default: 200)")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES),
+                        help="Modes to compare (default: all)")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        attachment = Path(temp_dir) / "timesheet.bin"
+        with open(attachment, 'wb') as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1 << 20))
+        print(f"Attachment: {args.size_mb} MB, PDF: {_SAMPLE.name}")
+        print(f"{'mode':<10} {'time':>9} {'peak RSS':>10} {'output':>10}")
+        for mode in args.modes:
+            pdf_path = Path(temp_dir) / f"{mode}.pdf"
+            output = Path(temp_dir) / f"{mode}_out.pdf"
+            shutil.copyfile(_SAMPLE, pdf_path)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(_run, mode, str(pdf_path), str(attachment), str(output)).result()
+            print(f"{mode:<10} {result['seconds'] * 1000:7.0f}ms {result['peak_rss_mb']:8.1f}MB "
+                  f"{output.stat().st_size / (1 << 20):8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
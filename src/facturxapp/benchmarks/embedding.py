@@ -0,0 +1,118 @@
+"""
+Latency, output size and completeness of the embedding engine.
+
+Each implementation (a full rewrite and an incremental update) embeds
+the same XML into every input PDF. The report shows the mean latency and
+output size per implementation, and which of the required structures each output carries: the
+AF array entry, the EmbeddedFiles name tree entry, the EmbeddedFile
+Params (Size, ModDate, CheckSum), the standard fx: XMP properties, and
+whether the output still passes the structural PDF/A-3B checks.
+
+To compare with an older implementation, run the same command in a
+checkout of that revision.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.embedding --runs 20
+    python -m facturxapp.benchmarks.embedding ../sample_pdfa3b.pdf --xml ../factur-x.xml
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+from facturxapp.services.embedding import FACTURX_FILENAME, embed_facturx
+from facturxapp.utils import name_tree
+from facturxapp.utils.xmp import FACTURX_NS
+from facturxapp.validators.pdfa_checker import is_pdfa3b
+
+# Repository root, where the sample files live
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _engine(pdf_path, xml_path, output_path, profile="EN16931"):
+    embed_facturx(pdf_path, xml_path, output_path, profile)
+    return True
+
+
+def _engine_incremental(pdf_path, xml_path, output_path, profile="EN16931"):
+    embed_facturx(pdf_path, xml_path, output_path, profile, incremental=True)
+    return True
+
+
+IMPLEMENTATIONS: Dict[str, Callable] = {
+    "engine": _engine,
+    "engine-incremental": _engine_incremental,
+}
+
+
+def _inspect(output_pdf: Path) -> Dict[str, bool]:
+    """Which required Factur-X structures the output carries."""
+    with Pdf.open(output_pdf) as pdf:
+        af = [spec for spec in pdf.Root.get(Name.AF, ())
+              if str(spec.get(Name.UF, spec.get(Name.F, ""))).lstrip("/") == FACTURX_FILENAME]
+        names = pdf.Root.get(Name.Names, pikepdf.Dictionary()).get(Name.EmbeddedFiles, pikepdf.Dictionary())
+        tree = [key for key, _ in name_tree.iter_entries(names)]
+        params = af[0].EF.F.get(Name.Params, pikepdf.Dictionary()) if af else pikepdf.Dictionary()
+        metadata = pdf.Root.get(Name.Metadata)
+        xmp = metadata.read_bytes() if metadata is not None else b""
+        return {
+            "af": bool(af),
+            "tree": FACTURX_FILENAME in tree,
+            "params": all(key in params for key in (Name.Size, Name.ModDate, Name.CheckSum)),
+            "xmp": FACTURX_NS.encode() in xmp and b"ConformanceLevel" in xmp,
+            "pdfa": is_pdfa3b(pdf),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the Factur-X embedding engine")
+    parser.add_argument("corpus", nargs="*", help="Input PDFs (default: the repo's PDF/A samples)")
+    parser.add_argument("--xml", default=str(_REPO_ROOT / "factur-x.xml"), help="Factur-X XML to embed")
+    parser.add_argument("--runs", type=int, default=10, help="Embeddings per PDF and implementation (default: 10)")
+    parser.add_argument("--implementations", nargs="+", choices=sorted(IMPLEMENTATIONS),
+                        default=list(IMPLEMENTATIONS), help="Implementations to compare (default: all)")
+    args = parser.parse_args()
+
+    corpus = [Path(path).resolve() for path in args.corpus] or [
+        _REPO_ROOT / "sample_pdfa3b.pdf", _REPO_ROOT / "attached_assets" / "zugferd1_invoice_pdfa3b.pdf"]
+    print(f"Corpus: {len(corpus)} PDFs, {args.runs} runs per implementation")
+    print(f"{'implementation':<18} {'mean':>9} {'output':>10}  {'AF':>3} {'tree':>4} {'params':>6} {'XMP':>3} {'PDF/A':>5}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in args.implementations:
+            embed = IMPLEMENTATIONS[name]
+            latencies: List[float] = []
+            checks: Dict[str, bool] = {}
+            output_bytes = 0
+            failed = False
+            for index, input_pdf in enumerate(corpus):
+                output_pdf = Path(temp_dir) / f"{name}_{index}.pdf"
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    try:
+                        success = embed(str(input_pdf), args.xml, str(output_pdf), "EN16931")
+                    except Exception:
+                        success = False
+                    latencies.append(time.perf_counter() - start)
+                    failed = failed or not success
+                if failed:
+                    break
+                output_bytes += output_pdf.stat().st_size
+                for key, ok in _inspect(output_pdf).items():
+                    checks[key] = checks.get(key, True) and ok
+            if failed:
+                print(f"{name:<18} failed")
+                continue
+            marks = [("yes" if checks[key] else "no") for key in ("af", "tree", "params", "xmp", "pdfa")]
+            print(f"{name:<18} {statistics.mean(latencies) * 1000:7.2f}ms {output_bytes:10d}  "
+                  f"{marks[0]:>3} {marks[1]:>4} {marks[2]:>6} {marks[3]:>3} {marks[4]:>5}")
+
+
+if __name__ == "__main__":
+    main()
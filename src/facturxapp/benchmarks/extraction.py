@@ -0,0 +1,101 @@
+"""
+Archive scanning throughput: full open vs. the lazy extractor.
+
+A temporary archive is built from Factur-X invoices made from the repo's
+samples: a one-page invoice and one padded to --pages pages. "full-open"
+is what validate_facturx.extract_xml used to do: open the document with
+pikepdf's defaults (which walks the page tree), look the XML up in the
+Names array and write it to a temp file. "lazy" is extract_facturx, one
+PDF after the other, and "lazy-pool" is extract_many over all CPUs.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.extraction --copies 2000 --pages 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from pikepdf import Name, Pdf
+
+from facturxapp.services.embedding import FACTURX_FILENAME, embed_facturx
+from facturxapp.services.extraction import extract_facturx, extract_many
+
+# Repository root, where the sample files live
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _full_open(paths: List[Path]) -> int:
+    found = 0
+    for path in paths:
+        with Pdf.open(path) as pdf:
+            names = pdf.Root.Names.EmbeddedFiles.Names
+            for index in range(0, len(names), 2):
+                if str(names[index]) == FACTURX_FILENAME:
+                    with tempfile.NamedTemporaryFile(suffix=".xml") as f:
+                        f.write(names[index + 1].EF.F.read_bytes())
+                    found += 1
+                    break
+    return found
+
+
+def _lazy(paths: List[Path]) -> int:
+    return sum(extract_facturx(path) is not None for path in paths)
+
+
+def _lazy_pool(paths: List[Path]) -> int:
+    return sum(result.xml is not None for result in extract_many(paths))
+
+
+MODES: Dict[str, Callable[[List[Path]], int]] = {
+    "full-open": _full_open,
+    "lazy": _lazy,
+    "lazy-pool": _lazy_pool,
+}
+
+
+def _build_archive(directory: Path, xml: bytes, copies: int, pages: int) -> List[Path]:
+    """Invoices alternating between one page and `pages` pages."""
+    small = embed_facturx(_REPO_ROOT / "sample_pdfa3b.pdf", xml)
+    with Pdf.open(_REPO_ROOT / "sample_pdfa3b.pdf") as pdf:
+        # Inheritable attributes on the page tree root make the default open push them down
+        pdf.Root.Pages[Name.Rotate] = 0
+        for _ in range(pages - 1):
+            pdf.pages.append(pdf.pages[0])
+        padded = directory / "padded.pdf"
+        pdf.save(padded)
+    large = embed_facturx(padded, xml)
+    paths = []
+    for index in range(copies):
+        path = directory / f"invoice_{index:06d}.pdf"
+        path.write_bytes(large if index % 2 else small)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Factur-X extraction throughput")
+    parser.add_argument("--xml", default=str(_REPO_ROOT / "factur-x.xml"), help="Factur-X XML to embed")
+    parser.add_argument("--copies", type=int, default=1000, help="PDFs in the archive (default: 1000)")
+    parser.add_argument("--pages", type=int, default=100, help="Pages of every other PDF (default: 100)")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES),
+                        help="Modes to compare (default: all)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = _build_archive(Path(temp_dir), Path(args.xml).read_bytes(), args.copies, args.pages)
+        print(f"Archive: {len(paths)} PDFs, half of them {args.pages} pages, {os.cpu_count()} CPUs")
+        print(f"{'mode':<10} {'time':>9} {'per PDF':>9} {'PDFs/min':>10} {'found':>7}")
+        for mode in args.modes:
+            start = time.perf_counter()
+            found = MODES[mode](paths)
+            seconds = time.perf_counter() - start
+            print(f"{mode:<10} {seconds:8.2f}s {seconds / len(paths) * 1e6:7.0f}us "
+                  f"{len(paths) / seconds * 60:10.0f} {found:7d}")
+
+
+if __name__ == "__main__":
+    main()
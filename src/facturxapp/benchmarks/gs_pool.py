@@ -0,0 +1,83 @@
+"""
+Latency comparison: `gs` subprocess per call vs. the GhostscriptPool, whose
+workers keep libgs loaded but start a new interpreter for every job.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.gs_pool ../sample_invoice.pdf --runs 20 --workers 4
+"""
+
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+from facturxapp.services.ghostscript import build_pdfa3b_command, ghostscript_version
+from facturxapp.services.gs_pool import GhostscriptPool
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _measure(name: str, convert: Callable[[int], None], runs: int, concurrency: int) -> None:
+    latencies: List[float] = []
+
+    def timed(i: int) -> None:
+        start = time.perf_counter()
+        convert(i)
+        latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(runs)))
+    wall = time.perf_counter() - wall_start
+
+    print(f"{name:<12} runs={runs:<4} "
+          f"mean={statistics.mean(latencies) * 1000:8.1f}ms "
+          f"p50={_percentile(latencies, 50) * 1000:8.1f}ms "
+          f"p95={_percentile(latencies, 95) * 1000:8.1f}ms "
+          f"throughput={runs / wall:6.2f}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare subprocess and pooled Ghostscript latency")
+    parser.add_argument("input_pdf", help="PDF to convert repeatedly")
+    parser.add_argument("--runs", type=int, default=20, help="Conversions per mode (default: 20)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent conversions / pool size (default: 4)")
+    args = parser.parse_args()
+
+    input_pdf = Path(args.input_pdf)
+    print(f"Ghostscript {ghostscript_version()} - input {input_pdf} ({input_pdf.stat().st_size} bytes)")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        out_dir = Path(temp_dir)
+
+        def subprocess_convert(i: int) -> None:
+            command = build_pdfa3b_command(input_pdf, out_dir / f"subprocess_{i}.pdf")
+            subprocess.run(command, capture_output=True, check=True)
+
+        _measure("subprocess", subprocess_convert, args.runs, args.workers)
+
+        with GhostscriptPool(max_workers=args.workers) as pool:
+            # Start every worker and load libgs so that is not counted; the
+            # interpreter is still initialised per job and is counted
+            with ThreadPoolExecutor(max_workers=args.workers) as warmup:
+                list(warmup.map(
+                    lambda i: pool.convert_to_pdfa3b(input_pdf, out_dir / f"warmup_{i}.pdf"),
+                    range(args.workers)))
+
+            def pooled_convert(i: int) -> None:
+                if not pool.convert_to_pdfa3b(input_pdf, out_dir / f"pool_{i}.pdf"):
+                    raise RuntimeError("Pooled conversion failed")
+
+            _measure("pool", pooled_convert, args.runs, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Peak memory per worker of embedding and validating a large PDF, per I/O mode.
+
+The sample PDF/A-3B is padded with a scan-sized attachment of random bytes
+(--size-mb). Each worker then embeds the Factur-X XML into it, writing
+over the input file, and validates the result (structural PDF/A-3B checks
+and extraction of the XML). "overwrite-input" is what embed_facturx did
+before: Pdf.open(path, allow_overwriting_input=True), which copies the
+whole file into memory. The other rows open the input with open_pdf in
+each of IO_MODES and save with write_pdf, as embed_facturx now does.
+Every row runs in a fresh process, so peak RSS is not shared.
+
+Peak RSS counts the mapped file pages a worker touched as well as its
+private memory. "private" is the anonymous memory (RssAnon) while the
+document is still open after the embed: what a copy of the input adds,
+and what the kernel cannot reclaim under memory pressure.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.io_modes --size-mb 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+from pikepdf import Pdf
+
+from facturxapp.services.attachments import Attachment, attach_files
+from facturxapp.services.embedding import attach_facturx
+from facturxapp.services.extraction import extract_facturx
+from facturxapp.utils.pdf_io import IO_MODES, open_pdf, write_pdf
+from facturxapp.utils.save_profiles import save_options
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+# Repository root, where the sample files live
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+_SAMPLE = _REPO_ROOT / "attached_assets" / "zugferd1_invoice_pdfa3b.pdf"
+
+
+def _private_mb() -> float:
+    """Anonymous resident memory of this process."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _embed(mode: str, pdf_path: Path, xml: Path, save_profile: str) -> float:
+    """What embed_facturx does, reporting private memory before the document is closed."""
+    options = save_options(save_profile)
+    if mode == "overwrite-input":
+        with Pdf.open(pdf_path, allow_overwriting_input=True) as pdf:
+            attach_facturx(pdf, xml)
+            pdf.save(pdf_path, **options)
+            return _private_mb()
+    with open_pdf(pdf_path, mode) as pdf:
+        attach_facturx(pdf, xml)
+        write_pdf(pdf, pdf_path, **options)
+        return _private_mb()
+
+
+def _run(mode: str, pdf_path: str, xml: str, save_profile: str) -> Dict[str, float]:
+    """Embed and validate in a fresh worker process and report time and memory."""
+    start = time.perf_counter()
+    private = _embed(mode, Path(pdf_path), Path(xml), save_profile)
+    embedded = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    embed_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    io_mode = "memory" if mode == "overwrite-input" else mode
+    valid = not check_pdfa3b(pdf_path) and extract_facturx(pdf_path, io_mode=io_mode) is not None
+    return {
+        "seconds": time.perf_counter() - start,
+        "embed_seconds": embedded,
+        "private_mb": private,
+        "embed_peak_rss_mb": embed_peak,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "valid": valid,
+    }
+
+
+MODES = ["overwrite-input", *IO_MODES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak memory per worker for each PDF I/O mode")
+    parser.add_argument("--size-mb", type=int, default=200, help="Size of the padding attachment (default: 200)")
+    parser.add_argument("--save-profile", default="fast", help="Save profile of the embed (default: fast)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES,
+                        help="Modes to compare (default: all)")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scan = Path(temp_dir) / "scan.bin"
+        with open(scan, 'wb') as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1 << 20))
+        padded = Path(temp_dir) / "padded.pdf"
+        attach_files(_SAMPLE, [Attachment(scan)], padded, compress=False)
+        scan.unlink()
+        print(f"Input: {padded.stat().st_size / (1 << 20):.1f} MB, save profile: {args.save_profile}")
+        print(f"{'mode':<16} {'embed':>8} {'total':>8} {'private':>9} "
+              f"{'embed RSS':>10} {'peak RSS':>10} {'valid':>6}")
+        for mode in args.modes:
+            pdf_path = Path(temp_dir) / f"{mode}.pdf"
+            shutil.copyfile(padded, pdf_path)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(_run, mode, str(pdf_path), str(_REPO_ROOT / "factur-x.xml"),
+                                         args.save_profile).result()
+            pdf_path.unlink()
+            print(f"{mode:<16} {result['embed_seconds'] * 1000:6.0f}ms {result['seconds'] * 1000:6.0f}ms "
+                  f"{result['private_mb']:7.1f}MB {result['embed_peak_rss_mb']:8.1f}MB {result['peak_rss_mb']:8.1f}MB {str(result['valid']):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Attachment lookup and insert cost with a flat vs. a balanced name tree.
+
+For each size, a PDF with that many small attachments is written twice:
+once with all of them in a single /Names array (what the old embedders
+produced) and once as a balanced tree built with name_tree.build. The
+report shows the median time to extract the last attachment from the
+saved file with extract_facturx, and to insert one more entry into the
+open document: a sorted insert into the flat array, as the embedders
+used to do, vs. name_tree.insert into the balanced tree.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.name_tree --sizes 100 1000 10000
+"""
+
+import argparse
+import io
+import statistics
+import time
+from typing import List, Tuple
+
+import pikepdf
+from pikepdf import Pdf
+
+from facturxapp.services.extraction import extract_facturx
+from facturxapp.utils import name_tree
+
+
+def _document(size: int, balanced: bool) -> Tuple[bytes, str]:
+    """A PDF with size attachments and the name of the last one."""
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    entries = []
+    for index in range(size):
+        name = f"attachment_{index:06d}.txt"
+        stream = pdf.make_stream(name.encode())
+        entries.append((name, pdf.make_indirect(pikepdf.Dictionary(
+            Type=pikepdf.Name.Filespec, F=pikepdf.String(name), EF=pikepdf.Dictionary(F=stream)))))
+    root = pdf.make_indirect(pikepdf.Dictionary())
+    if balanced:
+        name_tree.build(pdf, root, entries)
+    else:
+        root.Names = pikepdf.Array([item for name, filespec in entries for item in (pikepdf.String(name), filespec)])
+    pdf.Root.Names = pikepdf.Dictionary(EmbeddedFiles=root)
+    buffer = io.BytesIO()
+    pdf.save(buffer)
+    return buffer.getvalue(), entries[-1][0]
+
+
+def _flat_insert(root: pikepdf.Dictionary, key: str, value) -> None:
+    """Linear sorted insert into a single Names array."""
+    names = root.Names
+    for index in range(0, len(names), 2):
+        if str(names[index]) >= key:
+            names.insert(index, pikepdf.String(key))
+            names.insert(index + 1, value)
+            return
+    names.append(pikepdf.String(key))
+    names.append(value)
+
+
+def _median(timings: List[float]) -> float:
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare flat and balanced attachment name trees")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000],
+                        help="Attachments per document (default: 100 1000 10000)")
+    parser.add_argument("--runs", type=int, default=50, help="Runs per measurement (default: 50)")
+    args = parser.parse_args()
+
+    print(f"{'attachments':>11} {'tree':<9} {'lookup':>10} {'insert':>10}")
+    for size in args.sizes:
+        for balanced in (False, True):
+            data, last = _document(size, balanced)
+            lookups, inserts = [], []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                extract_facturx(data, last)
+                lookups.append(time.perf_counter() - start)
+                with Pdf.open(io.BytesIO(data)) as pdf:
+                    root = pdf.Root.Names.EmbeddedFiles
+                    filespec = pdf.make_indirect(pikepdf.Dictionary(F=pikepdf.String("factur-x.xml")))
+                    start = time.perf_counter()
+                    if balanced:
+                        name_tree.insert(pdf, root, "factur-x.xml", filespec)
+                    else:
+                        _flat_insert(root, "factur-x.xml", filespec)
+                    inserts.append(time.perf_counter() - start)
+            label = "balanced" if balanced else "flat"
+            print(f"{size:>11} {label:<9} {_median(lookups):8.0f}us {_median(inserts):8.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compare the PDF/A backends over a corpus of PDFs.
+
+Each backend runs in its own fresh process, so peak RSS is not shared
+between backends. For every backend the report shows per-document
+latency, CPU time (own and child processes), peak RSS, total output
+size and the share of outputs passing the structural PDF/A-3B checks.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.pdfa_backends ../sample_invoice.pdf ../test_invoice.pdf --runs 3
+    python -m facturxapp.benchmarks.pdfa_backends ../*.pdf --backends gs-cli repair
+"""
+
+import argparse
+import multiprocessing
+import resource
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from facturxapp.services.pdfa_backends import BACKENDS, get_backend
+from facturxapp.validators.pdfa_checker import is_pdfa3b
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _run_backend(name: str, corpus: List[str], runs: int) -> Dict[str, object]:
+    """Run one backend over the corpus; executed in a fresh worker process."""
+    latencies: List[float] = []
+    cpu: List[float] = []
+    output_bytes = 0
+    compliant = 0
+    failed = 0
+    with tempfile.TemporaryDirectory() as temp_dir, get_backend(name) as backend:
+        for run in range(runs):
+            for index, input_pdf in enumerate(corpus):
+                output_pdf = Path(temp_dir) / f"{run}_{index}.pdf"
+                cpu_start = _cpu_seconds()
+                start = time.perf_counter()
+                success = backend.convert(Path(input_pdf), output_pdf)
+                latencies.append(time.perf_counter() - start)
+                cpu.append(_cpu_seconds() - cpu_start)
+                if not success or not output_pdf.exists():
+                    failed += 1
+                    continue
+                output_bytes += output_pdf.stat().st_size
+                compliant += is_pdfa3b(output_pdf)
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                      resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    documents = len(corpus) * runs
+    return {
+        "latency_mean": statistics.mean(latencies),
+        "latency_max": max(latencies),
+        "cpu_mean": statistics.mean(cpu),
+        "peak_rss_mb": peak_rss_kb / 1024,
+        "output_mb": output_bytes / (1024 * 1024) / runs,
+        "compliance": compliant / documents,
+        "failed": failed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PDF/A backends over a corpus of PDFs")
+    parser.add_argument("corpus", nargs="+", help="Input PDFs")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS),
+                        help="Backends to compare (default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the corpus per backend (default: 3)")
+    args = parser.parse_args()
+
+    corpus = [str(Path(path).resolve()) for path in args.corpus]
+    print(f"Corpus: {len(corpus)} PDFs, {args.runs} runs per backend")
+    print(f"{'backend':<8} {'mean':>9} {'max':>9} {'cpu':>9} {'peak RSS':>9} {'output':>9} {'PDF/A':>6} {'failed':>6}")
+
+    context = multiprocessing.get_context("spawn")
+    for name in args.backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                result = executor.submit(_run_backend, name, corpus, args.runs).result()
+            except Exception as e:
+                print(f"{name:<8} unavailable: {e}")
+                continue
+        print(f"{name:<8} "
+              f"{result['latency_mean'] * 1000:7.1f}ms "
+              f"{result['latency_max'] * 1000:7.1f}ms "
+              f"{result['cpu_mean'] * 1000:7.1f}ms "
+              f"{result['peak_rss_mb']:7.1f}MB "
+              f"{result['output_mb']:7.2f}MB "
+              f"{result['compliance']:6.0%} "
+              f"{result['failed']:6d}")
+
+
+if __name__ == "__main__":
+    main()
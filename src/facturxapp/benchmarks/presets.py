@@ -0,0 +1,82 @@
+"""
+Compare the image presets on output size and conversion time.
+
+Every PDF is converted once per preset (plus Ghostscript's own image
+handling as "none") with the CLI backend. The report shows, per preset
+and PDF, the median conversion time, the output size and its ratio to
+the input size. Without arguments the repo's sample PDFs are used.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.presets --runs 3
+    python -m facturxapp.benchmarks.presets ../sample_invoice.pdf --presets fast archive
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from facturxapp.services.ghostscript import GS_PRESETS, ghostscript_version, preset_args
+from facturxapp.services.pdfa_backends import GhostscriptCLIBackend
+
+# Repository root, where the sample PDFs live
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _convert(backend: GhostscriptCLIBackend, input_pdf: Path, output_pdf: Path,
+             preset: Optional[str], runs: int) -> Tuple[float, Optional[int]]:
+    """Median seconds over runs and output size in bytes (None on failure)."""
+    extra_args = preset_args(preset) if preset else ()
+    timings: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        success = backend.convert(input_pdf, output_pdf, extra_args)
+        timings.append(time.perf_counter() - start)
+        if not success or not output_pdf.exists():
+            return statistics.median(timings), None
+    return statistics.median(timings), output_pdf.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare conversion presets on size and time")
+    parser.add_argument("corpus", nargs="*", help="Input PDFs (default: the repo's sample PDFs)")
+    parser.add_argument("--presets", nargs="+", choices=["none", *sorted(GS_PRESETS)],
+                        default=["none", *sorted(GS_PRESETS)],
+                        help="Presets to compare; 'none' keeps Ghostscript's own image handling")
+    parser.add_argument("--runs", type=int, default=3, help="Conversions per PDF and preset (default: 3)")
+    args = parser.parse_args()
+
+    if ghostscript_version() is None:
+        parser.exit(1, "Ghostscript not found\n")
+    corpus = [Path(path).resolve() for path in args.corpus] or sorted(_REPO_ROOT.glob("*.pdf"))
+    print(f"Corpus: {len(corpus)} PDFs, {args.runs} runs per preset")
+    print(f"{'preset':<9} {'pdf':<32} {'time':>9} {'input':>10} {'output':>10} {'ratio':>6}")
+
+    backend = GhostscriptCLIBackend()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for preset in args.presets:
+            total_time = 0.0
+            total_in = 0
+            total_out = 0
+            for index, input_pdf in enumerate(corpus):
+                output_pdf = Path(temp_dir) / f"{preset}_{index}.pdf"
+                seconds, size = _convert(backend, input_pdf, output_pdf,
+                                         None if preset == "none" else preset, args.runs)
+                input_size = input_pdf.stat().st_size
+                if size is None:
+                    print(f"{preset:<9} {input_pdf.name:<32} {seconds * 1000:7.1f}ms {input_size:10d} {'failed':>10}")
+                    continue
+                total_time += seconds
+                total_in += input_size
+                total_out += size
+                print(f"{preset:<9} {input_pdf.name:<32} {seconds * 1000:7.1f}ms "
+                      f"{input_size:10d} {size:10d} {size / input_size:6.2f}")
+            if total_in:
+                print(f"{preset:<9} {'TOTAL':<32} {total_time * 1000:7.1f}ms "
+                      f"{total_in:10d} {total_out:10d} {total_out / total_in:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
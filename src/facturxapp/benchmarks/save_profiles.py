@@ -0,0 +1,80 @@
+"""
+Compare the save profiles on output size and embedding time.
+
+The Factur-X XML is embedded into every PDF once per save profile with
+the embedding engine. The report shows, per profile and PDF, the median
+time of the embed-and-save, the output size, its ratio to the input and
+whether the output still passes the structural PDF/A-3B checks. Without
+arguments the repo's sample PDFs and the PDF/A-3B ZUGFeRD sample are used.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.save_profiles --runs 5
+    python -m facturxapp.benchmarks.save_profiles ../sample_pdfa3b.pdf --profiles small web
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from facturxapp.services.embedding import embed_facturx
+from facturxapp.utils.save_profiles import SAVE_PROFILES
+from facturxapp.validators.pdfa_checker import is_pdfa3b
+
+# Repository root, where the sample files live
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _embed(input_pdf: Path, xml: bytes, output_pdf: Path, profile: str, runs: int) -> Tuple[float, int]:
+    """Median seconds over runs and output size in bytes."""
+    timings: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        embed_facturx(input_pdf, xml, output_pdf, save_profile=profile)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), output_pdf.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare save profiles on size and time")
+    parser.add_argument("corpus", nargs="*", help="Input PDFs (default: the repo's sample PDFs)")
+    parser.add_argument("--xml", default=str(_REPO_ROOT / "factur-x.xml"), help="Factur-X XML to embed")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(SAVE_PROFILES), default=list(SAVE_PROFILES),
+                        help="Save profiles to compare (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Embeddings per PDF and profile (default: 5)")
+    args = parser.parse_args()
+
+    corpus = [Path(path).resolve() for path in args.corpus] or [
+        *sorted(_REPO_ROOT.glob("*.pdf")), _REPO_ROOT / "attached_assets" / "zugferd1_invoice_pdfa3b.pdf"]
+    xml = Path(args.xml).read_bytes()
+    print(f"Corpus: {len(corpus)} PDFs, {args.runs} runs per profile")
+    print(f"{'profile':<8} {'pdf':<32} {'time':>9} {'input':>10} {'output':>10} {'ratio':>6} {'PDF/A':>5}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for profile in args.profiles:
+            total_time = 0.0
+            total_in = 0
+            total_out = 0
+            for index, input_pdf in enumerate(corpus):
+                output_pdf = Path(temp_dir) / f"{profile}_{index}.pdf"
+                input_size = input_pdf.stat().st_size
+                try:
+                    seconds, size = _embed(input_pdf, xml, output_pdf, profile, args.runs)
+                except Exception as e:
+                    print(f"{profile:<8} {input_pdf.name:<32} failed: {e}")
+                    continue
+                total_time += seconds
+                total_in += input_size
+                total_out += size
+                pdfa = "yes" if is_pdfa3b(output_pdf) else "no"
+                print(f"{profile:<8} {input_pdf.name:<32} {seconds * 1000:7.2f}ms "
+                      f"{input_size:10d} {size:10d} {size / input_size:6.2f} {pdfa:>5}")
+            if total_in:
+                print(f"{profile:<8} {'TOTAL':<32} {total_time * 1000:7.2f}ms "
+                      f"{total_in:10d} {total_out:10d} {total_out / total_in:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
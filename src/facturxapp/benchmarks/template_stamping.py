@@ -0,0 +1,110 @@
+"""
+Throughput of template stamping vs. rewriting the template per invoice.
+
+Both modes draw the same pre-rendered one-page overlay onto the template
+and attach the same XML. "rewrite" opens the template file and saves a
+complete new PDF per invoice. "stamper" is the TemplateStamper, which
+reuses the template bytes and appends only the per-invoice objects.
+Overlay rendering with reportlab is timed separately, as it is the same
+for both modes. Outputs are written to a temporary directory.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.template_stamping --invoices 500
+    python -m facturxapp.benchmarks.template_stamping --template ../letterhead.pdf
+"""
+
+import argparse
+import io
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from pikepdf import Pdf
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from facturxapp.services.embedding import attach_facturx
+from facturxapp.services.pdf_service import FONT_REGULAR, _register_fonts
+from facturxapp.services.template_stamper import TemplateStamper
+
+# Repository root, where the sample files live
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _render_overlay(number: int) -> bytes:
+    """A small per-invoice page: number, date and a few lines."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, initialFontName=FONT_REGULAR)
+    c.setFont(FONT_REGULAR, 12)
+    c.drawString(50, 700, f"Invoice #: INV-{number:06d}")
+    for line in range(10):
+        c.drawString(50, 650 - 15 * line, f"Item {line}    1.000    {number % 97 + line:.2f}")
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def _rewrite(template: Path) -> Callable[[bytes, bytes, Path], None]:
+    def stamp(overlay: bytes, xml: bytes, output: Path) -> None:
+        with Pdf.open(template) as pdf, Pdf.open(io.BytesIO(overlay)) as content:
+            pdf.pages[0].add_overlay(content.pages[0])
+            attach_facturx(pdf, xml)
+            pdf.save(output)
+    return stamp
+
+
+def _stamper(template: Path) -> Callable[[bytes, bytes, Path], None]:
+    stamper = TemplateStamper(template)
+
+    def stamp(overlay: bytes, xml: bytes, output: Path) -> None:
+        stamper.stamp(overlay, xml, output)
+    return stamp
+
+
+MODES: Dict[str, Callable[[Path], Callable[[bytes, bytes, Path], None]]] = {
+    "rewrite": _rewrite,
+    "stamper": _stamper,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure template stamping throughput")
+    parser.add_argument("--template", default=str(_REPO_ROOT / "attached_assets" / "zugferd1_invoice_pdfa3b.pdf"),
+                        help="PDF/A-3B template (default: the repo's ZUGFeRD sample)")
+    parser.add_argument("--xml", default=str(_REPO_ROOT / "factur-x.xml"), help="Factur-X XML to attach")
+    parser.add_argument("--invoices", type=int, default=200, help="Invoices per mode (default: 200)")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES),
+                        help="Modes to compare (default: all)")
+    args = parser.parse_args()
+
+    template = Path(args.template).resolve()
+    xml = Path(args.xml).read_bytes()
+    _register_fonts()
+    start = time.perf_counter()
+    overlays = [_render_overlay(number) for number in range(args.invoices)]
+    render = (time.perf_counter() - start) / args.invoices
+    print(f"Template: {template.name} ({template.stat().st_size} bytes), {args.invoices} invoices")
+    print(f"Overlay rendering: {render * 1000:.2f}ms per invoice")
+    print(f"{'mode':<9} {'mean':>9} {'p95':>9} {'invoices/min':>13} {'output':>10}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in args.modes:
+            stamp = MODES[name](template)
+            latencies: List[float] = []
+            output_bytes = 0
+            for number, overlay in enumerate(overlays):
+                output = Path(temp_dir) / f"{name}_{number}.pdf"
+                start = time.perf_counter()
+                stamp(overlay, xml, output)
+                latencies.append(time.perf_counter() - start)
+                output_bytes += output.stat().st_size
+            mean = statistics.mean(latencies)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else mean
+            print(f"{name:<9} {mean * 1000:7.2f}ms {p95 * 1000:7.2f}ms {60 / mean:13.0f} "
+                  f"{output_bytes // len(latencies):10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cost of writing the Factur-X XMP packet: per-key edits vs. the template.
+
+"open_metadata" is how the embedders used to do it: open pikepdf's XMP
+editor, set the pdfaid and fx keys one by one and let it re-serialize
+the packet on exit. "template" builds the packet with xmp_packet() and
+writes it as one stream; "template+info" also carries the Info
+dictionary over, as merge_info=True does. Only the metadata step is
+timed, on documents already open in memory.
+
+Usage (from src/):
+    python -m facturxapp.benchmarks.xmp --runs 500
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pikepdf
+from pikepdf import Pdf
+
+from facturxapp.services.embedding import FACTURX_FILENAME, FACTURX_VERSION
+from facturxapp.utils.xmp import (
+    FACTURX_NS,
+    FacturXProperties,
+    document_info,
+    write_document_info,
+    write_xmp,
+    xmp_packet,
+)
+
+# Repository root, where the sample files live
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+
+_FACTURX = FacturXProperties("EN 16931", FACTURX_FILENAME, FACTURX_VERSION)
+
+
+def _open_metadata(pdf: Pdf) -> None:
+    with pdf.open_metadata() as meta:
+        meta["pdfaid:part"] = "3"
+        meta["pdfaid:conformance"] = "B"
+        meta["fx:DocumentType"] = _FACTURX.document_type
+        meta["fx:DocumentFileName"] = _FACTURX.document_file_name
+        meta["fx:Version"] = _FACTURX.version
+        meta["fx:ConformanceLevel"] = _FACTURX.conformance_level
+
+
+def _template(pdf: Pdf) -> None:
+    write_xmp(pdf, xmp_packet(_FACTURX))
+
+
+def _template_info(pdf: Pdf) -> None:
+    info = document_info(pdf)
+    write_xmp(pdf, xmp_packet(_FACTURX, info))
+    write_document_info(pdf, info)
+
+
+MODES: Dict[str, Callable[[Pdf], None]] = {
+    "open_metadata": _open_metadata,
+    "template": _template,
+    "template+info": _template_info,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare XMP packet writers")
+    parser.add_argument("corpus", nargs="*", help="Input PDFs (default: the repo's PDF/A samples)")
+    parser.add_argument("--runs", type=int, default=200, help="Writes per PDF and mode (default: 200)")
+    args = parser.parse_args()
+
+    # open_metadata refuses fx: keys unless the prefix is known
+    pikepdf.models.PdfMetadata.register_xml_namespace(FACTURX_NS, "fx")
+
+    corpus = [Path(path).resolve() for path in args.corpus] or [
+        _REPO_ROOT / "sample_pdfa3b.pdf", _REPO_ROOT / "attached_assets" / "zugferd1_invoice_pdfa3b.pdf"]
+    print(f"Corpus: {len(corpus)} PDFs, {args.runs} runs per mode")
+    print(f"{'mode':<14} {'pdf':<32} {'median':>9} {'packet':>8}")
+    for mode, write in MODES.items():
+        for input_pdf in corpus:
+            timings: List[float] = []
+            for _ in range(args.runs):
+                # Each run starts from the original metadata and Info
+                with Pdf.open(input_pdf) as pdf:
+                    start = time.perf_counter()
+                    write(pdf)
+                    timings.append(time.perf_counter() - start)
+                    size = len(pdf.Root.Metadata.read_bytes())
+            print(f"{mode:<14} {input_pdf.name:<32} {statistics.median(timings) * 1e6:7.0f}us {size:8d}")
+
+
+if __name__ == "__main__":
+    main()
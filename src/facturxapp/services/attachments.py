@@ -0,0 +1,105 @@
+"""
+Supplementary attachments next to factur-x.xml.
+
+Factur-X allows further files besides the invoice XML, such as
+timesheets, delivery notes or the source the invoice was generated
+from. Each one is registered like factur-x.xml: a file specification
+with an AFRelationship, referenced from the catalog AF array and the
+EmbeddedFiles name tree.
+
+The files are never read into memory. They are attached as an
+incremental update, and their content is copied from disk into the
+output in chunks, Flate-compressed on the way. Peak memory is the same
+for a 5 KB delivery note and a 500 MB scan.
+"""
+
+import logging
+import mimetypes
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional, Union
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+from facturxapp.utils.pdf_io import open_pdf
+from .embedding import FACTURX_FILENAME, _pdf_date, reference_filespec
+from .incremental import IncrementalUpdate
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Alternative is reserved for factur-x.xml itself
+SUPPLEMENTARY_RELATIONSHIPS = ("Supplement", "Source", "Data", "Unspecified")
+
+
+class Attachment(NamedTuple):
+    """A file to attach and how to describe it."""
+    path: Path
+    relationship: str = "Supplement"
+    name: Optional[str] = None
+    description: Optional[str] = None
+    mime_type: Optional[str] = None
+
+
+def _filespec(pdf: Pdf, attachment: Attachment, name: str) -> pikepdf.Dictionary:
+    """Filespec with a placeholder stream whose data comes from the file on write."""
+    path = Path(attachment.path)
+    mime_type = attachment.mime_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
+    modified = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+    stream = pdf.make_stream(b"")
+    stream[Name.Type] = Name.EmbeddedFile
+    stream[Name.Subtype] = Name("/" + mime_type)
+    stream[Name.Params] = pikepdf.Dictionary(ModDate=pikepdf.String(_pdf_date(modified)))
+    filespec = pikepdf.Dictionary(
+        Type=Name.Filespec,
+        F=pikepdf.String(name),
+        UF=pikepdf.String(name),
+        AFRelationship=Name("/" + attachment.relationship),
+        EF=pikepdf.Dictionary(F=stream, UF=stream),
+    )
+    if attachment.description:
+        filespec[Name.Desc] = pikepdf.String(attachment.description)
+    return pdf.make_indirect(filespec)
+
+
+def attach_files(pdf: Union[str, Path],
+                 attachments: Iterable[Attachment],
+                 output: Union[str, Path, None] = None,
+                 compress: bool = True,
+                 io_mode: Optional[str] = None) -> None:
+    """
+    Attach supplementary files to a PDF, streaming their content from disk.
+
+    An attachment with the same name as an existing one replaces it.
+
+    Args:
+        pdf: Path to the PDF, typically a Factur-X invoice
+        attachments (Iterable[Attachment]): Files to attach
+        output: Where to write the result; if None the PDF is updated in place
+        compress (bool): Flate-compress the attachments
+        io_mode (Optional[str]): How the PDF is read (see IO_MODES)
+
+    Raises:
+        ValueError: For the reserved factur-x.xml name or an unsupported relationship
+    """
+    pdf = Path(pdf)
+    with open_pdf(pdf, io_mode) as document:
+        update = IncrementalUpdate(document)
+        names = []
+        for attachment in attachments:
+            name = attachment.name or Path(attachment.path).name
+            if name == FACTURX_FILENAME:
+                raise ValueError(f"{FACTURX_FILENAME} is reserved for the invoice XML")
+            if attachment.relationship not in SUPPLEMENTARY_RELATIONSHIPS:
+                raise ValueError(f"Unsupported AFRelationship for a supplementary file: {attachment.relationship}")
+            filespec = _filespec(document, attachment, name)
+            reference_filespec(document, filespec, name)
+            update.stream_from_file(filespec.EF.F, attachment.path, compress)
+            names.append(name)
+        update.write(pdf, output or pdf)
+    logger.info(f"Attached {', '.join(names) or 'nothing'} to {output or pdf}")
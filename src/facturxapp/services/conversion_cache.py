@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Bump when the post-processing applied to cached outputs changes
+CACHE_FORMAT_VERSION = "1"
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path: Union[str, Path]) -> str:
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """
+    On-disk, content-addressed cache of PDF/A-3B conversion results.
+
+    Entries are keyed by the SHA-256 of the input PDF, the Ghostscript
+    version and the exact conversion parameters. Inserts are written to a
+    temporary file and renamed into place, so concurrent workers never see
+    partial entries. Total size is bounded; the least recently used entries
+    (by modification time, refreshed on every hit) are evicted first.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path] = "cache/pdfa", max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (Union[str, Path]): Directory holding the cache entries
+            max_bytes (int): Size bound for all entries together
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(input_sha256: str, gs_version: Optional[str], params: Sequence[str]) -> str:
+        """
+        Build the cache key for a conversion.
+
+        Args:
+            input_sha256 (str): SHA-256 of the input PDF bytes
+            gs_version (Optional[str]): Ghostscript version string
+            params (Sequence[str]): Conversion parameters, without input and output paths
+
+        Returns:
+            str: Hex digest identifying the conversion result
+        """
+        digest = hashlib.sha256()
+        for part in (CACHE_FORMAT_VERSION, input_sha256, gs_version or "", *params):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pdf"
+
+    def get(self, key: str, output_path: Union[str, Path]) -> bool:
+        """
+        Copy a cached result to output_path.
+
+        Returns:
+            bool: True on a cache hit, False otherwise
+        """
+        entry = self._entry_path(key)
+        try:
+            shutil.copyfile(entry, output_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        try:
+            # Refresh the entry for LRU eviction
+            os.utime(entry)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        logger.info(f"Conversion cache hit: {key[:12]}")
+        return True
+
+    def put(self, key: str, result_path: Union[str, Path]) -> None:
+        """Atomically store a conversion result, then enforce the size bound."""
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=entry.parent, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, 'wb') as temp_file, open(result_path, 'rb') as source:
+                shutil.copyfileobj(source, temp_file, _CHUNK_SIZE)
+            os.replace(temp_path, entry)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        logger.info(f"Conversion cache insert: {key[:12]}")
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            int: Number of entries removed
+        """
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                # Another worker evicted it first
+                pass
+            total -= size
+        logger.info(f"Conversion cache evicted {removed} entries")
+        return removed
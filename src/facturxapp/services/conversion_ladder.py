@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+from .ghostscript import MINIMAL_PDFA3B_ARGS
+from .pdf_analyzer import RECOMPRESS_IMAGE_BYTES, PDFProfile
+from .pdfa_backends import GhostscriptCLIBackend, PDFABackend, PikepdfRepairBackend
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Rung names, in the order tried by default (best output first)
+RUNG_FULL = "full"
+RUNG_MINIMAL = "minimal"
+RUNG_REPAIR = "repair"
+
+# Deadline for the minimal Ghostscript rung, in seconds. It runs after the
+# full command has already failed, so it gets a shorter budget.
+MINIMAL_RUNG_TIMEOUT = 60.0
+
+# A rung is skipped for an input class once it has been tried this many
+# times with a success rate below SKIP_BELOW_SUCCESS_RATE ...
+MIN_ATTEMPTS = 3
+SKIP_BELOW_SUCCESS_RATE = 0.2
+# ... except on every PROBE_EVERY-th request of that class, so a rung that
+# starts working again (e.g. after a Ghostscript upgrade) is noticed
+PROBE_EVERY = 20
+
+
+class LadderRung(NamedTuple):
+    """One way of converting, tried in order until one works."""
+    name: str
+    backend: PDFABackend
+    # Whether the caller's tuning and preset flags are passed on
+    pass_extra_args: bool
+
+
+class RungStats:
+    """Attempts, successes and time spent for one rung on one input class."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.seconds = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.attempts if self.attempts else 1.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.attempts if self.attempts else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "success_rate": self.success_rate,
+            "mean_seconds": self.mean_seconds,
+        }
+
+
+def input_class(profile: PDFProfile) -> str:
+    """
+    Group a profiled PDF with inputs likely to fail or succeed the same way.
+
+    The class combines the PDF/A findings with the content traits that
+    trip up Ghostscript most often: transparency, Type3 fonts and large
+    image payloads.
+
+    Returns:
+        str: Class key such as "fonts-not-embedded+transparency"
+    """
+    traits = set(profile.findings)
+    if profile.transparent_pages:
+        traits.add("transparency")
+    if profile.font_types.get("Type3"):
+        traits.add("type3")
+    if profile.image_bytes > RECOMPRESS_IMAGE_BYTES:
+        traits.add("image-heavy")
+    return "+".join(sorted(traits)) or "compliant"
+
+
+class ConversionLadder:
+    """
+    Tries progressively simpler conversions until one yields PDF/A-3B.
+
+    The default rungs are the full Ghostscript command, the minimal
+    Ghostscript command and a metadata-only pikepdf repair. Each rung has
+    its own deadline through its backend. For every input class the ladder
+    records which rungs were tried, which succeeded and how long they took;
+    rungs that keep failing for a class are skipped for that class, so
+    known-problematic inputs go straight to the rung that works for them.
+    """
+
+    def __init__(self, rungs: Sequence[LadderRung]):
+        """
+        Initialize the ladder.
+
+        Args:
+            rungs (Sequence[LadderRung]): Rungs in preference order
+        """
+        if not rungs:
+            raise ValueError("A conversion ladder needs at least one rung")
+        self.rungs = list(rungs)
+        self._stats: Dict[str, Dict[str, RungStats]] = defaultdict(lambda: defaultdict(RungStats))
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls,
+                full_backend: Optional[PDFABackend] = None,
+                minimal_timeout: Optional[float] = MINIMAL_RUNG_TIMEOUT) -> "ConversionLadder":
+        """
+        Build the full → minimal → repair ladder.
+
+        Args:
+            full_backend (Optional[PDFABackend]): Backend for the full command.
+                Defaults to a CLI backend with the standard deadline.
+            minimal_timeout (Optional[float]): Deadline for the minimal command
+
+        Returns:
+            ConversionLadder: The ladder
+        """
+        return cls([
+            LadderRung(RUNG_FULL, full_backend or GhostscriptCLIBackend(), True),
+            LadderRung(RUNG_MINIMAL, GhostscriptCLIBackend(MINIMAL_PDFA3B_ARGS, timeout=minimal_timeout), False),
+            LadderRung(RUNG_REPAIR, PikepdfRepairBackend(), False),
+        ])
+
+    def order(self, key: str) -> List[LadderRung]:
+        """
+        Rungs to try for an input class, in order.
+
+        Rungs with a poor record for the class are left out, unless this
+        request is a periodic probe or no rung would remain.
+        """
+        with self._lock:
+            self._requests[key] += 1
+            if self._requests[key] % PROBE_EVERY == 0:
+                return list(self.rungs)
+            stats = self._stats.get(key, {})
+            kept = [rung for rung in self.rungs if not _is_failing(stats.get(rung.name))]
+        return kept or list(self.rungs)
+
+    def _record(self, key: str, rung: str, success: bool, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats[key][rung]
+            stats.attempts += 1
+            stats.successes += success
+            stats.seconds += seconds
+
+    def convert(self,
+                input_pdf: Path,
+                output_pdf: Path,
+                profile: PDFProfile,
+                extra_args: Sequence[str] = ()) -> Optional[str]:
+        """
+        Convert input_pdf, climbing down the ladder until a rung succeeds.
+
+        A rung succeeds when its backend reports success and the output
+        passes the structural PDF/A-3B checks. Exceptions raised by a rung
+        count as failures.
+
+        Args:
+            input_pdf (Path): Path to the input PDF file
+            output_pdf (Path): Path for the output PDF file
+            profile (PDFProfile): Result of analyze_pdf for the input
+            extra_args (Sequence[str]): Tuning and preset flags for rungs that take them
+
+        Returns:
+            Optional[str]: Name of the rung that succeeded, or None if all failed
+        """
+        key = input_class(profile)
+        for rung in self.order(key):
+            start = time.perf_counter()
+            try:
+                success = rung.backend.convert(input_pdf, output_pdf,
+                                               extra_args if rung.pass_extra_args else ())
+                success = success and Path(output_pdf).exists() and not check_pdfa3b(output_pdf)
+            except Exception as e:
+                logger.error(f"Conversion rung {rung.name} raised for {input_pdf}: {e}")
+                success = False
+            seconds = time.perf_counter() - start
+            self._record(key, rung.name, success, seconds)
+            if success:
+                logger.info(f"Conversion rung {rung.name} succeeded for [{key}] in {seconds:.2f}s")
+                return rung.name
+            logger.warning(f"Conversion rung {rung.name} failed for [{key}] after {seconds:.2f}s")
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Per input class and rung: attempts, successes, success rate and mean latency.
+        """
+        with self._lock:
+            return {
+                key: {rung: stats.as_dict() for rung, stats in rungs.items()}
+                for key, rungs in self._stats.items()
+            }
+
+    def close(self) -> None:
+        """Release the resources held by the rung backends."""
+        for rung in self.rungs:
+            rung.backend.close()
+
+
+def _is_failing(stats: Optional[RungStats]) -> bool:
+    return (stats is not None
+            and stats.attempts >= MIN_ATTEMPTS
+            and stats.success_rate < SKIP_BELOW_SUCCESS_RATE)
@@ -0,0 +1,306 @@
+"""
+Embedding of the Factur-X XML into PDF/A-3B documents.
+
+This is the single implementation behind the embed_xml scripts,
+facturx_process.py and FacturXService. One call adds, in one pass:
+
+- the factur-x.xml embedded file stream with its Params (Size,
+  ModDate and an MD5 CheckSum)
+- a file specification with AFRelationship, referenced from the
+  catalog AF array and from the EmbeddedFiles name tree
+- a new XMP packet, written from a template: pdfaid part/conformance,
+  the Factur-X properties (fx:DocumentType, fx:DocumentFileName,
+  fx:Version, fx:ConformanceLevel) and the PDF/A extension schema
+  describing them. The title, author, producer and dates are carried
+  over from the Info dictionary only with merge_info (the default for
+  replace_facturx_xml); otherwise the Info dictionary is dropped so it
+  cannot disagree with the packet.
+
+An existing factur-x.xml attachment is replaced, not duplicated.
+replace_facturx_xml() corrects the XML of a finished invoice in place,
+as an incremental update.
+"""
+
+import hashlib
+import io
+import logging
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+from facturxapp.utils import name_tree
+from facturxapp.utils.pdf_io import open_pdf, write_pdf
+from facturxapp.utils.save_profiles import compresses_streams, save_options
+from facturxapp.utils.xmp import (
+    FacturXProperties,
+    document_info,
+    read_xmp_properties,
+    write_document_info,
+    write_xmp,
+    xmp_packet,
+)
+from .incremental import IncrementalUpdate
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+FACTURX_FILENAME = "factur-x.xml"
+FACTURX_VERSION = "1.0"
+
+# Profile names used across the repo -> fx:ConformanceLevel values
+CONFORMANCE_LEVELS = {
+    "MINIMUM": "MINIMUM",
+    "BASIC_WL": "BASIC WL",
+    "BASIC": "BASIC",
+    "EN16931": "EN 16931",
+    "EXTENDED": "EXTENDED",
+}
+
+# The XML is the invoice itself for the richer profiles; for MINIMUM and
+# BASIC WL the PDF stays the legal invoice and the XML is just data
+_DATA_ONLY_PROFILES = ("MINIMUM", "BASIC_WL")
+
+Source = Union[str, Path, bytes]
+
+
+def _read_bytes(source: Source) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _pdf_date(moment: datetime) -> str:
+    """Format a datetime as a PDF date string, e.g. D:20240131120000+01'00'."""
+    offset = moment.strftime("%z")
+    suffix = f"{offset[:3]}'{offset[3:]}'" if offset else ""
+    return "D:" + moment.strftime("%Y%m%d%H%M%S") + suffix
+
+
+def _make_filespec(pdf: Pdf, xml_bytes: bytes, profile: str, mod_date: datetime,
+                   compress: bool) -> pikepdf.Dictionary:
+    stream = pdf.make_stream(zlib.compress(xml_bytes, 9) if compress else xml_bytes)
+    if compress:
+        stream[Name.Filter] = Name.FlateDecode
+    stream[Name.Type] = Name.EmbeddedFile
+    stream[Name.Subtype] = Name("/text/xml")
+    stream[Name.Params] = pikepdf.Dictionary(
+        Size=len(xml_bytes),
+        ModDate=pikepdf.String(_pdf_date(mod_date)),
+        CheckSum=pikepdf.String(hashlib.md5(xml_bytes).digest()),
+    )
+    relationship = Name.Data if profile in _DATA_ONLY_PROFILES else Name.Alternative
+    return pdf.make_indirect(pikepdf.Dictionary(
+        Type=Name.Filespec,
+        F=pikepdf.String(FACTURX_FILENAME),
+        UF=pikepdf.String(FACTURX_FILENAME),
+        Desc=pikepdf.String("Factur-X Invoice"),
+        AFRelationship=relationship,
+        EF=pikepdf.Dictionary(F=stream, UF=stream),
+    ))
+
+
+def _has_filename(filespec, filename: str) -> bool:
+    if not isinstance(filespec, pikepdf.Dictionary):
+        return False
+    return any(name_tree.key_text(filespec.get(key, "")) == filename for key in (Name.UF, Name.F))
+
+
+def reference_filespec(pdf: Pdf, filespec: pikepdf.Dictionary, filename: str = FACTURX_FILENAME) -> None:
+    """
+    Reference a filespec from the AF array and the EmbeddedFiles name tree.
+
+    An attachment already registered under the same file name is replaced.
+    """
+    af = pdf.Root.get(Name.AF)
+    kept = [item for item in af if not _has_filename(item, filename)] if af is not None else []
+    pdf.Root[Name.AF] = pikepdf.Array([*kept, filespec])
+
+    if Name.Names not in pdf.Root:
+        pdf.Root[Name.Names] = pikepdf.Dictionary()
+    names = pdf.Root[Name.Names]
+    if Name.EmbeddedFiles not in names:
+        names[Name.EmbeddedFiles] = pdf.make_indirect(pikepdf.Dictionary(Names=pikepdf.Array()))
+    name_tree.insert(pdf, names[Name.EmbeddedFiles], filename, filespec)
+
+
+def _write_xmp(pdf: Pdf, profile: str, merge_info: bool) -> None:
+    """Replace the XMP packet; the Info dictionary is rewritten to match it."""
+    info = document_info(pdf) if merge_info else None
+    facturx = FacturXProperties(CONFORMANCE_LEVELS[profile], FACTURX_FILENAME, FACTURX_VERSION)
+    write_xmp(pdf, xmp_packet(facturx, info))
+    write_document_info(pdf, info)
+
+
+def attach_facturx(pdf: Pdf,
+                   xml: Source,
+                   profile: str = "EN16931",
+                   mod_date: Optional[datetime] = None,
+                   compress: bool = True,
+                   merge_info: bool = False) -> None:
+    """
+    Add or replace the factur-x.xml attachment of an open document.
+
+    Args:
+        pdf (Pdf): Document to modify in place
+        xml: Factur-X XML as bytes, or a path to it
+        profile (str): Factur-X profile (MINIMUM, BASIC_WL, BASIC, EN16931, EXTENDED)
+        mod_date (Optional[datetime]): Modification date of the XML, defaults to now
+        compress (bool): Store the XML Flate-compressed
+        merge_info (bool): Keep the title, author, producer and dates of the
+            Info dictionary in the new XMP packet instead of dropping them
+    """
+    if profile not in CONFORMANCE_LEVELS:
+        raise ValueError(f"Unknown Factur-X profile: {profile}")
+    xml_bytes = _read_bytes(xml)
+    filespec = _make_filespec(pdf, xml_bytes, profile, mod_date or datetime.now(timezone.utc), compress)
+    reference_filespec(pdf, filespec)
+    _write_xmp(pdf, profile, merge_info)
+
+
+def embed_facturx(pdf: Source,
+                  xml: Source,
+                  output: Union[str, Path, BinaryIO, None] = None,
+                  profile: str = "EN16931",
+                  mod_date: Optional[datetime] = None,
+                  incremental: bool = False,
+                  save_profile: Optional[str] = None,
+                  merge_info: bool = False,
+                  io_mode: Optional[str] = None) -> Optional[bytes]:
+    """
+    Embed Factur-X XML into a PDF/A-3B document.
+
+    With incremental=True the input is not rewritten: only the new and
+    changed objects are appended to it, which is much faster for large
+    documents and keeps the original bytes (and any signature over them).
+
+    Args:
+        pdf: Input PDF as bytes, or a path to it
+        xml: Factur-X XML as bytes, or a path to it
+        output: Path or binary file object to write to; if None the result is returned
+        profile (str): Factur-X profile (MINIMUM, BASIC_WL, BASIC, EN16931, EXTENDED)
+        mod_date (Optional[datetime]): Modification date of the XML, defaults to now
+        incremental (bool): Append an incremental update instead of rewriting
+        save_profile (Optional[str]): Save settings (see SAVE_PROFILES). An
+            incremental update only honours whether streams are compressed.
+        merge_info (bool): Keep the title, author, producer and dates of the
+            Info dictionary in the new XMP packet instead of dropping them
+        io_mode (Optional[str]): How the input file is read (see IO_MODES).
+            The output may be the input file in every mode.
+
+    Returns:
+        Optional[bytes]: The resulting PDF if no output was given, else None
+    """
+    options = save_options(save_profile)
+    compress = compresses_streams(save_profile)
+    with open_pdf(pdf, io_mode) as document:
+        if incremental:
+            update = IncrementalUpdate(document)
+            attach_facturx(document, xml, profile, mod_date, compress, merge_info)
+            result = update.write(pdf, output)
+            if output is not None:
+                logger.info(f"Appended {FACTURX_FILENAME} ({profile}) to {output}")
+            return result
+        attach_facturx(document, xml, profile, mod_date, compress, merge_info)
+        if output is not None:
+            write_pdf(document, output, **options)
+            logger.info(f"Embedded {FACTURX_FILENAME} ({profile}) into {output}")
+            return None
+        buffer = io.BytesIO()
+        document.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def find_facturx_filespec(pdf: Pdf, filename: str = FACTURX_FILENAME) -> Optional[pikepdf.Dictionary]:
+    """Return the factur-x.xml filespec from the AF array or the EmbeddedFiles name tree."""
+    for filespec in pdf.Root.get(Name.AF, ()):
+        if _has_filename(filespec, filename):
+            return filespec
+    names = pdf.Root.get(Name.Names)
+    tree = names.get(Name.EmbeddedFiles) if names is not None else None
+    return name_tree.lookup(tree, filename) if tree is not None else None
+
+
+def declared_profile(pdf: Pdf) -> Optional[str]:
+    """The profile named by fx:ConformanceLevel in the XMP, if any."""
+    level = read_xmp_properties(pdf).get("fx:ConformanceLevel", "").upper()
+    for profile, value in CONFORMANCE_LEVELS.items():
+        if level == value:
+            return profile
+    return None
+
+
+def replace_facturx_xml(pdf: Union[str, Path],
+                        xml: Source,
+                        output: Union[str, Path, None] = None,
+                        profile: Optional[str] = None,
+                        mod_date: Optional[datetime] = None,
+                        compress: bool = True,
+                        merge_info: bool = True,
+                        io_mode: Optional[str] = None) -> None:
+    """
+    Swap the content of the embedded factur-x.xml, e.g. to correct a reference.
+
+    The existing filespec is kept and its stream rewritten with the new
+    XML, Size, CheckSum and ModDate. The XMP packet is rewritten too; the
+    title, author, producer and dates of the document are kept in it and
+    in the Info dictionary unless merge_info is False.
+    The change is saved as an incremental update, so nothing else in the
+    document is re-encoded and no conversion is needed.
+
+    Args:
+        pdf: Path to a Factur-X PDF
+        xml: Corrected XML as bytes, or a path to it
+        output: Where to write the result; if None the PDF is updated in place
+        profile (Optional[str]): Factur-X profile; defaults to the one in the XMP
+        mod_date (Optional[datetime]): Modification date of the XML, defaults to now
+        compress (bool): Store the XML Flate-compressed
+        merge_info (bool): Keep the title, author, producer and dates of the
+            document; False drops them along with the Info dictionary
+        io_mode (Optional[str]): How the PDF is read (see IO_MODES)
+
+    Raises:
+        ValueError: If the PDF has no factur-x.xml attachment
+    """
+    if profile is not None and profile not in CONFORMANCE_LEVELS:
+        raise ValueError(f"Unknown Factur-X profile: {profile}")
+    xml_bytes = _read_bytes(xml)
+    with open_pdf(pdf, io_mode) as document:
+        filespec = find_facturx_filespec(document)
+        if filespec is None:
+            raise ValueError(f"No {FACTURX_FILENAME} attachment in {pdf}")
+        profile = profile or declared_profile(document) or "EN16931"
+        ef = filespec.EF
+        streams = {stream.objgen: stream for stream in (ef.get(Name.F), ef.get(Name.UF)) if stream is not None}
+        watch = [obj for obj in (filespec, ef) if obj.is_indirect]
+        for stream in streams.values():
+            watch.append(stream)
+            params = stream.get(Name.Params)
+            if params is not None and params.is_indirect:
+                watch.append(params)
+        update = IncrementalUpdate(document, watch)
+
+        for stream in streams.values():
+            if compress:
+                stream.write(zlib.compress(xml_bytes, 9), filter=Name.FlateDecode)
+            else:
+                stream.write(xml_bytes)
+            params = stream.get(Name.Params)
+            if params is None:
+                params = stream[Name.Params] = pikepdf.Dictionary()
+            params[Name.Size] = len(xml_bytes)
+            params[Name.CheckSum] = pikepdf.String(hashlib.md5(xml_bytes).digest())
+            params[Name.ModDate] = pikepdf.String(_pdf_date(mod_date or datetime.now(timezone.utc)))
+        filespec[Name.AFRelationship] = Name.Data if profile in _DATA_ONLY_PROFILES else Name.Alternative
+        reference_filespec(document, filespec)
+        _write_xmp(document, profile, merge_info)
+        update.write(pdf, output or pdf)
+    logger.info(f"Replaced {FACTURX_FILENAME} ({profile}) in {output or pdf}")
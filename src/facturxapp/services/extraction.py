@@ -0,0 +1,124 @@
+"""
+Fast extraction of the embedded factur-x.xml, for scanning archives.
+
+Only the objects on the way to the XML are read: the cross-reference
+data and trailer, the catalog, the AF array or the EmbeddedFiles name
+tree (descending only into Kids whose Limits cover the file name), the
+file specification and the embedded file stream. The document is opened
+without pushing inherited attributes down to every page, which is what
+makes a plain Pdf.open cost time proportional to the page count. Pages
+and content streams are never loaded.
+
+The XML is returned as bytes or as a parsed lxml tree; nothing is
+written to disk. extract_many() spreads a large list of PDFs over worker
+processes.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+
+import pikepdf
+from lxml import etree
+from pikepdf import Name, Pdf
+
+from facturxapp.utils.pdf_io import open_pdf
+from .embedding import FACTURX_FILENAME, find_facturx_filespec
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+Source = Union[str, Path, bytes, bytearray, memoryview]
+
+
+class Extraction(NamedTuple):
+    """Outcome of extracting the XML of one PDF."""
+    path: Path
+    xml: Optional[bytes]
+    error: Optional[str] = None
+
+
+def open_lazily(source: Source, io_mode: Optional[str] = None) -> Pdf:
+    """Open a PDF so that only the objects actually accessed are read."""
+    return open_pdf(source, io_mode, inherit_page_attributes=False)
+
+
+def extract_facturx(source: Source,
+                    filename: str = FACTURX_FILENAME,
+                    io_mode: Optional[str] = None) -> Optional[bytes]:
+    """
+    Return the decoded content of the embedded factur-x.xml.
+
+    Args:
+        source: PDF as bytes, or a path to it
+        filename (str): Attachment to extract, e.g. "ZUGFeRD-invoice.xml"
+            for older ZUGFeRD invoices
+        io_mode (Optional[str]): How a file is read (see IO_MODES)
+
+    Returns:
+        Optional[bytes]: The XML, or None if the PDF has no such attachment
+    """
+    with open_lazily(source, io_mode) as pdf:
+        filespec = find_facturx_filespec(pdf, filename)
+        if not isinstance(filespec, pikepdf.Dictionary):
+            return None
+        ef = filespec.get(Name.EF)
+        if not isinstance(ef, pikepdf.Dictionary):
+            return None
+        stream = ef.get(Name.F, ef.get(Name.UF))
+        if not isinstance(stream, pikepdf.Stream):
+            return None
+        return stream.read_bytes()
+
+
+def extract_facturx_tree(source: Source, filename: str = FACTURX_FILENAME) -> Optional[etree._Element]:
+    """
+    Return the embedded factur-x.xml parsed with lxml.
+
+    Entities are not resolved and nothing is fetched from the network.
+
+    Raises:
+        lxml.etree.XMLSyntaxError: If the attachment is not well-formed XML
+    """
+    xml = extract_facturx(source, filename)
+    if xml is None:
+        return None
+    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    return etree.fromstring(xml, parser)
+
+
+def _extract(path: Path) -> Extraction:
+    try:
+        return Extraction(path, extract_facturx(path))
+    except Exception as e:
+        return Extraction(path, None, str(e))
+
+
+def extract_many(paths: Iterable[Union[str, Path]],
+                 max_workers: Optional[int] = None,
+                 chunksize: int = 64) -> Iterator[Extraction]:
+    """
+    Extract the factur-x.xml of many PDFs in worker processes.
+
+    A PDF that cannot be read yields an Extraction with the error instead
+    of stopping the scan.
+
+    Args:
+        paths: PDFs to read
+        max_workers (Optional[int]): Worker processes. Defaults to the CPU count.
+        chunksize (int): PDFs handed to a worker at a time
+
+    Returns:
+        Iterator[Extraction]: One result per PDF, in input order
+    """
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+        for result in executor.map(_extract, map(Path, paths), chunksize=chunksize):
+            if result.error is not None:
+                logger.warning(f"Extracting the XML of {result.path} failed: {result.error}")
+            yield result
@@ -3,9 +3,10 @@ import os
 import traceback
 from pathlib import Path
 from typing import Dict, Any, Optional
-from facturx import generate_facturx_from_binary
+from .embedding import embed_facturx
 from .pdfa_service import PDFAService
 from .xml_service import XMLService
+from facturxapp.validators.invoice_preflight import check_invoice
 
 # Configure logging
 logging.basicConfig(
@@ -17,17 +18,21 @@ logger = logging.getLogger(__name__)
 class FacturXService:
     """Service for embedding Factur-X XML into PDF/A-3B documents."""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", save_profile: Optional[str] = None,
+                 io_mode: Optional[str] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.pdfa_service = PDFAService(output_dir=output_dir)
+        self.save_profile = save_profile
+        self.io_mode = io_mode
+        self.pdfa_service = PDFAService(output_dir=output_dir, save_profile=save_profile, io_mode=io_mode)
         self.xml_service = XMLService(output_dir=output_dir)
         logger.info(f"Factur-X service initialized with output directory: {self.output_dir}")
     
     def embed_facturx(self,
                      input_pdf: Path,
                      invoice_data: Dict[str, Any],
-                     output_pdf: Optional[Path] = None) -> Path:
+                     output_pdf: Optional[Path] = None,
+                     incremental: bool = False) -> Path:
         """
         Embed Factur-X XML into a PDF/A-3B document.
         
@@ -35,9 +40,13 @@ class FacturXService:
             input_pdf (Path): Path to the input PDF/A-3B file
             invoice_data (Dict[str, Any]): Invoice data dictionary
             output_pdf (Optional[Path]): Path for the output PDF file. If None, will use input filename with _facturx suffix
+            incremental (bool): Append the attachment to a copy of the input instead of rewriting it
             
         Returns:
             Path: Path to the generated Factur-X PDF
+            
+        Raises:
+            PreflightError: If the invoice data fails the pre-flight checks
         """
         if not input_pdf.exists():
             raise FileNotFoundError(f"Input PDF not found: {input_pdf}")
@@ -45,30 +54,18 @@ class FacturXService:
         if output_pdf is None:
             output_pdf = self.output_dir / "output_facturx.pdf"
         
+        # Reject malformed invoice data before any XML or PDF work
+        check_invoice(invoice_data, profile="EN16931", layout="service")
+        
         try:
             logger.info("Starting Factur-X embedding")
             
             # First generate the XML file
             xml_path = self.xml_service.generate_facturx_xml(invoice_data)
 
-            # Read the XML file as a string and remove encoding declaration
-            with open(xml_path, 'r', encoding='utf-8') as f:
-                xml_string = f.read()
-            if xml_string.startswith('<?xml'):
-                xml_string = xml_string.split('?>', 1)[1].strip()
-
-            # Read the input PDF as bytes
-            with open(input_pdf, 'rb') as f:
-                pdf_bytes = f.read()
-
-            # Generate Factur-X PDF with embedded XML
-            output_pdf_bytes = generate_facturx_from_binary(
-                pdf_bytes,
-                xml_string,
-                facturx_level="EN16931"
-            )
-            with open(output_pdf, "wb") as f:
-                f.write(output_pdf_bytes)
+            # Attach it with the AF array, name tree entry and XMP in one pass
+            embed_facturx(input_pdf, xml_path, output_pdf, profile="EN16931", incremental=incremental,
+                          save_profile=self.save_profile, io_mode=self.io_mode)
 
             if os.path.exists(output_pdf):
                 print("✅ Factur-X embedding successful.")
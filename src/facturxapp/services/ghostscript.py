@@ -0,0 +1,274 @@
+"""Ghostscript command lines and version lookup shared by the PDF/A services."""
+
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+GS_EXECUTABLE = "gs"
+
+# Flags used by PDFAService for PDF/A-3B conversion and validation
+PDFA3B_ARGS = (
+    '-dPDFA=3',
+    '-dBATCH',
+    '-dNOPAUSE',
+    '-sProcessColorModel=DeviceRGB',
+    '-sDEVICE=pdfwrite',
+    '-dPDFACompatibilityPolicy=1',
+    '-dPDFAValidation=1',
+    '-sPDFAValidationProfile=PDF/A-3B',
+)
+
+# Default deadline for a single Ghostscript run, in seconds
+GS_TIMEOUT = 300.0
+
+# Reduced flag set used when the full conversion fails
+MINIMAL_PDFA3B_ARGS = (
+    '-dPDFA=3',
+    '-dBATCH',
+    '-dNOPAUSE',
+    '-sDEVICE=pdfwrite',
+    '-dPDFACompatibilityPolicy=1',
+)
+
+
+_CPU_COUNT = os.cpu_count() or 1
+
+# Named Ghostscript tuning profiles. The threading and band-buffer settings
+# only matter when Ghostscript rasterizes (e.g. flattening transparency or
+# rendering Type3 fonts); for plain pdfwrite pass-through they are neutral.
+#   default     - Ghostscript defaults
+#   throughput  - many concurrent instances: one rendering thread each and
+#                 moderate buffers, so N instances can share N cores
+#   latency     - few large documents: all cores for rendering, big buffers
+#   low-memory  - small band buffers for memory-constrained containers
+GS_TUNING_PROFILES = {
+    "default": (),
+    "throughput": (
+        '-dNumRenderingThreads=1',
+        '-dBufferSpace=64000000',
+        '-dMaxBitmap=10000000',
+    ),
+    "latency": (
+        f'-dNumRenderingThreads={_CPU_COUNT}',
+        '-dBufferSpace=500000000',
+        '-dMaxBitmap=500000000',
+    ),
+    "low-memory": (
+        '-dNumRenderingThreads=1',
+        '-dBufferSpace=4000000',
+        '-dMaxBitmap=0',
+    ),
+}
+
+
+# Named presets for image handling, trading output size against speed
+#   fast      - images pass through untouched: no resampling, JPEG and
+#               JPEG 2000 streams copied as they are, no duplicate detection
+#   archive   - colour and grey images downsampled to 150 dpi and
+#               re-encoded as JPEG, duplicate images stored once; smallest
+#               output, slowest per image megabyte
+#   lossless  - no downsampling; JPEGs pass through and every other image
+#               is Flate-compressed, so no new generation loss is added
+GS_PRESETS = {
+    "fast": (
+        '-dPassThroughJPEGImages=true',
+        '-dPassThroughJPXImages=true',
+        '-dDownsampleColorImages=false',
+        '-dDownsampleGrayImages=false',
+        '-dDownsampleMonoImages=false',
+        '-dDetectDuplicateImages=false',
+        '-dAutoRotatePages=/None',
+    ),
+    "archive": (
+        '-dDownsampleColorImages=true',
+        '-dColorImageDownsampleType=/Bicubic',
+        '-dColorImageResolution=150',
+        '-dDownsampleGrayImages=true',
+        '-dGrayImageDownsampleType=/Bicubic',
+        '-dGrayImageResolution=150',
+        '-dDownsampleMonoImages=true',
+        '-dMonoImageResolution=300',
+        '-dAutoFilterColorImages=false',
+        '-dColorImageFilter=/DCTEncode',
+        '-dAutoFilterGrayImages=false',
+        '-dGrayImageFilter=/DCTEncode',
+        '-dJPEGQ=80',
+        '-dDetectDuplicateImages=true',
+        '-dAutoRotatePages=/None',
+    ),
+    "lossless": (
+        '-dPassThroughJPEGImages=true',
+        '-dPassThroughJPXImages=true',
+        '-dDownsampleColorImages=false',
+        '-dDownsampleGrayImages=false',
+        '-dDownsampleMonoImages=false',
+        '-dAutoFilterColorImages=false',
+        '-dColorImageFilter=/FlateEncode',
+        '-dAutoFilterGrayImages=false',
+        '-dGrayImageFilter=/FlateEncode',
+        '-dDetectDuplicateImages=true',
+        '-dAutoRotatePages=/None',
+    ),
+}
+
+# Presets used for the Ghostscript strategies chosen by pdf_analyzer
+GS_STRATEGY_ARGS = {
+    "gs-light": GS_PRESETS["fast"],
+    "gs-full": GS_PRESETS["archive"],
+}
+
+
+def preset_args(preset: str) -> Tuple[str, ...]:
+    """Return the Ghostscript flags for a named preset."""
+    try:
+        return GS_PRESETS[preset]
+    except KeyError:
+        raise ValueError(f"Unknown conversion preset: {preset}") from None
+
+
+def tuning_args(profile: str) -> Tuple[str, ...]:
+    """Return the Ghostscript flags for a named tuning profile."""
+    try:
+        return GS_TUNING_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown Ghostscript tuning profile: {profile}") from None
+
+
+@lru_cache(maxsize=None)
+def ghostscript_version(executable: str = GS_EXECUTABLE) -> Optional[str]:
+    """
+    Return the Ghostscript version string, or None if it is not installed.
+
+    The lookup runs `gs --version` once per process and is cached.
+    """
+    if shutil.which(executable) is None:
+        return None
+    try:
+        result = subprocess.run([executable, '--version'],
+                                capture_output=True,
+                                text=True,
+                                check=True)
+    except (subprocess.SubprocessError, OSError):
+        return None
+    return result.stdout.strip()
+
+
+def build_pdfa3b_command(input_pdf: Union[str, Path],
+                         output_pdf: Union[str, Path],
+                         base_args: Sequence[str] = PDFA3B_ARGS,
+                         extra_args: Sequence[str] = ()) -> List[str]:
+    """
+    Build a Ghostscript argv for PDF/A-3B conversion.
+
+    The first element is the executable name, so the list can be passed to
+    subprocess or to the in-process ghostscript module unchanged.
+    """
+    return [
+        GS_EXECUTABLE,
+        *base_args,
+        *extra_args,
+        f'-sOutputFile={output_pdf}',
+        str(input_pdf),
+    ]
+
+
+# Keep Ghostscript's own messages off stdout when stdout carries the PDF
+PIPE_OUTPUT_ARGS = ('-q', '-sstdout=%stderr')
+
+
+def convert_pdf_bytes(pdf_bytes: bytes,
+                      base_args: Sequence[str] = PDFA3B_ARGS,
+                      extra_args: Sequence[str] = (),
+                      timeout: Optional[float] = GS_TIMEOUT) -> bytes:
+    """
+    Run a Ghostscript conversion from bytes to bytes without temp files.
+
+    On Linux the input is placed in an anonymous memfd that Ghostscript
+    opens through /dev/fd, so it can seek the PDF as usual. Elsewhere the
+    input is piped through stdin, which Ghostscript spools internally.
+    The output is read from stdout (-sOutputFile=-).
+
+    Args:
+        pdf_bytes (bytes): Input PDF
+        base_args (Sequence[str]): Ghostscript flag set to use
+        extra_args (Sequence[str]): Additional Ghostscript flags
+        timeout (Optional[float]): Deadline in seconds
+
+    Returns:
+        bytes: The converted PDF
+
+    Raises:
+        subprocess.CalledProcessError: If Ghostscript fails
+        subprocess.TimeoutExpired: If the deadline passes
+    """
+    extra_args = (*PIPE_OUTPUT_ARGS, *extra_args)
+    if hasattr(os, 'memfd_create'):
+        fd = os.memfd_create('input.pdf', os.MFD_CLOEXEC)
+        try:
+            with os.fdopen(os.dup(fd), 'wb') as memfile:
+                memfile.write(pdf_bytes)
+            command = build_pdfa3b_command(f'/dev/fd/{fd}', '-', base_args, extra_args)
+            result = subprocess.run(command,
+                                    capture_output=True,
+                                    check=True,
+                                    timeout=timeout,
+                                    pass_fds=(fd,))
+        finally:
+            os.close(fd)
+    else:
+        command = build_pdfa3b_command('-', '-', base_args, extra_args)
+        result = subprocess.run(command,
+                                input=pdf_bytes,
+                                capture_output=True,
+                                check=True,
+                                timeout=timeout)
+    return result.stdout
+
+
+async def run_ghostscript_async(command: Sequence[str],
+                                timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """
+    Run a Ghostscript command without blocking the event loop.
+
+    The process is started in its own session. If the deadline passes or
+    the awaiting task is cancelled, the whole process group is killed and
+    reaped before the exception propagates, so no orphan keeps a core busy.
+
+    Args:
+        command (Sequence[str]): Ghostscript argv, executable first
+        timeout (Optional[float]): Deadline in seconds, None for no deadline
+
+    Returns:
+        Tuple[int, str, str]: Return code, stdout and stderr
+
+    Raises:
+        TimeoutError: If the deadline passes
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except BaseException:
+        # Timeout or cancellation: kill the process group, then reap it
+        if process.returncode is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await process.wait()
+        raise
+    return (process.returncode,
+            stdout.decode('utf-8', 'replace'),
+            stderr.decode('utf-8', 'replace'))
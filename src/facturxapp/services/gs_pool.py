@@ -0,0 +1,111 @@
+import io
+import logging
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .ghostscript import PDFA3B_ARGS, build_pdfa3b_command
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Ghostscript module loaded once in each worker process
+_worker_gs = None
+
+
+def _init_worker() -> None:
+    """Load libgs into the worker process once, before the first job.
+
+    Only the shared library is kept; the interpreter itself is created
+    and initialised again for every job (see _run_job).
+    """
+    global _worker_gs
+    import ghostscript
+    _worker_gs = ghostscript
+
+
+def _run_job(argv: List[str]) -> Tuple[bool, str]:
+    """Run one Ghostscript job on a new interpreter instance in this worker."""
+    stdout = io.BytesIO()
+    stderr = io.BytesIO()
+    try:
+        # A fresh instance per job: interpreter, font map and ICC setup are
+        # paid on every job, only process start and library loading are saved.
+        # Reusing one instance would need OutputFile changed between jobs,
+        # which -dSAFER locks.
+        with _worker_gs.Ghostscript(*argv, stdout=stdout, stderr=stderr):
+            pass
+        return True, stderr.getvalue().decode('utf-8', 'replace')
+    except Exception as e:
+        messages = stderr.getvalue().decode('utf-8', 'replace')
+        return False, f"{e}\n{messages}".strip()
+
+
+class GhostscriptPool:
+    """
+    Pool of worker processes that keep the Ghostscript library loaded.
+
+    The workers are not warm interpreters: each job still starts a new
+    Ghostscript instance, so the saving over a gs subprocess is the
+    process start and the dynamic loading of libgs, nothing more.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            max_workers (Optional[int]): Number of worker processes. Defaults to the CPU count.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             initializer=_init_worker)
+        logger.info(f"Ghostscript pool started with {self.max_workers} workers")
+
+    def submit(self, argv: Sequence[str]) -> Future:
+        """Submit a raw Ghostscript argv; the future resolves to (success, messages)."""
+        return self._executor.submit(_run_job, list(argv))
+
+    def run(self, argv: Sequence[str]) -> Tuple[bool, str]:
+        """Run a raw Ghostscript argv and wait for the result."""
+        return self.submit(argv).result()
+
+    def convert_to_pdfa3b(self,
+                          input_pdf: Path,
+                          output_pdf: Path,
+                          base_args: Sequence[str] = PDFA3B_ARGS,
+                          extra_args: Sequence[str] = ()) -> bool:
+        """
+        Convert a PDF to PDF/A-3B on one of the pool workers.
+
+        Args:
+            input_pdf (Path): Path to the input PDF file
+            output_pdf (Path): Path for the output PDF file
+            base_args (Sequence[str]): Ghostscript flag set to use
+            extra_args (Sequence[str]): Additional Ghostscript flags
+
+        Returns:
+            bool: True if Ghostscript completed successfully
+        """
+        argv = build_pdfa3b_command(input_pdf, output_pdf, base_args, extra_args)
+        success, messages = self.run(argv)
+        if success:
+            logger.info(f"Pooled PDF/A-3B conversion completed: {output_pdf}")
+        else:
+            logger.error(f"Pooled PDF/A-3B conversion failed: {messages}")
+        return success
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
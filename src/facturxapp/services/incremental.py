@@ -0,0 +1,446 @@
+"""
+Incremental updates: append changed objects instead of rewriting a PDF.
+
+pikepdf (QPDF) always writes a complete new file. For small changes to
+large documents, such as attaching a few kilobytes of XML to a 50 MB
+scan, an incremental update is much cheaper. The original bytes are
+kept as they are. The changed and new objects, a new cross-reference
+section and a trailer pointing back to the previous one (/Prev) are
+appended. The cost is proportional to the size of the change.
+
+Usage:
+
+    with Pdf.open(path) as pdf:
+        update = IncrementalUpdate(pdf)
+        ...modify pdf...
+        update.write(path, path)
+
+The cross-reference section matches the style of the original: a
+classic xref table after a table, an xref stream after a stream.
+"""
+
+import hashlib
+import io
+import os
+import re
+import shutil
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+# Bytes at the end of a file searched for the startxref keyword
+_TAIL_BYTES = 2048
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+# Read size when copying file-backed streams
+STREAM_CHUNK = 1 << 20
+
+ObjGen = Tuple[int, int]
+
+
+def _read_tail(source: Union[str, Path, bytes]) -> Tuple[int, bytes]:
+    """Return the size of the original and its last bytes."""
+    if isinstance(source, bytes):
+        return len(source), source[-_TAIL_BYTES:]
+    with open(source, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - _TAIL_BYTES))
+        return size, f.read()
+
+
+def _read_at(source: Union[str, Path, bytes], offset: int, length: int) -> bytes:
+    if isinstance(source, bytes):
+        return source[offset:offset + length]
+    with open(source, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def _name_tree_objects(node, found: List[pikepdf.Object]) -> None:
+    """Collect the indirect nodes and arrays of a name tree, not its values."""
+    if not isinstance(node, pikepdf.Dictionary):
+        return
+    if node.is_indirect:
+        found.append(node)
+    for key in (Name.Names, Name.Kids, Name.Limits):
+        array = node.get(key)
+        if array is not None and array.is_indirect:
+            found.append(array)
+    for kid in node.get(Name.Kids, ()):
+        _name_tree_objects(kid, found)
+
+
+def _catalog_objects(pdf: Pdf) -> List[pikepdf.Object]:
+    """Objects that catalog-level edits (attachments, AF, metadata, Info) may touch."""
+    found = [pdf.Root]
+    names = pdf.Root.get(Name.Names)
+    if names is not None:
+        if names.is_indirect:
+            found.append(names)
+        _name_tree_objects(names.get(Name.EmbeddedFiles), found)
+    af = pdf.Root.get(Name.AF)
+    if af is not None and af.is_indirect:
+        found.append(af)
+    info = pdf.trailer.get(Name.Info)
+    if info is not None and info.is_indirect:
+        found.append(info)
+    return found
+
+
+def _serialize(obj: pikepdf.Object) -> bytes:
+    """The body of an indirect object, between 'N G obj' and 'endobj'."""
+    if isinstance(obj, pikepdf.Stream):
+        data = obj.read_raw_bytes()
+        obj.stream_dict[Name.Length] = len(data)
+        return obj.stream_dict.unparse(resolved=True) + b"\nstream\n" + data + b"\nendstream"
+    return obj.unparse(resolved=True)
+
+
+def _references(obj: pikepdf.Object, found: List[pikepdf.Object]) -> None:
+    """Collect the indirect objects directly referenced by obj."""
+    if isinstance(obj, pikepdf.Stream):
+        items = obj.stream_dict.values()
+    elif isinstance(obj, pikepdf.Dictionary):
+        items = obj.values()
+    elif isinstance(obj, pikepdf.Array):
+        items = obj
+    else:
+        return
+    for item in items:
+        if not isinstance(item, pikepdf.Object):
+            continue
+        if item.is_indirect:
+            found.append(item)
+        else:
+            _references(item, found)
+
+
+class IncrementalUpdate:
+    """
+    Records the state of a document so its later changes can be appended.
+
+    Objects that existed when the update was created are written again
+    only if they are watched and their serialization changed. The catalog,
+    the Names dictionary, the EmbeddedFiles name tree, the AF array and the
+    Info dictionary are always watched. Objects created afterwards are
+    written if they can be reached from a written object or the trailer.
+    """
+
+    def __init__(self, pdf: Pdf, watch: Iterable[pikepdf.Object] = (), keep_id: bool = True):
+        """
+        Initialize the update.
+
+        Args:
+            pdf (Pdf): Document opened from the bytes or file the update will extend
+            watch (Iterable[pikepdf.Object]): Further existing indirect objects the
+                caller is about to modify, e.g. an embedded file stream
+            keep_id (bool): Keep the permanent first trailer ID. Pass False when
+                the result is a new document, e.g. a copy of a template
+        """
+        if pdf.is_encrypted:
+            raise ValueError("Incremental updates of encrypted PDFs are not supported")
+        self.pdf = pdf
+        self.original_size = int(pdf.trailer.Size)
+        # QPDF reuses free numbers below /Size, so new objects are told apart
+        # by their number and generation, not by a number past the original
+        with pikepdf.explicit_conversion():
+            # Scalars would otherwise come back as Python values without objgen
+            self._existing = {obj.objgen for obj in pdf.objects}
+        self.keep_id = keep_id
+        self._snapshots: Dict[ObjGen, bytes] = {}
+        self._watched: Dict[ObjGen, pikepdf.Object] = {}
+        self._file_streams: Dict[ObjGen, _FileStream] = {}
+        for obj in [*_catalog_objects(pdf), *watch]:
+            self._watch(obj)
+
+    def _is_new(self, obj: pikepdf.Object) -> bool:
+        return obj.objgen not in self._existing
+
+    def _watch(self, obj: pikepdf.Object) -> None:
+        if obj.objgen not in self._watched:
+            self._watched[obj.objgen] = obj
+            self._snapshots[obj.objgen] = _fingerprint(obj)
+
+    def changed_objects(self) -> List[pikepdf.Object]:
+        """Watched objects that changed plus every new object they reach."""
+        # Objects reachable from the catalog after the edit may have been
+        # replaced by new ones; pick up any existing ones newly in the tree
+        for obj in _catalog_objects(self.pdf):
+            if not self._is_new(obj) and obj.objgen not in self._watched:
+                self._watched[obj.objgen] = obj
+        changed = [obj for objgen, obj in self._watched.items()
+                   if self._snapshots.get(objgen) != _fingerprint(obj)]
+        # A new Info dictionary is only reachable from the trailer
+        info = self.pdf.trailer.get(Name.Info)
+        if info is not None and info.is_indirect and self._is_new(info):
+            changed.append(info)
+
+        result: Dict[ObjGen, pikepdf.Object] = {}
+        pending = list(changed)
+        while pending:
+            obj = pending.pop()
+            if obj.objgen in result:
+                continue
+            result[obj.objgen] = obj
+            references: List[pikepdf.Object] = []
+            _references(obj, references)
+            pending.extend(ref for ref in references if self._is_new(ref))
+        return [result[key] for key in sorted(result)]
+
+    def stream_from_file(self, stream: pikepdf.Stream, path: Union[str, Path], compress: bool = True) -> None:
+        """
+        Take the data of a new stream from a file when the update is written.
+
+        The file is copied in chunks of STREAM_CHUNK bytes, Flate-compressed
+        on the way if compress is set, so memory use does not grow with its
+        size. The stream's /Length is written as an indirect object after
+        the data. For an embedded file stream, Size and CheckSum are computed
+        during the copy and its /Params is written after the data as well.
+
+        Args:
+            stream (pikepdf.Stream): A stream created after the update, e.g. with
+                pdf.make_stream(b"")
+            path: File holding the stream data
+            compress (bool): Flate-compress the data
+        """
+        if not self._is_new(stream):
+            raise ValueError("Only new streams can take their data from a file")
+        self._file_streams[stream.objgen] = _FileStream(Path(path), compress)
+
+    def serialize(self, base_size: int, tail: bytes, source: Union[str, Path, bytes]) -> bytes:
+        """
+        Build the bytes to append to the original.
+
+        Args:
+            base_size (int): Size of the original in bytes
+            tail (bytes): Last bytes of the original, to find the previous xref
+            source: The original, to tell an xref table from an xref stream
+
+        Returns:
+            bytes: Objects, cross-reference section and trailer
+        """
+        buffer = io.BytesIO()
+        self._append(buffer, base_size, tail, source)
+        return buffer.getvalue()
+
+    def _append(self, out: BinaryIO, base_size: int, tail: bytes, source: Union[str, Path, bytes]) -> None:
+        """Write the update to out, which is positioned at the end of the original."""
+        match = None
+        for match in _STARTXREF.finditer(tail):
+            pass
+        if match is None:
+            raise ValueError("No startxref found; the PDF is damaged")
+        prev = int(match.group(1))
+        uses_xref_stream = not _read_at(source, prev, 4).startswith(b"xref")
+
+        writer = _CountingWriter(out, base_size)
+        if not tail.endswith((b"\n", b"\r")):
+            writer.write(b"\n")
+
+        offsets: Dict[int, Tuple[int, int]] = {}
+        changed = self.changed_objects()
+        next_number = max([self.original_size, *(obj.objgen[0] + 1 for obj in changed)])
+        for obj in changed:
+            number, generation = obj.objgen
+            offsets[number] = (writer.offset, generation)
+            file_stream = self._file_streams.get(obj.objgen)
+            if file_stream is None:
+                writer.write(b"%d %d obj\n" % (number, generation) + _serialize(obj) + b"\nendobj\n")
+                continue
+            next_number, objects = self._write_file_stream(writer, obj, file_stream, next_number)
+            # Objects deferred until the stream's size and checksum were known
+            for deferred_number, body in objects:
+                offsets[deferred_number] = (writer.offset, 0)
+                writer.write(b"%d 0 obj\n" % deferred_number + body + b"\nendobj\n")
+
+        size = next_number
+        trailer = pikepdf.Dictionary(Size=size, Root=self.pdf.Root, Prev=prev)
+        if Name.Info in self.pdf.trailer:
+            trailer[Name.Info] = self.pdf.trailer.Info
+        trailer[Name.ID] = self._document_id(writer.digest())
+
+        xref_offset = writer.offset
+        if uses_xref_stream:
+            offsets[size] = (xref_offset, 0)
+            trailer[Name.Size] = size + 1
+            writer.write(_xref_stream(size, offsets, trailer))
+        else:
+            writer.write(_xref_table(offsets) + b"trailer\n" + trailer.unparse() + b"\n")
+        writer.write(b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+
+    def _write_file_stream(self, writer: "_CountingWriter", stream: pikepdf.Stream,
+                           file_stream: "_FileStream", next_number: int) -> Tuple[int, List[Tuple[int, bytes]]]:
+        """Copy a file into a stream object; return the next free number and the deferred objects."""
+        number, generation = stream.objgen
+        length_number = next_number
+        next_number += 1
+        stream_dict = pikepdf.Dictionary(stream.stream_dict)
+        for key in (Name.Length, Name.Filter, Name.DecodeParms):
+            if key in stream_dict:
+                del stream_dict[key]
+        if file_stream.compress:
+            stream_dict[Name.Filter] = Name.FlateDecode
+        params_number = None
+        params = stream_dict.get(Name.Params)
+        if stream_dict.get(Name.Type) == Name.EmbeddedFile:
+            params_number = next_number
+            next_number += 1
+            params = pikepdf.Dictionary(params if params is not None else {})
+            del stream_dict[Name.Params]
+
+        # Indirect references to objects pikepdf doesn't know about are
+        # spliced into the serialized dictionary before its closing >>
+        head = stream_dict.unparse(resolved=True)[:-2].rstrip()
+        head += b" /Length %d 0 R" % length_number
+        if params_number is not None:
+            head += b" /Params %d 0 R" % params_number
+        writer.write(b"%d %d obj\n" % (number, generation) + head + b" >>\nstream\n")
+
+        start = writer.offset
+        checksum = hashlib.md5()
+        size = 0
+        compressor = zlib.compressobj() if file_stream.compress else None
+        with open(file_stream.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(STREAM_CHUNK), b""):
+                checksum.update(chunk)
+                size += len(chunk)
+                writer.write(compressor.compress(chunk) if compressor else chunk)
+        if compressor:
+            writer.write(compressor.flush())
+        length = writer.offset - start
+        writer.write(b"\nendstream\nendobj\n")
+
+        objects = [(length_number, b"%d" % length)]
+        if params_number is not None:
+            params[Name.Size] = size
+            params[Name.CheckSum] = pikepdf.String(checksum.digest())
+            objects.append((params_number, params.unparse(resolved=True)))
+        return next_number, objects
+
+    def _document_id(self, digest: bytes) -> pikepdf.Array:
+        """Keep the permanent first ID, change the second one as PDF requires."""
+        original = self.pdf.trailer.get(Name.ID)
+        changing = pikepdf.String(digest)
+        if self.keep_id and original is not None and len(original) == 2:
+            return pikepdf.Array([original[0], changing])
+        return pikepdf.Array([changing, changing])
+
+    def write(self,
+              source: Union[str, Path, bytes],
+              output: Union[str, Path, BinaryIO, None] = None) -> Optional[bytes]:
+        """
+        Append the changes to the original.
+
+        Args:
+            source: The original the document was opened from, as a path or bytes
+            output: Path or binary file object for the result. A path equal to
+                source is appended to in place; another path gets a copy of the
+                original first. If None the result is returned.
+
+        Returns:
+            Optional[bytes]: The updated PDF if no output was given, else None
+        """
+        base_size, tail = _read_tail(source)
+        if output is None:
+            buffer = io.BytesIO()
+            self._copy_original(source, buffer)
+            self._append(buffer, base_size, tail, source)
+            return buffer.getvalue()
+        if isinstance(output, (str, Path)):
+            if isinstance(source, bytes) or Path(output).resolve() != Path(source).resolve():
+                with open(output, 'wb') as f:
+                    self._copy_original(source, f)
+                    self._append(f, base_size, tail, source)
+            else:
+                with open(output, 'ab') as f:
+                    try:
+                        self._append(f, base_size, tail, source)
+                    except BaseException:
+                        # Leave the original as it was rather than a torn update
+                        f.truncate(base_size)
+                        raise
+            return None
+        self._copy_original(source, output)
+        self._append(output, base_size, tail, source)
+        return None
+
+    @staticmethod
+    def _copy_original(source: Union[str, Path, bytes], out: BinaryIO) -> None:
+        if isinstance(source, bytes):
+            out.write(source)
+        else:
+            with open(source, 'rb') as f:
+                shutil.copyfileobj(f, out)
+
+
+class _FileStream(NamedTuple):
+    path: Path
+    compress: bool
+
+
+class _CountingWriter:
+    """Tracks the file offset and a digest of everything written."""
+
+    def __init__(self, out: BinaryIO, offset: int):
+        self.out = out
+        self.offset = offset
+        self._md5 = hashlib.md5()
+
+    def write(self, data: bytes) -> None:
+        self.out.write(data)
+        self.offset += len(data)
+        self._md5.update(data)
+
+    def digest(self) -> bytes:
+        return self._md5.digest()
+
+
+def _fingerprint(obj: pikepdf.Object) -> bytes:
+    if isinstance(obj, pikepdf.Stream):
+        return obj.stream_dict.unparse(resolved=True) + hashlib.sha256(obj.read_raw_bytes()).digest()
+    return obj.unparse(resolved=True)
+
+
+def _subsections(numbers: Iterable[int]) -> List[Tuple[int, int]]:
+    """Group object numbers into (first, count) runs."""
+    runs: List[Tuple[int, int]] = []
+    for number in sorted(numbers):
+        if runs and runs[-1][0] + runs[-1][1] == number:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((number, 1))
+    return runs
+
+
+def _xref_table(offsets: Dict[int, Tuple[int, int]]) -> bytes:
+    lines = [b"xref\n"]
+    for first, count in _subsections(offsets):
+        lines.append(b"%d %d\n" % (first, count))
+        for number in range(first, first + count):
+            offset, generation = offsets[number]
+            lines.append(b"%010d %05d n \n" % (offset, generation))
+    return b"".join(lines)
+
+
+def _xref_stream(number: int, offsets: Dict[int, Tuple[int, int]], trailer: pikepdf.Dictionary) -> bytes:
+    """An xref stream object: type 1 entries with 4-byte offsets and 2-byte generations."""
+    rows: List[bytes] = []
+    index: List[int] = []
+    for first, count in _subsections(offsets):
+        index.extend((first, count))
+        for entry in range(first, first + count):
+            offset, generation = offsets[entry]
+            rows.append(b"\x01" + offset.to_bytes(4, "big") + generation.to_bytes(2, "big"))
+    data = zlib.compress(b"".join(rows))
+    stream_dict = pikepdf.Dictionary(trailer)
+    stream_dict[Name.Type] = Name.XRef
+    stream_dict[Name.W] = pikepdf.Array([1, 4, 2])
+    stream_dict[Name.Index] = pikepdf.Array(index)
+    stream_dict[Name.Filter] = Name.FlateDecode
+    stream_dict[Name.Length] = len(data)
+    return (b"%d 0 obj\n" % number + stream_dict.unparse() + b"\nstream\n" + data
+            + b"\nendstream\nendobj\n")
+
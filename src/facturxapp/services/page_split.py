@@ -0,0 +1,185 @@
+import hashlib
+import logging
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+from facturxapp.utils.pdf_io import open_pdf
+from facturxapp.utils.pdfa import make_pdfa3b
+from facturxapp.utils.save_profiles import save_pdf
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Resource categories whose entries are shared between pages
+_SHARED_RESOURCE_KEYS = (Name.Font, Name.XObject, Name.ColorSpace, Name.ExtGState, Name.Pattern, Name.Shading)
+
+
+def split_pdf(input_pdf: Union[str, Path], chunk_dir: Union[str, Path], pages_per_chunk: int) -> List[Path]:
+    """
+    Split a PDF into page ranges, one file per range.
+
+    Only pages and the resources they use are carried over; document-level
+    structures such as outlines or attachments are not.
+
+    Args:
+        input_pdf: PDF to split
+        chunk_dir: Directory for the chunk files
+        pages_per_chunk (int): Pages in each chunk (the last may have fewer)
+
+    Returns:
+        List[Path]: Chunk files in page order
+    """
+    if pages_per_chunk < 1:
+        raise ValueError("pages_per_chunk must be at least 1")
+    chunk_dir = Path(chunk_dir)
+    chunks = []
+    with open_pdf(input_pdf) as source:
+        page_count = len(source.pages)
+        for index, start in enumerate(range(0, page_count, pages_per_chunk)):
+            chunk_path = chunk_dir / f"chunk_{index:05d}.pdf"
+            with Pdf.new() as chunk:
+                chunk.pages.extend(source.pages[start:start + pages_per_chunk])
+                chunk.docinfo = chunk.copy_foreign(source.docinfo)
+                chunk.save(chunk_path)
+            chunks.append(chunk_path)
+    logger.info(f"Split {input_pdf} ({page_count} pages) into {len(chunks)} chunks")
+    return chunks
+
+
+def _digest(obj, memo: Dict[Tuple[int, int], bytes]) -> bytes:
+    """Structural hash of an object, following references; streams hash their raw data."""
+    if isinstance(obj, (pikepdf.Dictionary, pikepdf.Array, pikepdf.Stream)) and obj.is_indirect:
+        key = obj.objgen
+        if key in memo:
+            return memo[key]
+        # Placeholder breaks reference cycles
+        memo[key] = b"cycle"
+    else:
+        key = None
+
+    digest = hashlib.sha256()
+    if isinstance(obj, pikepdf.Stream):
+        digest.update(b"stream")
+        for name, value in sorted(obj.items()):
+            if name != "/Length":
+                digest.update(name.encode())
+                digest.update(_digest(value, memo))
+        digest.update(obj.read_raw_bytes())
+    elif isinstance(obj, pikepdf.Dictionary):
+        digest.update(b"dict")
+        for name, value in sorted(obj.items()):
+            digest.update(name.encode())
+            digest.update(_digest(value, memo))
+    elif isinstance(obj, pikepdf.Array):
+        digest.update(b"array")
+        for value in obj:
+            digest.update(_digest(value, memo))
+    elif isinstance(obj, pikepdf.Object):
+        digest.update(obj.unparse())
+    else:
+        # Numbers and booleans come back as Python values
+        digest.update(f"{type(obj).__name__}:{obj}".encode())
+    result = digest.digest()
+    if key is not None:
+        memo[key] = result
+    return result
+
+
+def _share_streams(obj,
+                   canonical: Dict[bytes, pikepdf.Object],
+                   memo: Dict[Tuple[int, int], bytes],
+                   seen: set) -> int:
+    """Point references to streams below obj at the first identical stream seen."""
+    if obj.is_indirect:
+        if obj.objgen in seen:
+            return 0
+        seen.add(obj.objgen)
+    items = list(obj.items()) if isinstance(obj, (pikepdf.Dictionary, pikepdf.Stream)) else list(enumerate(obj))
+    replaced = 0
+    for key, value in items:
+        if isinstance(value, pikepdf.Stream) and value.is_indirect:
+            first = canonical.setdefault(_digest(value, memo), value)
+            if first.objgen != value.objgen:
+                obj[key] = first
+                replaced += 1
+                continue
+        if isinstance(value, (pikepdf.Dictionary, pikepdf.Array, pikepdf.Stream)):
+            replaced += _share_streams(value, canonical, memo, seen)
+    return replaced
+
+
+def dedupe_resources(pdf: Pdf) -> int:
+    """
+    Point identical page resources (fonts, images, ICC profiles, ...) at one object.
+
+    Whole resources are shared first. Then every stream below the page
+    resources is shared with an identical one, so an ICC profile, font
+    program or image nested in resources that differ elsewhere (e.g. two
+    font dictionaries around the same FontFile2) is still stored once.
+    Font subsets that Ghostscript made separately for each chunk contain
+    different glyphs and are not identical, so they are all kept.
+    Objects left unreferenced are dropped when the PDF is saved.
+
+    Returns:
+        int: Number of references redirected
+    """
+    memo: Dict[Tuple[int, int], bytes] = {}
+    canonical: Dict[bytes, pikepdf.Object] = {}
+    replaced = 0
+    for page in pdf.pages:
+        resources = page.obj.get(Name.Resources)
+        if not isinstance(resources, pikepdf.Dictionary):
+            continue
+        for category in _SHARED_RESOURCE_KEYS:
+            entries = resources.get(category)
+            if not isinstance(entries, pikepdf.Dictionary):
+                continue
+            for name, value in list(entries.items()):
+                if not value.is_indirect:
+                    continue
+                first = canonical.setdefault(_digest(value, memo), value)
+                if first.objgen != value.objgen:
+                    entries[name] = first
+                    replaced += 1
+    streams: Dict[bytes, pikepdf.Object] = {}
+    seen: set = set()
+    for page in pdf.pages:
+        resources = page.obj.get(Name.Resources)
+        if isinstance(resources, (pikepdf.Dictionary, pikepdf.Array)):
+            replaced += _share_streams(resources, streams, memo, seen)
+    return replaced
+
+
+def merge_pdfa_chunks(chunks: Sequence[Union[str, Path]],
+                      output_pdf: Union[str, Path],
+                      save_profile: Optional[str] = None) -> int:
+    """
+    Concatenate converted chunks into one PDF/A-3B document.
+
+    Identical resources are deduplicated across chunks, and the document
+    gets a single OutputIntent and XMP packet. Document information comes
+    from the first chunk. save_profile selects how the result is written
+    (see SAVE_PROFILES).
+
+    Returns:
+        int: Number of resource references deduplicated
+    """
+    with ExitStack() as stack, Pdf.new() as merged:
+        for index, chunk_path in enumerate(chunks):
+            chunk = stack.enter_context(open_pdf(chunk_path))
+            if index == 0:
+                merged.docinfo = merged.copy_foreign(chunk.docinfo)
+            merged.pages.extend(chunk.pages)
+        replaced = dedupe_resources(merged)
+        make_pdfa3b(merged)
+        save_pdf(merged, output_pdf, save_profile)
+    logger.info(f"Merged {len(chunks)} chunks into {output_pdf}, {replaced} shared resources deduplicated")
+    return replaced
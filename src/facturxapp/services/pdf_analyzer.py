@@ -0,0 +1,197 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, NamedTuple, Set, Tuple, Union
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+from facturxapp.utils.pdf_io import open_pdf
+from facturxapp.utils.pdfa import can_repair
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+# Conversion strategies, cheapest first
+STRATEGY_SKIP = "skip"
+STRATEGY_REPAIR = "repair"
+STRATEGY_GS_LIGHT = "gs-light"
+STRATEGY_GS_FULL = "gs-full"
+
+# Raw image data above which the full pass recompresses images
+RECOMPRESS_IMAGE_BYTES = 20 * 1024 * 1024
+
+# Rough costs in seconds for one Ghostscript process on one core. They are
+# meant for ranking and scheduling work, not as a latency promise.
+COST_MODEL = {
+    "skip": 0.001,
+    "repair": 0.01,
+    "repair_page": 0.0005,
+    "gs_startup": 0.15,
+    "gs_page": 0.01,
+    "gs_image_mb": 0.02,
+    "gs_recompress_image_mb": 0.1,
+    "gs_transparent_page": 0.05,
+    "gs_type3_font": 0.02,
+}
+
+_BLEND_MODES_NORMAL = (Name.Normal, Name.Compatible)
+
+
+class PDFProfile(NamedTuple):
+    """What the pre-scan found in a PDF."""
+    page_count: int
+    image_count: int
+    image_bytes: int
+    font_types: Dict[str, int]
+    transparent_pages: int
+    findings: Tuple[str, ...]
+    repairable: bool
+
+    @property
+    def is_pdfa(self) -> bool:
+        return not self.findings
+
+
+class ConversionPlan(NamedTuple):
+    """Strategy chosen for a PDF and its estimated cost in seconds."""
+    strategy: str
+    cost: float
+    reason: str
+
+
+class _ResourceScan:
+    """Accumulates image, font and transparency facts over resource dictionaries."""
+
+    def __init__(self):
+        self.seen: Set[Tuple[int, int]] = set()
+        self.image_count = 0
+        self.image_bytes = 0
+        self.font_types: Counter = Counter()
+
+    def _first_visit(self, obj) -> bool:
+        if not obj.is_indirect:
+            return True
+        if obj.objgen in self.seen:
+            return False
+        self.seen.add(obj.objgen)
+        return True
+
+    def scan(self, resources) -> bool:
+        """Scan a resource dictionary; return True if it uses transparency."""
+        if not isinstance(resources, pikepdf.Dictionary):
+            return False
+        transparent = False
+
+        fonts = resources.get(Name.Font)
+        if isinstance(fonts, pikepdf.Dictionary):
+            for font in fonts.values():
+                if self._first_visit(font):
+                    self.font_types[str(font.get(Name.Subtype, "/Unknown")).lstrip("/")] += 1
+
+        ext_gstates = resources.get(Name.ExtGState)
+        if isinstance(ext_gstates, pikepdf.Dictionary):
+            for gstate in ext_gstates.values():
+                transparent = transparent or _gstate_is_transparent(gstate)
+
+        xobjects = resources.get(Name.XObject)
+        if isinstance(xobjects, pikepdf.Dictionary):
+            for xobject in xobjects.values():
+                subtype = xobject.get(Name.Subtype)
+                if subtype == Name.Image:
+                    if Name.SMask in xobject or Name.SMaskInData in xobject:
+                        transparent = True
+                    if self._first_visit(xobject):
+                        self.image_count += 1
+                        # Encoded size from the dictionary; nothing is decoded.
+                        # Streams created in memory have no Length yet.
+                        length = xobject.get(Name.Length)
+                        self.image_bytes += int(length) if length is not None else len(xobject.read_raw_bytes())
+                elif subtype == Name.Form:
+                    group = xobject.get(Name.Group)
+                    if group is not None and group.get(Name.S) == Name.Transparency:
+                        transparent = True
+                    if self._first_visit(xobject):
+                        transparent = self.scan(xobject.get(Name.Resources)) or transparent
+        return transparent
+
+
+def _gstate_is_transparent(gstate) -> bool:
+    smask = gstate.get(Name.SMask)
+    if smask is not None and smask != Name("/None"):
+        return True
+    blend_mode = gstate.get(Name.BM)
+    if blend_mode is not None and blend_mode not in _BLEND_MODES_NORMAL:
+        return True
+    for key in (Name.CA, Name.ca):
+        alpha = gstate.get(key)
+        if alpha is not None and float(alpha) < 1.0:
+            return True
+    return False
+
+
+def _analyze(pdf: Pdf) -> PDFProfile:
+    scan = _ResourceScan()
+    transparent_pages = 0
+    for page in pdf.pages:
+        group = page.obj.get(Name.Group)
+        page_transparent = group is not None and group.get(Name.S) == Name.Transparency
+        # Page-level and resource-level transparency both count once per page
+        if scan.scan(page.obj.get(Name.Resources)) or page_transparent:
+            transparent_pages += 1
+
+    codes = tuple(sorted({finding.code for finding in check_pdfa3b(pdf)}))
+    repairable = bool(codes) and can_repair(pdf, codes)
+    return PDFProfile(
+        page_count=len(pdf.pages),
+        image_count=scan.image_count,
+        image_bytes=scan.image_bytes,
+        font_types=dict(scan.font_types),
+        transparent_pages=transparent_pages,
+        findings=codes,
+        repairable=repairable,
+    )
+
+
+def analyze_pdf(source: Union[str, Path, Pdf]) -> PDFProfile:
+    """
+    Pre-scan a PDF without rendering it.
+
+    Only object dictionaries are read; page content is parsed only when a
+    repair needs to rule out DeviceCMYK painting.
+
+    Args:
+        source: Path to the PDF, or an already opened pikepdf.Pdf
+
+    Returns:
+        PDFProfile: Page count, images, fonts, transparency and PDF/A findings
+    """
+    if isinstance(source, Pdf):
+        return _analyze(source)
+    with open_pdf(source) as pdf:
+        return _analyze(pdf)
+
+
+def plan_conversion(profile: PDFProfile) -> ConversionPlan:
+    """
+    Choose the cheapest conversion strategy for a profiled PDF.
+
+    Args:
+        profile (PDFProfile): Result of analyze_pdf
+
+    Returns:
+        ConversionPlan: Strategy, estimated cost in seconds and the reason
+    """
+    if profile.is_pdfa:
+        return ConversionPlan(STRATEGY_SKIP, COST_MODEL["skip"], "already PDF/A-3B")
+    if profile.repairable:
+        cost = COST_MODEL["repair"] + COST_MODEL["repair_page"] * profile.page_count
+        return ConversionPlan(STRATEGY_REPAIR, cost, "only metadata-level findings")
+
+    image_mb = profile.image_bytes / (1024 * 1024)
+    cost = (COST_MODEL["gs_startup"]
+            + COST_MODEL["gs_page"] * profile.page_count
+            + COST_MODEL["gs_transparent_page"] * profile.transparent_pages
+            + COST_MODEL["gs_type3_font"] * profile.font_types.get("Type3", 0))
+    if profile.image_bytes > RECOMPRESS_IMAGE_BYTES:
+        cost += COST_MODEL["gs_recompress_image_mb"] * image_mb
+        return ConversionPlan(STRATEGY_GS_FULL, cost, f"{image_mb:.0f} MB of images to recompress")
+    cost += COST_MODEL["gs_image_mb"] * image_mb
+    return ConversionPlan(STRATEGY_GS_LIGHT, cost, "content-level findings: " + ", ".join(profile.findings))
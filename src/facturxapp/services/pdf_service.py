@@ -1,8 +1,15 @@
+import io
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, Optional
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
+from facturxapp.utils.pdf_io import open_pdf
+from facturxapp.utils.pdfa import make_pdfa3b
+from facturxapp.utils.save_profiles import save_options, save_pdf
 
 # Configure logging
 logging.basicConfig(
@@ -11,24 +18,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# PDF/A forbids non-embedded fonts, so use the Bitstream Vera TrueType fonts
+# shipped with reportlab; reportlab embeds a subset of each.
+FONT_REGULAR = "Vera"
+FONT_BOLD = "VeraBd"
+
+@lru_cache(maxsize=None)
+def _register_fonts() -> None:
+    """Register the embeddable invoice fonts with reportlab once per process."""
+    pdfmetrics.registerFont(TTFont(FONT_REGULAR, "Vera.ttf"))
+    pdfmetrics.registerFont(TTFont(FONT_BOLD, "VeraBd.ttf"))
+
 class PDFService:
     """Service for handling PDF generation and manipulation."""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", save_profile: Optional[str] = None):
         """
         Initialize the PDF service.
         
         Args:
             output_dir (str): Directory where generated PDFs will be saved
+            save_profile (Optional[str]): How generated PDFs are written (see SAVE_PROFILES)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.save_profile = save_profile
+        save_options(save_profile)
         logger.info(f"PDF service initialized with output directory: {self.output_dir}")
     
     def generate_invoice(self, invoice_data: Dict[str, Any]) -> Path:
         """
         Generate a basic invoice PDF.
         
+        The PDF is written as PDF/A-3B directly (embedded subset fonts, sRGB
+        OutputIntent, XMP pdfaid and document ID), so it does not need a
+        Ghostscript conversion before Factur-X embedding.
+        
         Args:
             invoice_data (Dict[str, Any]): Invoice data dictionary
             
@@ -37,14 +62,16 @@ class PDFService:
         """
         logger.info("Starting invoice PDF generation")
         pdf_path = self.output_dir / f"invoice_{invoice_data.get('invoice_number', 'test')}.pdf"
-        c = canvas.Canvas(str(pdf_path), pagesize=A4)
+        _register_fonts()
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=A4, initialFontName=FONT_REGULAR)
         width, height = A4
         y = height - 50
         
         # Seller Information
-        c.setFont("Helvetica-Bold", 16)
+        c.setFont(FONT_BOLD, 16)
         c.drawString(50, y, invoice_data['seller']['name'])
-        c.setFont("Helvetica", 12)
+        c.setFont(FONT_REGULAR, 12)
         y -= 20
         c.drawString(50, y, invoice_data['seller']['address']['line1'])
         y -= 15
@@ -57,9 +84,9 @@ class PDFService:
         
         # Buyer Information
         y -= 40
-        c.setFont("Helvetica-Bold", 12)
+        c.setFont(FONT_BOLD, 12)
         c.drawString(50, y, "Invoice to:")
-        c.setFont("Helvetica", 12)
+        c.setFont(FONT_REGULAR, 12)
         y -= 15
         c.drawString(50, y, invoice_data['buyer']['name'])
         y -= 15
@@ -71,10 +98,10 @@ class PDFService:
         
         # Invoice Details
         y -= 40
-        c.setFont("Helvetica-Bold", 12)
+        c.setFont(FONT_BOLD, 12)
         c.drawString(50, y, f"Invoice #: {invoice_data['invoice_number']}")
         y -= 15
-        c.setFont("Helvetica", 12)
+        c.setFont(FONT_REGULAR, 12)
         c.drawString(50, y, f"Date: {invoice_data['invoice_date']}")
         y -= 15
         c.drawString(50, y, f"Due Date: {invoice_data['due_date']}")
@@ -83,14 +110,14 @@ class PDFService:
         
         # Line Items
         y -= 40
-        c.setFont("Helvetica-Bold", 12)
+        c.setFont(FONT_BOLD, 12)
         c.drawString(50, y, "Description")
         c.drawString(250, y, "Quantity")
         c.drawString(320, y, "Unit Price")
         c.drawString(410, y, "Tax %")
         c.drawString(470, y, "Line Total")
         y -= 18
-        c.setFont("Helvetica", 12)
+        c.setFont(FONT_REGULAR, 12)
         subtotal = 0.0
         total_tax = 0.0
         for item in invoice_data.get('items', []):
@@ -110,22 +137,27 @@ class PDFService:
         
         # Totals
         y -= 20
-        c.setFont("Helvetica-Bold", 12)
+        c.setFont(FONT_BOLD, 12)
         c.drawString(350, y, "Subtotal:")
-        c.setFont("Helvetica", 12)
+        c.setFont(FONT_REGULAR, 12)
         c.drawRightString(550, y, f"{subtotal:.2f}")
         y -= 15
-        c.setFont("Helvetica-Bold", 12)
+        c.setFont(FONT_BOLD, 12)
         c.drawString(350, y, "Tax:")
-        c.setFont("Helvetica", 12)
+        c.setFont(FONT_REGULAR, 12)
         c.drawRightString(550, y, f"{total_tax:.2f}")
         y -= 15
-        c.setFont("Helvetica-Bold", 12)
+        c.setFont(FONT_BOLD, 12)
         c.drawString(350, y, "Total:")
-        c.setFont("Helvetica", 12)
+        c.setFont(FONT_REGULAR, 12)
         c.drawRightString(550, y, f"{(subtotal + total_tax):.2f}")
         
         c.showPage()
         c.save()
+        
+        # Read through a view of reportlab's output instead of a copy
+        with open_pdf(buffer.getbuffer()) as pdf:
+            make_pdfa3b(pdf)
+            save_pdf(pdf, pdf_path, self.save_profile)
         logger.info(f"Invoice PDF generated at {pdf_path}")
         return pdf_path 
\ No newline at end of file
@@ -0,0 +1,211 @@
+import io
+import logging
+import shutil
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Type
+
+import pikepdf
+
+from facturxapp.utils.pdf_io import open_pdf, write_pdf
+from facturxapp.utils.pdfa import add_srgb_output_intent, can_repair, repair_pdfa3b
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+from .ghostscript import GS_TIMEOUT, PDFA3B_ARGS, build_pdfa3b_command
+from .gs_pool import GhostscriptPool
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def finalize_ghostscript_output(output_pdf: Path) -> None:
+    """Add the sRGB OutputIntent Ghostscript leaves out without a PDFA_def.ps."""
+    with open_pdf(output_pdf) as pdf:
+        if not pdf.Root.get(pikepdf.Name.OutputIntents):
+            add_srgb_output_intent(pdf)
+            write_pdf(pdf, output_pdf)
+
+
+class PDFABackend(ABC):
+    """A way of turning one PDF file into a PDF/A-3B file."""
+
+    name = "abstract"
+
+    def __init__(self, base_args: Sequence[str] = PDFA3B_ARGS):
+        """
+        Initialize the backend.
+
+        Args:
+            base_args (Sequence[str]): Ghostscript flag set; ignored by non-Ghostscript backends
+        """
+        self.base_args = tuple(base_args)
+
+    @abstractmethod
+    def convert(self, input_pdf: Path, output_pdf: Path, extra_args: Sequence[str] = ()) -> bool:
+        """
+        Convert input_pdf to PDF/A-3B at output_pdf.
+
+        Args:
+            input_pdf (Path): Path to the input PDF file
+            output_pdf (Path): Path for the output PDF file
+            extra_args (Sequence[str]): Additional Ghostscript flags
+
+        Returns:
+            bool: True if the backend produced an output file
+        """
+
+    def params(self, extra_args: Sequence[str] = ()) -> Tuple[str, ...]:
+        """Parameters that determine the output bytes, for cache keys."""
+        return self.base_args + tuple(extra_args)
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GhostscriptCLIBackend(PDFABackend):
+    """Runs one `gs` subprocess per conversion."""
+
+    name = "gs-cli"
+
+    def __init__(self, base_args: Sequence[str] = PDFA3B_ARGS, timeout: Optional[float] = GS_TIMEOUT):
+        super().__init__(base_args)
+        self.timeout = timeout
+
+    def convert(self, input_pdf: Path, output_pdf: Path, extra_args: Sequence[str] = ()) -> bool:
+        gs_command = build_pdfa3b_command(input_pdf, output_pdf, self.base_args, extra_args)
+        try:
+            logger.info(f"Starting PDF/A-3B conversion: {' '.join(gs_command)}")
+            result = subprocess.run(gs_command,
+                                    capture_output=True,
+                                    text=True,
+                                    check=True,
+                                    timeout=self.timeout)
+            logger.info("PDF/A-3B conversion completed successfully")
+            logger.info(f"Ghostscript STDOUT:\n{result.stdout}")
+            logger.info(f"Ghostscript STDERR:\n{result.stderr}")
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logger.error(f"PDF/A-3B conversion failed: {str(e)}")
+            logger.error(f"Ghostscript STDOUT:\n{e.stdout}")
+            logger.error(f"Ghostscript STDERR:\n{e.stderr}")
+            return False
+        finalize_ghostscript_output(output_pdf)
+        return True
+
+
+class GhostscriptLibraryBackend(PDFABackend):
+    """
+    Calls libgs in the current process through the `ghostscript` module.
+
+    libgs allows one live instance per process, so conversions are
+    serialized; use GhostscriptPoolBackend for parallel in-process work.
+    """
+
+    name = "gs-lib"
+
+    _lock = threading.Lock()
+
+    def __init__(self, base_args: Sequence[str] = PDFA3B_ARGS):
+        super().__init__(base_args)
+        import ghostscript
+        self._ghostscript = ghostscript
+
+    def convert(self, input_pdf: Path, output_pdf: Path, extra_args: Sequence[str] = ()) -> bool:
+        argv = build_pdfa3b_command(input_pdf, output_pdf, self.base_args, extra_args)
+        stdout = io.BytesIO()
+        stderr = io.BytesIO()
+        try:
+            with self._lock:
+                with self._ghostscript.Ghostscript(*argv, stdout=stdout, stderr=stderr):
+                    pass
+        except Exception as e:
+            logger.error(f"In-process PDF/A-3B conversion failed: {e}\n"
+                         f"{stderr.getvalue().decode('utf-8', 'replace')}")
+            return False
+        finalize_ghostscript_output(output_pdf)
+        return True
+
+
+class GhostscriptPoolBackend(PDFABackend):
+    """Runs conversions on a GhostscriptPool: libgs stays loaded, each job gets a new instance."""
+
+    name = "gs-pool"
+
+    def __init__(self,
+                 base_args: Sequence[str] = PDFA3B_ARGS,
+                 pool: Optional[GhostscriptPool] = None,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            base_args (Sequence[str]): Ghostscript flag set
+            pool (Optional[GhostscriptPool]): Existing pool to use; it is not shut down by close()
+            max_workers (Optional[int]): Size of the pool to start when none is given
+        """
+        super().__init__(base_args)
+        self._owns_pool = pool is None
+        self.pool = pool or GhostscriptPool(max_workers=max_workers)
+
+    def convert(self, input_pdf: Path, output_pdf: Path, extra_args: Sequence[str] = ()) -> bool:
+        if not self.pool.convert_to_pdfa3b(input_pdf, output_pdf, self.base_args, extra_args):
+            return False
+        finalize_ghostscript_output(output_pdf)
+        return True
+
+    def close(self) -> None:
+        if self._owns_pool:
+            self.pool.shutdown()
+
+
+class PikepdfRepairBackend(PDFABackend):
+    """
+    Fixes metadata-level findings with pikepdf; never re-renders.
+
+    Inputs with content-level findings (unembedded fonts, JavaScript,
+    DeviceCMYK without an intent, ...) are reported as failures.
+    """
+
+    name = "repair"
+
+    def __init__(self, base_args: Sequence[str] = ()):
+        super().__init__(())
+
+    def convert(self, input_pdf: Path, output_pdf: Path, extra_args: Sequence[str] = ()) -> bool:
+        with open_pdf(input_pdf) as pdf:
+            codes = {finding.code for finding in check_pdfa3b(pdf)}
+            if not codes:
+                if Path(output_pdf).resolve() != Path(input_pdf).resolve():
+                    shutil.copyfile(input_pdf, output_pdf)
+                return True
+            if not can_repair(pdf, codes):
+                logger.info(f"Repair backend cannot fix {sorted(codes)}: {input_pdf}")
+                return False
+            repair_pdfa3b(pdf, codes)
+            write_pdf(pdf, output_pdf)
+        return True
+
+
+BACKENDS: Dict[str, Type[PDFABackend]] = {
+    backend.name: backend
+    for backend in (GhostscriptCLIBackend, GhostscriptLibraryBackend, GhostscriptPoolBackend, PikepdfRepairBackend)
+}
+
+
+def get_backend(name: str, **kwargs) -> PDFABackend:
+    """Create a backend by name (see BACKENDS)."""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown PDF/A backend: {name}") from None
+    return backend_class(**kwargs)
@@ -1,7 +1,51 @@
+import asyncio
+import io
 import logging
+import os
+import shutil
 import subprocess
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import pikepdf
+
+from facturxapp.utils.pdf_io import access_mode, open_pdf
+from facturxapp.utils.pdfa import add_srgb_output_intent, repair_pdfa3b
+from facturxapp.utils.save_profiles import save_options, save_pdf
+from facturxapp.validators.pdfa_checker import PDFAFinding, check_pdfa3b, is_pdfa3b
+from .conversion_cache import ConversionCache, sha256_file
+from .conversion_ladder import RUNG_FULL, RUNG_REPAIR, ConversionLadder
+from .ghostscript import (
+    GS_STRATEGY_ARGS,
+    GS_TIMEOUT,
+    MINIMAL_PDFA3B_ARGS,
+    build_pdfa3b_command,
+    convert_pdf_bytes,
+    ghostscript_version,
+    preset_args,
+    tuning_args,
+)
+from .gs_pool import GhostscriptPool
+from .pdfa_backends import (
+    GhostscriptCLIBackend,
+    GhostscriptPoolBackend,
+    PDFABackend,
+    finalize_ghostscript_output,
+)
+from .page_split import merge_pdfa_chunks, split_pdf
+from .pdf_analyzer import (
+    STRATEGY_GS_LIGHT,
+    STRATEGY_REPAIR,
+    STRATEGY_SKIP,
+    ConversionPlan,
+    PDFProfile,
+    analyze_pdf,
+    plan_conversion,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -10,12 +54,86 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Routes a conversion request can take, cheapest first
+ROUTE_SKIP = "skip"
+ROUTE_REPAIR = "repair"
+ROUTE_CACHE = "cache"
+ROUTE_GHOSTSCRIPT = "ghostscript"
+ROUTE_SPLIT = "split"
+
+# Page count above which convert_split runs ranges in parallel
+SPLIT_PAGES_PER_CHUNK = 200
+
+class PDFAConversion(NamedTuple):
+    """Outcome of a PDF/A-3B conversion and the route that produced it."""
+    output_pdf: Path
+    is_valid: bool
+    route: str
+    # Ladder rung that produced the output, for conversions that used the ladder
+    rung: Optional[str] = None
+
 class PDFAService:
     """Service for handling PDF/A-3B conversion and validation."""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self,
+                 output_dir: str = "output",
+                 pool: Optional[GhostscriptPool] = None,
+                 backend: Optional[PDFABackend] = None,
+                 ladder: Optional[ConversionLadder] = None,
+                 cache: Optional[ConversionCache] = None,
+                 tuning: str = "default",
+                 preset: Optional[str] = None,
+                 timeout: Optional[float] = GS_TIMEOUT,
+                 max_concurrency: Optional[int] = None,
+                 save_profile: Optional[str] = None,
+                 io_mode: Optional[str] = None):
+        """
+        Initialize the PDF/A service.
+        
+        Args:
+            output_dir (str): Directory where converted PDFs will be saved
+            pool (Optional[GhostscriptPool]): Run conversions on this pool of
+                in-process Ghostscript workers instead of spawning `gs`
+            backend (Optional[PDFABackend]): Backend for the Ghostscript step.
+                Defaults to the pool backend if a pool is given, else the CLI backend.
+            ladder (Optional[ConversionLadder]): Fallbacks tried in order when a
+                conversion fails. Defaults to the backend, then the minimal
+                Ghostscript command, then a metadata-only repair.
+            cache (Optional[ConversionCache]): Reuse results for byte-identical inputs
+            tuning (str): Default Ghostscript tuning profile (see GS_TUNING_PROFILES)
+            preset (Optional[str]): Default image preset (see GS_PRESETS). If None,
+                the preset follows the strategy the analyzer plans for each input.
+            timeout (Optional[float]): Deadline in seconds for each Ghostscript run
+            max_concurrency (Optional[int]): Concurrent Ghostscript runs allowed for the
+                async methods. Defaults to the CPU count.
+            save_profile (Optional[str]): How PDFs rewritten with pikepdf (repairs,
+                merged page ranges) are saved (see SAVE_PROFILES)
+            io_mode (Optional[str]): How input files are read with pikepdf (see IO_MODES)
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.pool = pool
+        if backend is None:
+            backend = (GhostscriptPoolBackend(pool=pool) if pool is not None
+                       else GhostscriptCLIBackend(timeout=timeout))
+        self.backend = backend
+        self.ladder = ladder or ConversionLadder.default(full_backend=backend)
+        self.cache = cache
+        self.tuning = tuning
+        tuning_args(tuning)
+        self.preset = preset
+        if preset is not None:
+            preset_args(preset)
+        self.save_profile = save_profile
+        save_options(save_profile)
+        self.io_mode = io_mode
+        access_mode(io_mode)
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        # Counts of how each conversion request was served
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
         logger.info(f"PDF/A service initialized with output directory: {self.output_dir}")
         
         # Check Ghostscript installation
@@ -24,109 +142,499 @@ class PDFAService:
     
     def _check_ghostscript(self) -> bool:
         """Check if Ghostscript is installed and accessible."""
-        try:
-            result = subprocess.run(['gs', '--version'], 
-                                 capture_output=True, 
-                                 text=True, 
-                                 check=True)
-            logger.info(f"Ghostscript version: {result.stdout.strip()}")
-            return True
-        except (subprocess.SubprocessError, FileNotFoundError):
+        # The version lookup is cached per process, so constructing many
+        # services does not spawn `gs --version` each time
+        version = ghostscript_version()
+        if version is None:
             logger.error("Ghostscript not found. Please install it first.")
             return False
+        logger.info(f"Ghostscript version: {version}")
+        return True
+    
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
     
     def convert_to_pdfa3b(self, 
                          input_pdf: Path, 
-                         output_pdf: Optional[Path] = None) -> Tuple[Path, bool]:
+                         output_pdf: Optional[Path] = None,
+                         tuning: Optional[str] = None,
+                         preset: Optional[str] = None) -> Tuple[Path, bool]:
         """
         Convert a PDF to PDF/A-3B format using Ghostscript.
         
+        Ghostscript is only used when needed; see convert() for the routes.
+        
         Args:
             input_pdf (Path): Path to the input PDF file
             output_pdf (Optional[Path]): Path for the output PDF file. If None, will use input filename with _pdfa3b suffix
+            tuning (Optional[str]): Ghostscript tuning profile, defaults to the service's
+            preset (Optional[str]): Image preset, defaults to the service's
             
         Returns:
             Tuple[Path, bool]: Path to the converted PDF and success status
         """
+        result = self.convert(input_pdf, output_pdf, tuning, preset)
+        return result.output_pdf, result.is_valid
+    
+    def convert(self,
+                input_pdf: Path,
+                output_pdf: Optional[Path] = None,
+                tuning: Optional[str] = None,
+                preset: Optional[str] = None) -> PDFAConversion:
+        """
+        Bring a PDF to PDF/A-3B by the cheapest route that works.
+        
+        The input is pre-scanned (see plan()). Inputs that already pass are
+        copied (skip). Inputs failing only on metadata-level findings are
+        fixed with pikepdf (repair). Everything else is re-rendered by
+        Ghostscript with the image preset given (or the one matching the
+        planned strategy), through the cache if configured. If Ghostscript
+        fails, the conversion ladder falls back to simpler rungs (see
+        ConversionLadder).
+        
+        Args:
+            input_pdf (Path): Path to the input PDF file
+            output_pdf (Optional[Path]): Path for the output PDF file. If None, will use input filename with _pdfa3b suffix
+            tuning (Optional[str]): Ghostscript tuning profile, defaults to the service's
+            preset (Optional[str]): Image preset, defaults to the service's
+            
+        Returns:
+            PDFAConversion: Output path, success status and route taken
+        """
         if not input_pdf.exists():
             raise FileNotFoundError(f"Input PDF not found: {input_pdf}")
         
         if output_pdf is None:
             output_pdf = self.output_dir / f"{input_pdf.stem}_pdfa3b{input_pdf.suffix}"
         
-        gs_command = [
-            'gs',
-            '-dPDFA=3',
-            '-dBATCH',
-            '-dNOPAUSE',
-            '-sProcessColorModel=DeviceRGB',
-            '-sDEVICE=pdfwrite',
-            '-dPDFACompatibilityPolicy=1',
-            '-dPDFAValidation=1',
-            '-sPDFAValidationProfile=PDF/A-3B',
-            f'-sOutputFile={output_pdf}',
-            str(input_pdf)
-        ]
+        profile, plan = self._analyze(input_pdf)
+        result = self._skip_or_repair(input_pdf, output_pdf, plan)
+        if result is not None:
+            return result
         
-        try:
-            logger.info(f"Starting PDF/A-3B conversion: {' '.join(gs_command)}")
-            result = subprocess.run(gs_command, 
-                                 capture_output=True, 
-                                 text=True, 
-                                 check=True)
-            logger.info("PDF/A-3B conversion completed successfully")
-            logger.info(f"Ghostscript STDOUT:\n{result.stdout}")
-            logger.info(f"Ghostscript STDERR:\n{result.stderr}")
+        extra_args = self._gs_args(plan, tuning, preset)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ConversionCache.make_key(sha256_file(input_pdf), ghostscript_version(),
+                                                 self.backend.params(extra_args))
+            if self.cache.get(cache_key, output_pdf):
+                self._count("cache_hit")
+                return PDFAConversion(output_pdf, self.validate_pdfa3b(output_pdf), ROUTE_CACHE)
+        
+        logger.info(f"Starting PDF/A-3B conversion with the {self.backend.name} backend")
+        rung = self.ladder.convert(input_pdf, output_pdf, profile, extra_args)
+        if rung is None:
+            logger.error(f"Every conversion rung failed for {input_pdf}")
+            return PDFAConversion(output_pdf, False, ROUTE_GHOSTSCRIPT)
+        
+        if rung != RUNG_FULL:
+            self._count("fallback")
+        # The ladder only reports success for outputs passing the checks
+        if rung == RUNG_REPAIR:
+            self._count("repaired")
+            route = ROUTE_REPAIR
+        else:
+            self._count("converted")
+            route = ROUTE_GHOSTSCRIPT
+        # The key describes the full command; fallback rungs drop its flags
+        if cache_key is not None and rung == RUNG_FULL:
+            self.cache.put(cache_key, output_pdf)
+        return PDFAConversion(output_pdf, True, route, rung)
+    
+    def plan(self, input_pdf: Path) -> ConversionPlan:
+        """
+        Pre-scan a PDF and choose its conversion strategy.
+        
+        The plan carries a cost estimate in seconds that schedulers can use
+        to order or batch work.
+        
+        Args:
+            input_pdf (Path): Path to the input PDF file
             
-            # Validate the converted PDF
-            is_valid = self.validate_pdfa3b(output_pdf)
-            return output_pdf, is_valid
+        Returns:
+            ConversionPlan: Strategy (skip, repair, gs-light, gs-full), cost and reason
+        """
+        return self._analyze(input_pdf)[1]
+    
+    def _analyze(self, input_pdf: Path) -> Tuple[PDFProfile, ConversionPlan]:
+        profile = analyze_pdf(input_pdf)
+        plan = plan_conversion(profile)
+        logger.info(f"Conversion plan for {input_pdf}: {plan.strategy} "
+                    f"(~{plan.cost:.2f}s, {plan.reason})")
+        return profile, plan
+    
+    def _gs_args(self, plan: ConversionPlan, tuning: Optional[str], preset: Optional[str]) -> Tuple[str, ...]:
+        """
+        Extra Ghostscript flags for a plan.
+        
+        An explicit preset wins over the planned strategy; a failed repair
+        falls back to gs-light.
+        """
+        preset = preset or self.preset
+        if preset is not None:
+            image_args = preset_args(preset)
+        else:
+            image_args = GS_STRATEGY_ARGS.get(plan.strategy, GS_STRATEGY_ARGS[STRATEGY_GS_LIGHT])
+        return tuning_args(tuning or self.tuning) + image_args
+    
+    def _skip_or_repair(self, input_pdf: Path, output_pdf: Path, plan: ConversionPlan) -> Optional[PDFAConversion]:
+        """
+        Serve a conversion without Ghostscript if the plan allows it.
+        
+        Returns:
+            Optional[PDFAConversion]: The result, or None if Ghostscript is needed
+        """
+        if plan.strategy == STRATEGY_SKIP:
+            # Fast path: inputs that already pass go straight to embedding
+            self._count("fast_path")
+            logger.info(f"Input is already PDF/A-3B, skipping conversion: {input_pdf}")
+            if Path(output_pdf).resolve() != input_pdf.resolve():
+                shutil.copyfile(input_pdf, output_pdf)
+            return PDFAConversion(output_pdf, True, ROUTE_SKIP)
+        if plan.strategy != STRATEGY_REPAIR:
+            return None
+        
+        with open_pdf(input_pdf, self.io_mode) as pdf:
+            codes = {finding.code for finding in check_pdfa3b(pdf)}
+            repair_pdfa3b(pdf, codes)
+            save_pdf(pdf, output_pdf, self.save_profile)
+        
+        remaining = check_pdfa3b(output_pdf)
+        if remaining:
+            logger.warning(f"Repair left findings {[f.code for f in remaining]}, using Ghostscript")
+            return None
+        self._count("repaired")
+        logger.info(f"Repaired {sorted(codes)} without re-rendering: {output_pdf}")
+        return PDFAConversion(output_pdf, True, ROUTE_REPAIR)
+    
+    def convert_bytes_to_pdfa3b(self,
+                                pdf_bytes: bytes,
+                                tuning: Optional[str] = None,
+                                preset: Optional[str] = None) -> Tuple[bytes, bool]:
+        """
+        Convert an in-memory PDF to PDF/A-3B without touching the filesystem.
+        
+        Ghostscript reads the input from a memfd (or stdin) and writes the
+        result to stdout; the OutputIntent post-processing and validation
+        also run in memory. The pool and the on-disk cache are not used.
+        
+        Args:
+            pdf_bytes (bytes): Input PDF
+            tuning (Optional[str]): Ghostscript tuning profile, defaults to the service's
+            preset (Optional[str]): Image preset, defaults to the service's
             
-        except subprocess.CalledProcessError as e:
+        Returns:
+            Tuple[bytes, bool]: Converted PDF (empty on failure) and success status
+        """
+        repaired = None
+        with open_pdf(pdf_bytes) as pdf:
+            profile = analyze_pdf(pdf)
+            plan = plan_conversion(profile)
+            if plan.strategy == STRATEGY_SKIP:
+                self._count("fast_path")
+                logger.info("Input bytes are already PDF/A-3B, skipping conversion")
+                return pdf_bytes, True
+            if plan.strategy == STRATEGY_REPAIR:
+                codes = profile.findings
+                repair_pdfa3b(pdf, codes)
+                buffer = io.BytesIO()
+                save_pdf(pdf, buffer, self.save_profile)
+                repaired = buffer.getvalue()
+        if repaired is not None:
+            with open_pdf(repaired) as pdf:
+                is_repaired = is_pdfa3b(pdf)
+            if is_repaired:
+                self._count("repaired")
+                logger.info(f"Repaired {sorted(codes)} without re-rendering")
+                return repaired, True
+        
+        extra_args = self._gs_args(plan, tuning, preset)
+        try:
+            logger.info("Starting in-memory PDF/A-3B conversion")
+            converted = convert_pdf_bytes(pdf_bytes, extra_args=extra_args, timeout=self.timeout)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             logger.error(f"PDF/A-3B conversion failed: {str(e)}")
-            logger.error(f"Ghostscript STDOUT:\n{e.stdout}")
-            logger.error(f"Ghostscript STDERR:\n{e.stderr}")
-            return output_pdf, False
+            logger.error(f"Ghostscript STDERR:\n{(e.stderr or b'').decode('utf-8', 'replace')}")
+            return b"", False
+        self._count("converted")
+        
+        with open_pdf(converted) as pdf:
+            if not pdf.Root.get(pikepdf.Name.OutputIntents):
+                add_srgb_output_intent(pdf)
+                buffer = io.BytesIO()
+                save_pdf(pdf, buffer, self.save_profile)
+                converted = buffer.getvalue()
+        with open_pdf(converted) as pdf:
+            findings = check_pdfa3b(pdf)
+        for finding in findings:
+            logger.warning(f"PDF/A-3B check failed [{finding.code}]: {finding.message}")
+        return converted, not findings
     
-    def validate_pdfa3b(self, pdf_path: Path) -> bool:
+    def convert_many(self,
+                     input_pdfs: Iterable[Path],
+                     max_workers: Optional[int] = None,
+                     tuning: str = "throughput",
+                     preset: Optional[str] = None) -> Iterator[Tuple[Path, Path, bool]]:
         """
-        Validate if a PDF is compliant with PDF/A-3B standard.
+        Convert many PDFs with a bounded number of concurrent Ghostscript instances.
+        
+        Results are yielded as soon as each conversion finishes, not in input
+        order. At most max_workers conversions run at once and at most twice
+        that many are queued, so arbitrarily long input iterables are fine.
+        
+        Args:
+            input_pdfs (Iterable[Path]): PDFs to convert
+            max_workers (Optional[int]): Concurrent conversions. Defaults to the CPU count.
+            tuning (str): Ghostscript tuning profile for every conversion
+            preset (Optional[str]): Image preset for every conversion, defaults to the service's
+            
+        Returns:
+            Iterator[Tuple[Path, Path, bool]]: (input, output, success) per document
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        tuning_args(tuning)
+        if preset is not None:
+            preset_args(preset)
+        inputs = iter(input_pdfs)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            
+            def submit_next() -> bool:
+                for input_pdf in inputs:
+                    input_pdf = Path(input_pdf)
+                    future = executor.submit(self.convert_to_pdfa3b, input_pdf, None, tuning, preset)
+                    pending[future] = input_pdf
+                    return True
+                return False
+            
+            for _ in range(max_workers * 2):
+                if not submit_next():
+                    break
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    input_pdf = pending.pop(future)
+                    try:
+                        output_pdf, success = future.result()
+                    except Exception as e:
+                        logger.error(f"PDF/A-3B conversion of {input_pdf} raised: {e}")
+                        output_pdf, success = self.output_dir / f"{input_pdf.stem}_pdfa3b{input_pdf.suffix}", False
+                    submit_next()
+                    yield input_pdf, output_pdf, success
+    
+    def convert_split(self,
+                      input_pdf: Path,
+                      output_pdf: Optional[Path] = None,
+                      pages_per_chunk: int = SPLIT_PAGES_PER_CHUNK,
+                      max_workers: Optional[int] = None,
+                      tuning: str = "throughput",
+                      preset: Optional[str] = None) -> PDFAConversion:
+        """
+        Convert a large PDF by converting page ranges in parallel.
+        
+        The document is split into ranges of pages_per_chunk pages with
+        pikepdf, each range is converted by its own Ghostscript process, and
+        the results are merged with identical fonts, images and ICC profiles
+        deduplicated. Ghostscript subsets fonts per range, so a font used in
+        several ranges is usually stored once per range. Documents no longer
+        than one range are converted
+        directly. Outlines and attachments of the input are not carried over.
+        
+        Args:
+            input_pdf (Path): Path to the input PDF file
+            output_pdf (Optional[Path]): Path for the output PDF file. If None, will use input filename with _pdfa3b suffix
+            pages_per_chunk (int): Pages per range
+            max_workers (Optional[int]): Ranges converted at once. Defaults to the CPU count.
+            tuning (str): Ghostscript tuning profile for every range
+            preset (Optional[str]): Image preset for every range, defaults to the service's
+            
+        Returns:
+            PDFAConversion: Output path, success status and route taken
+        """
+        if not input_pdf.exists():
+            raise FileNotFoundError(f"Input PDF not found: {input_pdf}")
+        
+        if output_pdf is None:
+            output_pdf = self.output_dir / f"{input_pdf.stem}_pdfa3b{input_pdf.suffix}"
+        
+        with open_pdf(input_pdf, self.io_mode) as pdf:
+            page_count = len(pdf.pages)
+        if page_count <= pages_per_chunk:
+            return self.convert(input_pdf, output_pdf, tuning, preset)
+        
+        max_workers = max_workers or os.cpu_count() or 1
+        with tempfile.TemporaryDirectory(dir=self.output_dir, prefix=".split-") as work_dir:
+            work_dir = Path(work_dir)
+            chunks = split_pdf(input_pdf, work_dir, pages_per_chunk)
+            converted = [work_dir / f"{chunk.stem}_pdfa3b.pdf" for chunk in chunks]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(
+                    lambda pair: self.convert(pair[0], pair[1], tuning, preset), zip(chunks, converted)))
+            failed = [chunk.name for chunk, result in zip(chunks, results) if not result.is_valid]
+            if failed:
+                logger.error(f"PDF/A-3B conversion failed for ranges: {', '.join(failed)}")
+                return PDFAConversion(output_pdf, False, ROUTE_SPLIT)
+            merge_pdfa_chunks(converted, output_pdf, self.save_profile)
+        
+        self._count("split")
+        return PDFAConversion(output_pdf, self.validate_pdfa3b(output_pdf), ROUTE_SPLIT)
+    
+    def _slots(self) -> asyncio.Semaphore:
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_concurrency)
+        return self._async_slots
+    
+    async def _in_slot(self, timeout: Optional[float], func, *args):
+        """
+        Run a blocking call in a thread under the concurrency limit and the deadline.
+        
+        The slot is taken before the deadline starts. A thread cannot be
+        interrupted, so on timeout or cancellation the call keeps its slot
+        until it returns; the Ghostscript run inside it is bounded by the
+        backend's own timeout.
+        """
+        slots = self._slots()
+        await slots.acquire()
+        try:
+            work = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        except BaseException:
+            slots.release()
+            raise
+        work.add_done_callback(lambda _: slots.release())
+        return await asyncio.wait_for(asyncio.shield(work), timeout)
+    
+    async def convert_to_pdfa3b_async(self,
+                                      input_pdf: Path,
+                                      output_pdf: Optional[Path] = None,
+                                      timeout: Optional[float] = None,
+                                      tuning: Optional[str] = None,
+                                      preset: Optional[str] = None) -> Tuple[Path, bool]:
+        """
+        Convert a PDF to PDF/A-3B without blocking the event loop.
+        
+        Runs convert() in a worker thread, so the planner, the skip and
+        repair routes, the cache, the backend and the conversion ladder all
+        apply as for synchronous calls. At most max_concurrency conversions
+        run at once across all async calls on this service. Waiting for a
+        slot does not count against the deadline. A conversion that times
+        out or is cancelled keeps its slot until the backend returns.
+        
+        Args:
+            input_pdf (Path): Path to the input PDF file
+            output_pdf (Optional[Path]): Path for the output PDF file. If None, will use input filename with _pdfa3b suffix
+            timeout (Optional[float]): Deadline in seconds, defaults to the service's
+            tuning (Optional[str]): Ghostscript tuning profile, defaults to the service's
+            preset (Optional[str]): Image preset, defaults to the service's
+            
+        Returns:
+            Tuple[Path, bool]: Path to the converted PDF and success status
+            
+        Raises:
+            TimeoutError: If the conversion does not finish before the deadline
+        """
+        if not input_pdf.exists():
+            raise FileNotFoundError(f"Input PDF not found: {input_pdf}")
+        
+        try:
+            result = await self._in_slot(self.timeout if timeout is None else timeout,
+                                         self.convert, input_pdf, output_pdf, tuning, preset)
+        except TimeoutError:
+            logger.error(f"PDF/A-3B conversion of {input_pdf} timed out")
+            raise
+        return result.output_pdf, result.is_valid
+    
+    async def validate_pdfa3b_async(self,
+                                    pdf_path: Path,
+                                    deep: bool = False,
+                                    timeout: Optional[float] = None) -> bool:
+        """
+        Validate a PDF/A-3B document without blocking the event loop.
+        
+        Runs validate_pdfa3b() in a worker thread under the same
+        concurrency limit as the async conversions.
         
         Args:
             pdf_path (Path): Path to the PDF file to validate
+            deep (bool): Also run the Ghostscript validation pass
+            timeout (Optional[float]): Deadline in seconds, defaults to the service's
             
         Returns:
             bool: True if the PDF is PDF/A-3B compliant, False otherwise
+            
+        Raises:
+            TimeoutError: If the validation does not finish before the deadline
+        """
+        return await self._in_slot(self.timeout if timeout is None else timeout,
+                                   self.validate_pdfa3b, pdf_path, deep)
+    
+    def _finalize_conversion(self, output_pdf: Path) -> bool:
+        """Add the OutputIntent Ghostscript leaves out and validate the result."""
+        # Ghostscript writes no OutputIntent unless given a PDFA_def.ps,
+        # so add the sRGB one here
+        finalize_ghostscript_output(output_pdf)
+        
+        # Validate the converted PDF
+        return self.validate_pdfa3b(output_pdf)
+    
+    def check_pdfa3b(self, pdf_path: Path) -> List[PDFAFinding]:
+        """
+        Run the structural PDF/A-3B checks on a PDF without re-rendering it.
+        
+        Args:
+            pdf_path (Path): Path to the PDF file to check
+            
+        Returns:
+            List[PDFAFinding]: Violations found, empty if the PDF passes
         """
         if not pdf_path.exists():
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        return check_pdfa3b(pdf_path)
+    
+    def validate_pdfa3b(self, pdf_path: Path, deep: bool = False) -> bool:
+        """
+        Validate if a PDF is compliant with PDF/A-3B standard.
+        
+        By default only the structural checks run, which take milliseconds.
+        With deep=True the document is also re-rendered through Ghostscript
+        with PDF/A validation enabled, which takes seconds.
         
-        gs_command = [
-            'gs',
-            '-dPDFA=3',
-            '-dBATCH',
-            '-dNOPAUSE',
-            '-sProcessColorModel=DeviceRGB',
-            '-sDEVICE=pdfwrite',
-            '-dPDFACompatibilityPolicy=1',
-            '-dPDFAValidation=1',
-            '-sPDFAValidationProfile=PDF/A-3B',
-            '-sOutputFile=/dev/null',
-            str(pdf_path)
-        ]
+        Args:
+            pdf_path (Path): Path to the PDF file to validate
+            deep (bool): Also run the Ghostscript validation pass
+            
+        Returns:
+            bool: True if the PDF is PDF/A-3B compliant, False otherwise
+        """
+        findings = self.check_pdfa3b(pdf_path)
+        for finding in findings:
+            logger.warning(f"PDF/A-3B check failed [{finding.code}]: {finding.message}")
+        if findings:
+            return False
+        logger.info(f"PDF/A-3B structural checks passed: {pdf_path}")
+        if not deep:
+            return True
+        return self._validate_with_ghostscript(pdf_path)
+    
+    def _validate_with_ghostscript(self, pdf_path: Path) -> bool:
+        """Re-render the PDF through Ghostscript with PDF/A validation enabled."""
+        gs_command = build_pdfa3b_command(pdf_path, '/dev/null')
         
         try:
             logger.info(f"Starting PDF/A-3B validation: {' '.join(gs_command)}")
             result = subprocess.run(gs_command, 
                                  capture_output=True, 
                                  text=True, 
-                                 check=True)
+                                 check=True,
+                                 timeout=self.timeout)
             logger.info("PDF/A-3B validation completed successfully")
             logger.info(f"Ghostscript STDOUT:\n{result.stdout}")
             logger.info(f"Ghostscript STDERR:\n{result.stderr}")
             return True
             
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             logger.error(f"PDF/A-3B validation failed: {str(e)}")
             logger.error(f"Ghostscript STDOUT:\n{e.stdout}")
             logger.error(f"Ghostscript STDERR:\n{e.stderr}")
@@ -140,24 +648,16 @@ class PDFAService:
             raise FileNotFoundError(f"Input PDF not found: {input_pdf}")
         if output_pdf is None:
             output_pdf = self.output_dir / f"{input_pdf.stem}_pdfa3b_minimal{input_pdf.suffix}"
-        gs_command = [
-            'gs',
-            '-dPDFA=3',
-            '-dBATCH',
-            '-dNOPAUSE',
-            '-sDEVICE=pdfwrite',
-            '-sOutputFile=' + str(output_pdf),
-            '-dPDFACompatibilityPolicy=1',
-            str(input_pdf)
-        ]
+        gs_command = build_pdfa3b_command(input_pdf, output_pdf, base_args=MINIMAL_PDFA3B_ARGS)
         try:
             logger.info(f"Starting minimal PDF/A-3B conversion: {' '.join(gs_command)}")
-            result = subprocess.run(gs_command, capture_output=True, text=True, check=True)
+            result = subprocess.run(gs_command, capture_output=True, text=True, check=True,
+                                    timeout=self.timeout)
             logger.info("Minimal PDF/A-3B conversion completed successfully")
             logger.info(f"Ghostscript STDOUT:\n{result.stdout}")
             logger.info(f"Ghostscript STDERR:\n{result.stderr}")
             return output_pdf, True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             logger.error(f"Minimal PDF/A-3B conversion failed: {str(e)}")
             logger.error(f"Ghostscript STDOUT:\n{e.stdout}")
             logger.error(f"Ghostscript STDERR:\n{e.stderr}")
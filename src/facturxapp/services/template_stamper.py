@@ -0,0 +1,172 @@
+"""
+Batch stamping of invoices onto a shared PDF/A-3B template.
+
+Statement runs produce thousands of invoices that share one base layout
+(letterhead, fonts, ICC profile). The TemplateStamper reads and checks
+the template once. Each invoice is then a clone of it: the template is
+opened from the cached bytes, the invoice's page content is overlaid and
+factur-x.xml is attached. The output is the template's bytes followed by
+an incremental update that holds only the per-invoice objects. The shared
+resources are never re-serialized, so the cost of one invoice does not
+depend on the size of the template.
+
+Usage:
+
+    stamper = TemplateStamper("letterhead_pdfa3b.pdf")
+    for overlay, xml, output in jobs:
+        stamper.stamp(overlay, xml, output)
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+from facturxapp.utils.pdf_io import open_pdf
+from facturxapp.utils.save_profiles import compresses_streams
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+from .embedding import CONFORMANCE_LEVELS, Source, attach_facturx
+from .incremental import IncrementalUpdate
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+Output = Union[str, Path, BinaryIO, None]
+
+
+def _page_objects(page: pikepdf.Page) -> List[pikepdf.Object]:
+    """Indirect objects an overlay modifies: the page, its contents and resources."""
+    found = [page.obj]
+    contents = page.obj.get(Name.Contents)
+    if contents is not None:
+        if contents.is_indirect:
+            found.append(contents)
+        if isinstance(contents, pikepdf.Array):
+            found.extend(stream for stream in contents if stream.is_indirect)
+    resources = page.obj.get(Name.Resources)
+    if resources is not None:
+        if resources.is_indirect:
+            found.append(resources)
+        found.extend(value for value in resources.values()
+                     if isinstance(value, pikepdf.Object) and value.is_indirect)
+    return found
+
+
+def _page_tree_objects(pdf: Pdf) -> List[pikepdf.Object]:
+    """The page tree root and its Kids array, which grow when pages are added."""
+    pages = pdf.Root.Pages
+    found = [pages]
+    if pages.Kids.is_indirect:
+        found.append(pages.Kids)
+    return found
+
+
+def _unshare_xobjects(page: pikepdf.Page) -> None:
+    """Give a copied page its own XObject dictionary so overlays don't leak between pages."""
+    resources = pikepdf.Dictionary(page.obj.get(Name.Resources, pikepdf.Dictionary()))
+    resources[Name.XObject] = pikepdf.Dictionary(resources.get(Name.XObject, pikepdf.Dictionary()))
+    page.obj[Name.Resources] = resources
+
+
+class TemplateStamper:
+    """Clones a PDF/A-3B template per invoice and adds its content and XML."""
+
+    def __init__(self, template: Source, profile: str = "EN16931", save_profile: Optional[str] = None):
+        """
+        Load and check the template.
+
+        Args:
+            template: The PDF/A-3B template as bytes, or a path to it
+            profile (str): Default Factur-X profile of the stamped invoices
+            save_profile (Optional[str]): Save settings (see SAVE_PROFILES). Outputs
+                are incremental updates, so only stream compression applies.
+
+        Raises:
+            ValueError: If the template is not PDF/A-3B or the profile is unknown
+        """
+        if profile not in CONFORMANCE_LEVELS:
+            raise ValueError(f"Unknown Factur-X profile: {profile}")
+        if isinstance(template, bytes):
+            self.template = template
+        else:
+            self.template = Path(template).read_bytes()
+        self.profile = profile
+        self.compress = compresses_streams(save_profile)
+        with open_pdf(self.template) as pdf:
+            findings = check_pdfa3b(pdf)
+            self.page_count = len(pdf.pages)
+        if findings:
+            codes = ", ".join(finding.code for finding in findings)
+            raise ValueError(f"Template is not PDF/A-3B: {codes}")
+        logger.info(f"Template loaded: {len(self.template)} bytes, {self.page_count} page(s)")
+
+    def stamp(self,
+              overlay: Optional[Source],
+              xml: Source,
+              output: Output = None,
+              profile: Optional[str] = None,
+              mod_date: Optional[datetime] = None) -> Optional[bytes]:
+        """
+        Produce one invoice from the template.
+
+        Overlay page i is drawn onto template page i. When the overlay has
+        more pages than the template, the last template page is repeated.
+        The overlay's fonts must be embedded, as PDF/A requires.
+
+        Args:
+            overlay: One- or multi-page PDF with the invoice content, as bytes
+                or a path; None attaches the XML to the bare template
+            xml: Factur-X XML as bytes, or a path to it
+            output: Path or binary file object to write to; if None the result is returned
+            profile (Optional[str]): Factur-X profile, defaults to the stamper's
+            mod_date (Optional[datetime]): Modification date of the XML, defaults to now
+
+        Returns:
+            Optional[bytes]: The invoice PDF if no output was given, else None
+        """
+        with open_pdf(self.template) as pdf:
+            watch = _page_tree_objects(pdf)
+            for page in pdf.pages:
+                watch.extend(_page_objects(page))
+            update = IncrementalUpdate(pdf, watch, keep_id=False)
+            if overlay is not None:
+                self._overlay(pdf, overlay)
+            attach_facturx(pdf, xml, profile or self.profile, mod_date, self.compress)
+            return update.write(self.template, output)
+
+    def _overlay(self, pdf: Pdf, overlay: Source) -> None:
+        with open_pdf(overlay) as content:
+            # Copy the blank last page before anything is drawn onto it
+            for _ in range(len(content.pages) - len(pdf.pages)):
+                pdf.pages.append(pdf.pages[self.page_count - 1])
+                _unshare_xobjects(pdf.pages[-1])
+            for page, content_page in zip(pdf.pages, content.pages):
+                page.add_overlay(content_page)
+
+    def stamp_many(self, jobs: Iterable[Tuple[Optional[Source], Source, Union[str, Path]]]) -> Tuple[int, int]:
+        """
+        Stamp a batch of invoices, continuing past failures.
+
+        Args:
+            jobs: (overlay, xml, output path) per invoice
+
+        Returns:
+            Tuple[int, int]: Number of invoices written and number that failed
+        """
+        written = failed = 0
+        for overlay, xml, output in jobs:
+            try:
+                self.stamp(overlay, xml, output)
+                written += 1
+            except Exception as e:
+                logger.error(f"Stamping {output} failed: {e}")
+                failed += 1
+        logger.info(f"Stamped {written} invoice(s), {failed} failed")
+        return written, failed
@@ -0,0 +1,79 @@
+"""
+Bulk correction of the embedded factur-x.xml across many invoices.
+
+Corrected XML files are matched to their PDFs by file name stem
+(invoice_42.pdf <- invoice_42.xml) and swapped in with
+replace_facturx_xml, which appends an incremental update per PDF.
+No conversion runs, so a directory of invoices is corrected in the
+time it takes to read and append a few kilobytes per file.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .embedding import replace_facturx_xml
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class Replacement(NamedTuple):
+    """Outcome of one replacement."""
+    pdf: Path
+    output: Path
+    success: bool
+    error: Optional[str] = None
+
+
+def pair_by_stem(pdf_dir: Union[str, Path], xml_dir: Union[str, Path]) -> List[Tuple[Path, Path]]:
+    """
+    Match PDFs to corrected XML files with the same stem.
+
+    PDFs without a corrected XML are left out.
+
+    Returns:
+        List[Tuple[Path, Path]]: (pdf, xml) pairs sorted by PDF name
+    """
+    xml_files = {path.stem: path for path in Path(xml_dir).glob("*.xml")}
+    return [(pdf, xml_files[pdf.stem]) for pdf in sorted(Path(pdf_dir).glob("*.pdf"))
+            if pdf.stem in xml_files]
+
+
+def replace_many(pairs: Iterable[Tuple[Union[str, Path], Union[str, Path]]],
+                 output_dir: Union[str, Path, None] = None,
+                 profile: Optional[str] = None,
+                 max_workers: Optional[int] = None) -> Iterator[Replacement]:
+    """
+    Replace the factur-x.xml of many PDFs concurrently.
+
+    Args:
+        pairs: (pdf, corrected xml) per invoice
+        output_dir: Write corrected copies here; if None each PDF is updated in place
+        profile (Optional[str]): Factur-X profile; defaults to the one each PDF declares
+        max_workers (Optional[int]): Concurrent replacements. Defaults to the CPU count.
+
+    Returns:
+        Iterator[Replacement]: One result per pair, in input order
+    """
+    if output_dir is not None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    def replace(pair: Tuple[Union[str, Path], Union[str, Path]]) -> Replacement:
+        pdf, xml = Path(pair[0]), Path(pair[1])
+        output = Path(output_dir) / pdf.name if output_dir is not None else pdf
+        try:
+            replace_facturx_xml(pdf, xml, output, profile)
+        except Exception as e:
+            logger.error(f"Replacing the XML of {pdf} failed: {e}")
+            return Replacement(pdf, output, False, str(e))
+        return Replacement(pdf, output, True)
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+        yield from executor.map(replace, pairs)
@@ -0,0 +1,37 @@
+import pytest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+@pytest.fixture
+def repo_root():
+    """Repository root, where the sample files live."""
+    return REPO_ROOT
+
+
+@pytest.fixture
+def pdfa_path():
+    """A PDF/A-3B sample that passes every check, saved with an xref stream."""
+    return REPO_ROOT / "attached_assets" / "zugferd1_invoice_pdfa3b.pdf"
+
+
+@pytest.fixture
+def near_pdfa_path():
+    """A PDF/A-3B sample lacking only an OutputIntent, saved with a classic xref table."""
+    return REPO_ROOT / "sample_pdfa3b.pdf"
+
+
+@pytest.fixture
+def minimal_xml():
+    """The smallest Factur-X XML the embedding code accepts."""
+    return b"<rsm:CrossIndustryInvoice xmlns:rsm='urn:test'/>"
+
+
+@pytest.fixture
+def find_filespec():
+    """Look up the one associated file of a PDF with the given name."""
+    def find(pdf, name):
+        [filespec] = [spec for spec in pdf.Root.AF if str(spec.UF) == name]
+        return filespec
+    return find
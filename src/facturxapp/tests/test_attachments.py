@@ -0,0 +1,89 @@
+import hashlib
+import shutil
+import pytest
+import pikepdf
+from pikepdf import Name
+from facturxapp.services import incremental
+from facturxapp.services.attachments import Attachment, attach_files
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+@pytest.fixture
+def invoice(tmp_path, pdfa_path):
+    target = tmp_path / "invoice.pdf"
+    shutil.copyfile(pdfa_path, target)
+    return target
+
+
+def test_attach_streams_files(invoice, tmp_path, monkeypatch, find_filespec):
+    """Test that files copied in small chunks arrive intact with Params and relationship."""
+    monkeypatch.setattr(incremental, "STREAM_CHUNK", 1000)
+    notes = tmp_path / "notes.txt"
+    notes.write_bytes(b"delivered 3 pallets\n" * 5000)
+    source = tmp_path / "export.csv"
+    source.write_bytes(b"a,b\n1,2\n")
+    original = invoice.read_bytes()
+    attach_files(invoice, [Attachment(notes, description="Delivery note"),
+                           Attachment(source, "Source", name="source.csv")])
+    assert invoice.read_bytes().startswith(original)
+    with pikepdf.open(invoice) as pdf:
+        assert not check_pdfa3b(pdf)
+        filespec = find_filespec(pdf, "notes.txt")
+        assert filespec.AFRelationship == Name.Supplement
+        assert str(filespec.Desc) == "Delivery note"
+        stream = filespec.EF.F
+        assert stream.Filter == Name.FlateDecode
+        assert stream.Subtype == Name("/text/plain")
+        assert stream.read_bytes() == notes.read_bytes()
+        assert int(stream.Params.Size) == notes.stat().st_size
+        assert bytes(stream.Params.CheckSum) == hashlib.md5(notes.read_bytes()).digest()
+        assert find_filespec(pdf, "source.csv").AFRelationship == Name.Source
+        assert {"notes.txt", "source.csv"} <= set(pdf.attachments)
+
+
+def test_failed_attach_leaves_invoice_unchanged(invoice, tmp_path, monkeypatch):
+    """Test that an in-place update failing mid-stream truncates the invoice back to its original bytes."""
+    monkeypatch.setattr(incremental, "STREAM_CHUNK", 1000)
+    compressobj = incremental.zlib.compressobj
+
+    class FailingCompressor:
+        def __init__(self):
+            self.compressor = compressobj()
+            self.chunks = 0
+
+        def compress(self, chunk):
+            self.chunks += 1
+            if self.chunks > 3:
+                raise OSError("read error")
+            return self.compressor.compress(chunk)
+
+    monkeypatch.setattr(incremental.zlib, "compressobj", FailingCompressor)
+    scan = tmp_path / "scan.bin"
+    scan.write_bytes(bytes(range(256)) * 100)
+    original = invoice.read_bytes()
+    with pytest.raises(OSError):
+        attach_files(invoice, [Attachment(scan)])
+    assert invoice.read_bytes() == original
+
+
+def test_attach_replaces_same_name(invoice, tmp_path, find_filespec):
+    """Test that attaching a file again replaces it and leaves the original untouched on another output."""
+    notes = tmp_path / "notes.txt"
+    notes.write_bytes(b"first")
+    attach_files(invoice, [Attachment(notes)])
+    notes.write_bytes(b"second")
+    output = tmp_path / "out.pdf"
+    attach_files(invoice, [Attachment(notes)], output, compress=False)
+    with pikepdf.open(output) as pdf:
+        assert find_filespec(pdf, "notes.txt").EF.F.read_bytes() == b"second"
+    with pikepdf.open(invoice) as pdf:
+        assert find_filespec(pdf, "notes.txt").EF.F.read_bytes() == b"first"
+
+
+def test_attach_rejects_reserved_name_and_relationship(invoice, tmp_path):
+    """Test that factur-x.xml and Alternative stay reserved for the invoice XML."""
+    xml = tmp_path / "factur-x.xml"
+    xml.write_bytes(b"<x/>")
+    with pytest.raises(ValueError):
+        attach_files(invoice, [Attachment(xml)])
+    with pytest.raises(ValueError):
+        attach_files(invoice, [Attachment(xml, "Alternative", name="copy.xml")])
@@ -0,0 +1,48 @@
+import os
+import time
+import pytest
+from facturxapp.services.conversion_cache import ConversionCache, sha256_file
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a small conversion cache for testing."""
+    return ConversionCache(cache_dir=tmp_path / "cache", max_bytes=250)
+
+def _write(path, content):
+    path.write_bytes(content)
+    return path
+
+def test_key_depends_on_all_inputs(tmp_path):
+    """Test that input hash, Ghostscript version and parameters all change the key."""
+    digest = sha256_file(_write(tmp_path / "in.pdf", b"%PDF-1.4 test"))
+    key = ConversionCache.make_key(digest, "10.02.1", ["-dPDFA=3"])
+    assert key == ConversionCache.make_key(digest, "10.02.1", ["-dPDFA=3"])
+    assert key != ConversionCache.make_key(digest, "10.03.0", ["-dPDFA=3"])
+    assert key != ConversionCache.make_key(digest, "10.02.1", ["-dPDFA=2"])
+    assert key != ConversionCache.make_key("0" * 64, "10.02.1", ["-dPDFA=3"])
+
+def test_put_and_get(cache, tmp_path):
+    """Test a miss, an insert and a hit."""
+    output = tmp_path / "out.pdf"
+    assert not cache.get("ab" * 32, output)
+    cache.put("ab" * 32, _write(tmp_path / "result.pdf", b"converted"))
+    assert cache.get("ab" * 32, output)
+    assert output.read_bytes() == b"converted"
+    assert (cache.hits, cache.misses) == (1, 1)
+    # No temporary files are left behind
+    assert not list(cache.cache_dir.glob("*/.tmp-*"))
+
+def test_lru_eviction(cache, tmp_path):
+    """Test that the least recently used entry is evicted first."""
+    result = _write(tmp_path / "result.pdf", b"x" * 100)
+    cache.put("aa" * 32, result)
+    cache.put("bb" * 32, result)
+    # Make "aa" the oldest, then touch it with a hit so "bb" becomes the LRU entry
+    old = time.time() - 100
+    os.utime(cache._entry_path("aa" * 32), (old, old))
+    os.utime(cache._entry_path("bb" * 32), (old + 1, old + 1))
+    assert cache.get("aa" * 32, tmp_path / "hit.pdf")
+    cache.put("cc" * 32, result)
+    assert cache._entry_path("aa" * 32).exists()
+    assert not cache._entry_path("bb" * 32).exists()
+    assert cache._entry_path("cc" * 32).exists()
@@ -0,0 +1,98 @@
+import shutil
+import pytest
+from facturxapp.services import conversion_ladder
+from facturxapp.services.conversion_ladder import (
+    MIN_ATTEMPTS,
+    ConversionLadder,
+    LadderRung,
+    input_class,
+)
+from facturxapp.services.pdf_analyzer import PDFProfile, analyze_pdf
+from facturxapp.services.pdfa_backends import PDFABackend, PikepdfRepairBackend
+
+
+class FakeBackend(PDFABackend):
+    """Records calls; copies a compliant PDF when told to succeed."""
+
+    name = "fake"
+
+    def __init__(self, compliant, succeed=False, error=None):
+        super().__init__()
+        self.compliant = compliant
+        self.succeed = succeed
+        self.error = error
+        self.calls = []
+
+    def convert(self, input_pdf, output_pdf, extra_args=()):
+        self.calls.append(tuple(extra_args))
+        if self.error is not None:
+            raise self.error
+        if self.succeed:
+            shutil.copyfile(self.compliant, output_pdf)
+        return self.succeed
+
+
+@pytest.fixture
+def fake_backend(pdfa_path):
+    """Make FakeBackends that copy the compliant sample on success."""
+    return lambda **kwargs: FakeBackend(pdfa_path, **kwargs)
+
+
+def _ladder(*backends):
+    names = ("full", "minimal", "repair")
+    return ConversionLadder([LadderRung(name, backend, name == "full")
+                             for name, backend in zip(names, backends)])
+
+
+def test_input_class_from_profile(near_pdfa_path):
+    """Test that the class combines findings and content traits."""
+    profile = PDFProfile(page_count=1, image_count=0, image_bytes=0, font_types={"Type3": 1},
+                         transparent_pages=1, findings=("fonts-not-embedded",), repairable=False)
+    assert input_class(profile) == "fonts-not-embedded+transparency+type3"
+    assert input_class(profile._replace(font_types={}, transparent_pages=0, findings=())) == "compliant"
+    assert input_class(analyze_pdf(near_pdfa_path)) == "output-intent-missing"
+
+
+def test_ladder_falls_through_to_working_rung(tmp_path, near_pdfa_path, fake_backend):
+    """Test that failing and raising rungs are skipped over and recorded."""
+    full = fake_backend(error=OSError("gs crashed"))
+    minimal = fake_backend()
+    ladder = _ladder(full, minimal, PikepdfRepairBackend())
+    rung = ladder.convert(near_pdfa_path, tmp_path / "out.pdf", analyze_pdf(near_pdfa_path), ["-dFOO"])
+    assert rung == "repair"
+    assert full.calls == [("-dFOO",)]
+    assert minimal.calls == [()]
+    stats = ladder.stats()["output-intent-missing"]
+    assert stats["full"]["successes"] == 0
+    assert stats["repair"]["successes"] == 1
+
+
+def test_ladder_skips_rungs_failing_for_a_class(tmp_path, monkeypatch, near_pdfa_path, fake_backend):
+    """Test that a class stops trying rungs that keep failing for it."""
+    monkeypatch.setattr(conversion_ladder, "PROBE_EVERY", 100)
+    full = fake_backend()
+    ladder = _ladder(full, PikepdfRepairBackend())
+    profile = analyze_pdf(near_pdfa_path)
+    for _ in range(MIN_ATTEMPTS + 2):
+        assert ladder.convert(near_pdfa_path, tmp_path / "out.pdf", profile) == "minimal"
+    assert len(full.calls) == MIN_ATTEMPTS
+    # Another class still starts at the top
+    assert [rung.name for rung in ladder.order("other")] == ["full", "minimal"]
+
+
+def test_ladder_probes_skipped_rungs(tmp_path, monkeypatch, near_pdfa_path, fake_backend):
+    """Test that a skipped rung is retried periodically."""
+    monkeypatch.setattr(conversion_ladder, "PROBE_EVERY", MIN_ATTEMPTS + 1)
+    full = fake_backend()
+    ladder = _ladder(full, PikepdfRepairBackend())
+    profile = analyze_pdf(near_pdfa_path)
+    for _ in range(MIN_ATTEMPTS):
+        ladder.convert(near_pdfa_path, tmp_path / "out.pdf", profile)
+    full.succeed = True
+    assert ladder.convert(near_pdfa_path, tmp_path / "out.pdf", profile) == "full"
+
+
+def test_ladder_reports_total_failure(tmp_path, near_pdfa_path, fake_backend):
+    """Test that None is returned when no rung produces PDF/A-3B."""
+    ladder = _ladder(fake_backend(), fake_backend())
+    assert ladder.convert(near_pdfa_path, tmp_path / "out.pdf", analyze_pdf(near_pdfa_path)) is None
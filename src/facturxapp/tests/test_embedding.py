@@ -0,0 +1,69 @@
+import hashlib
+import io
+import shutil
+import pytest
+import pikepdf
+from pikepdf import Name
+from facturxapp.services.embedding import (
+    FACTURX_FILENAME,
+    attach_facturx,
+    embed_facturx,
+)
+from facturxapp.utils.xmp import FACTURX_NS
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+def test_embed_bytes_adds_all_structures(pdfa_path, minimal_xml, find_filespec):
+    """Test that one call adds the AF entry, name tree entry, Params and XMP."""
+    output = embed_facturx(pdfa_path.read_bytes(), minimal_xml)
+    with pikepdf.open(io.BytesIO(output)) as pdf:
+        assert not check_pdfa3b(pdf)
+        filespec = find_filespec(pdf, FACTURX_FILENAME)
+        assert filespec.AFRelationship == Name.Alternative
+        names = pdf.Root.Names.EmbeddedFiles.Names
+        keys = [str(key) for key in names[::2]]
+        assert FACTURX_FILENAME in keys and keys == sorted(keys)
+        stream = filespec.EF.F
+        assert stream.read_bytes() == minimal_xml
+        assert stream.Subtype == Name("/text/xml")
+        assert int(stream.Params.Size) == len(minimal_xml)
+        assert bytes(stream.Params.CheckSum) == hashlib.md5(minimal_xml).digest()
+        assert str(stream.Params.ModDate).startswith("D:")
+        xmp = pdf.Root.Metadata.read_bytes()
+        assert FACTURX_NS.encode() in xmp
+        assert b"<fx:ConformanceLevel>EN 16931</fx:ConformanceLevel>" in xmp
+
+
+def test_embed_replaces_existing_attachment(tmp_path, pdfa_path, minimal_xml, find_filespec):
+    """Test that embedding twice in place leaves one attachment and one schema."""
+    target = tmp_path / "invoice.pdf"
+    shutil.copyfile(pdfa_path, target)
+    embed_facturx(target, minimal_xml, target)
+    embed_facturx(target, b"<updated/>", target, profile="MINIMUM")
+    with pikepdf.open(target) as pdf:
+        filespec = find_filespec(pdf, FACTURX_FILENAME)
+        assert filespec.EF.F.read_bytes() == b"<updated/>"
+        assert filespec.AFRelationship == Name.Data
+        keys = [str(key) for key in pdf.Root.Names.EmbeddedFiles.Names[::2]]
+        assert keys.count(FACTURX_FILENAME) == 1
+        xmp = pdf.Root.Metadata.read_bytes()
+        assert xmp.count(b"Factur-X PDFA Extension Schema") == 1
+        assert b"<fx:ConformanceLevel>MINIMUM</fx:ConformanceLevel>" in xmp
+
+
+def test_attach_into_name_tree_with_kids(minimal_xml):
+    """Test that the entry lands in the right leaf and Limits are widened."""
+    pdf = pikepdf.new()
+    leaf = pdf.make_indirect(pikepdf.Dictionary(
+        Names=pikepdf.Array([pikepdf.String("a.txt"), pdf.make_indirect(pikepdf.Dictionary())]),
+        Limits=pikepdf.Array([pikepdf.String("a.txt"), pikepdf.String("a.txt")]),
+    ))
+    pdf.Root.Names = pikepdf.Dictionary(EmbeddedFiles=pikepdf.Dictionary(Kids=pikepdf.Array([leaf])))
+    attach_facturx(pdf, minimal_xml)
+    assert [str(key) for key in leaf.Names[::2]] == ["a.txt", FACTURX_FILENAME]
+    assert [str(limit) for limit in leaf.Limits] == ["a.txt", FACTURX_FILENAME]
+
+
+def test_unknown_profile(pdfa_path, minimal_xml):
+    """Test that unknown profiles are rejected."""
+    with pytest.raises(ValueError):
+        embed_facturx(pdfa_path.read_bytes(), minimal_xml, profile="PLATINUM")
@@ -0,0 +1,47 @@
+import pikepdf
+from facturxapp.services.embedding import FACTURX_FILENAME, attach_facturx, embed_facturx
+from facturxapp.services.extraction import extract_facturx, extract_facturx_tree, extract_many
+
+XML = b"<rsm:CrossIndustryInvoice xmlns:rsm='urn:test'><rsm:ID>42</rsm:ID></rsm:CrossIndustryInvoice>"
+
+
+def test_extract_bytes_and_tree(pdfa_path):
+    """Test that the XML comes back as bytes and as a parsed tree."""
+    pdf = embed_facturx(pdfa_path.read_bytes(), XML)
+    assert extract_facturx(pdf) == XML
+    tree = extract_facturx_tree(pdf)
+    assert tree.findtext("{urn:test}ID") == "42"
+
+
+def test_extract_other_filename_and_missing(pdfa_path):
+    """Test that older attachment names can be asked for and a missing one gives None."""
+    assert extract_facturx(pdfa_path) is None
+    assert extract_facturx_tree(pdfa_path) is None
+    assert extract_facturx(pdfa_path, "ZUGFeRD-invoice.xml").startswith(b"<?xml")
+
+
+def test_extract_from_name_tree_kids(tmp_path):
+    """Test that an attachment only reachable through name tree Kids is found."""
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    attach_facturx(pdf, XML)
+    del pdf.Root.AF
+    leaf = pdf.Root.Names.EmbeddedFiles
+    leaf.Limits = pikepdf.Array([pikepdf.String(FACTURX_FILENAME), pikepdf.String(FACTURX_FILENAME)])
+    pdf.Root.Names.EmbeddedFiles = pdf.make_indirect(pikepdf.Dictionary(Kids=pikepdf.Array([leaf])))
+    path = tmp_path / "kids.pdf"
+    pdf.save(path)
+    assert extract_facturx(path) == XML
+
+
+def test_extract_many_reports_errors(tmp_path, pdfa_path):
+    """Test that unreadable PDFs are reported per file, in input order."""
+    good = tmp_path / "good.pdf"
+    good.write_bytes(embed_facturx(pdfa_path.read_bytes(), XML))
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    results = list(extract_many([good, broken, pdfa_path], max_workers=2, chunksize=1))
+    assert [result.path for result in results] == [good, broken, pdfa_path]
+    assert results[0].xml == XML and results[0].error is None
+    assert results[1].xml is None and results[1].error
+    assert results[2].xml is None and results[2].error is None
@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from pathlib import Path
+from facturxapp.services import ghostscript
+from facturxapp.services.ghostscript import (
+    GS_PRESETS,
+    MINIMAL_PDFA3B_ARGS,
+    PDFA3B_ARGS,
+    build_pdfa3b_command,
+    convert_pdf_bytes,
+    ghostscript_version,
+    preset_args,
+    run_ghostscript_async,
+)
+
+def test_build_pdfa3b_command():
+    """Test that the argv starts with gs and ends with output and input."""
+    command = build_pdfa3b_command("in.pdf", "out.pdf", extra_args=["-dFOO"])
+    assert command[0] == "gs"
+    assert command[1:1 + len(PDFA3B_ARGS)] == list(PDFA3B_ARGS)
+    assert command[-3:] == ["-dFOO", "-sOutputFile=out.pdf", "in.pdf"]
+
+def test_build_minimal_command():
+    """Test the minimal flag set used for debugging."""
+    command = build_pdfa3b_command("in.pdf", "out.pdf", base_args=MINIMAL_PDFA3B_ARGS)
+    assert "-sProcessColorModel=DeviceRGB" not in command
+    assert "-dPDFA=3" in command
+
+def test_preset_args():
+    """Test that presets differ in image handling and unknown names are rejected."""
+    assert set(GS_PRESETS) == {"fast", "archive", "lossless"}
+    assert "-dDownsampleColorImages=false" in preset_args("fast")
+    assert "-dColorImageFilter=/DCTEncode" in preset_args("archive")
+    assert "-dColorImageFilter=/FlateEncode" in preset_args("lossless")
+    assert "-dDownsampleColorImages=false" in preset_args("lossless")
+    with pytest.raises(ValueError):
+        preset_args("tiny")
+
+def test_ghostscript_version_missing_is_cached(monkeypatch):
+    """Test that a missing executable is reported once and cached."""
+    calls = []
+
+    def fake_which(name):
+        calls.append(name)
+        return None
+
+    monkeypatch.setattr(ghostscript.shutil, "which", fake_which)
+    assert ghostscript_version("gs-not-installed") is None
+    assert ghostscript_version("gs-not-installed") is None
+    assert calls == ["gs-not-installed"]
+
+def _process_group_alive(pgid):
+    """Return True if a non-zombie process in the group is still running."""
+    for stat_file in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat_file.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[0] is the state, fields[2] the process group
+        if int(fields[2]) == pgid and fields[0] != "Z":
+            return True
+    return False
+
+def test_run_async_timeout_kills_process_group(tmp_path):
+    """Test that a deadline kills the child together with its own children."""
+    pid_file = tmp_path / "pid"
+    command = ["sh", "-c", f"echo $$ > {pid_file}; sleep 30 & sleep 30"]
+    with pytest.raises(TimeoutError):
+        asyncio.run(run_ghostscript_async(command, timeout=0.5))
+    assert not _process_group_alive(int(pid_file.read_text()))
+
+def test_run_async_cancel_kills_process_group(tmp_path):
+    """Test that cancelling the awaiting task kills the process group."""
+    pid_file = tmp_path / "pid"
+    command = ["sh", "-c", f"echo $$ > {pid_file}; sleep 30"]
+
+    async def cancel_soon():
+        task = asyncio.create_task(run_ghostscript_async(command))
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_soon())
+    assert not _process_group_alive(int(pid_file.read_text()))
+
+def test_run_async_returns_output():
+    """Test that return code and output are passed through."""
+    returncode, stdout, _ = asyncio.run(run_ghostscript_async(["sh", "-c", "echo done; exit 3"]))
+    assert returncode == 3
+    assert stdout.strip() == "done"
+
+def test_convert_pdf_bytes_round_trip(monkeypatch, tmp_path):
+    """Test that input bytes reach Ghostscript and stdout is returned."""
+    fake_gs = tmp_path / "fake-gs"
+    # Echo the input file (last argument) to stdout, like -sOutputFile=-
+    fake_gs.write_text('#!/bin/sh\nfor last; do :; done\ncat "$last"\n')
+    fake_gs.chmod(0o755)
+    monkeypatch.setattr(ghostscript, "GS_EXECUTABLE", str(fake_gs))
+    payload = b"%PDF-1.7\n" + bytes(range(256)) * 64
+    assert convert_pdf_bytes(payload) == payload
+    assert [p.name for p in tmp_path.iterdir()] == ["fake-gs"]
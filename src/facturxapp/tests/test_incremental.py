@@ -0,0 +1,89 @@
+import io
+import shutil
+import pytest
+import pikepdf
+from facturxapp.services.embedding import FACTURX_FILENAME, embed_facturx
+from facturxapp.services.incremental import IncrementalUpdate
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+@pytest.fixture
+def attachment(find_filespec):
+    """Read the factur-x.xml attachment of a PDF given as bytes."""
+    def read(data):
+        with pikepdf.open(io.BytesIO(data)) as pdf:
+            return find_filespec(pdf, FACTURX_FILENAME).EF.F.read_bytes()
+    return read
+
+
+# One sample is saved with an xref stream, the other with a classic xref table
+@pytest.mark.parametrize("sample", ["pdfa_path", "near_pdfa_path"])
+def test_incremental_embedding_appends(request, sample, minimal_xml, attachment):
+    """Test that the original bytes are kept and the attachment is readable."""
+    source = request.getfixturevalue(sample)
+    original = source.read_bytes()
+    output = embed_facturx(original, minimal_xml, incremental=True)
+    assert output.startswith(original)
+    assert attachment(output) == minimal_xml
+    with pikepdf.open(io.BytesIO(output)) as pdf, pikepdf.open(source) as before:
+        assert pdf.trailer.ID[0] == before.trailer.ID[0]
+        assert pdf.trailer.ID[1] != before.trailer.ID[1]
+        assert int(pdf.trailer.Size) > int(before.trailer.Size)
+
+
+def test_incremental_embedding_keeps_pdfa(pdfa_path, minimal_xml):
+    """Test that the appended catalog, AF array and XMP still pass the PDF/A-3B checks."""
+    output = embed_facturx(pdfa_path.read_bytes(), minimal_xml, incremental=True)
+    with pikepdf.open(io.BytesIO(output)) as pdf:
+        assert not check_pdfa3b(pdf)
+
+
+def test_incremental_embedding_in_place_twice(tmp_path, pdfa_path, minimal_xml, attachment):
+    """Test that repeated in-place updates chain and replace the attachment."""
+    target = tmp_path / "invoice.pdf"
+    shutil.copyfile(pdfa_path, target)
+    embed_facturx(target, minimal_xml, target, incremental=True)
+    first = target.read_bytes()
+    embed_facturx(target, b"<updated/>", target, incremental=True)
+    second = target.read_bytes()
+    assert second.startswith(first)
+    assert attachment(second) == b"<updated/>"
+
+
+def test_only_modified_objects_are_written(near_pdfa_path):
+    """Test that only modified objects are written."""
+    with pikepdf.open(near_pdfa_path) as pdf:
+        update = IncrementalUpdate(pdf)
+        assert update.changed_objects() == []
+        pdf.Root.Lang = pikepdf.String("fr")
+        assert [obj.objgen for obj in update.changed_objects()] == [pdf.Root.objgen]
+
+
+def _pdf_with_free_tail():
+    """A one-page PDF whose xref ends with free entries: objects 1-3 in use, /Size 8."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>"]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.7\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 8\n0000000000 65535 f \n")
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"0000000000 00001 f \n" * 4)
+    out.write(b"trailer\n<< /Size 8 /Root 1 0 R >>\nstartxref\n%d\n%%EOF\n" % xref)
+    return out.getvalue()
+
+
+def test_new_objects_below_trailer_size_are_written(minimal_xml, attachment):
+    """Test that objects QPDF numbers in free xref entries below /Size are appended."""
+    original = _pdf_with_free_tail()
+    with pikepdf.open(io.BytesIO(original)) as pdf:
+        assert int(pdf.trailer.Size) == 8 and len(pdf.objects) == 3
+    output = embed_facturx(original, minimal_xml, incremental=True)
+    assert output.startswith(original)
+    assert attachment(output) == minimal_xml
+    with pikepdf.open(io.BytesIO(output)) as pdf:
+        assert pdf.Root.Metadata.read_bytes().startswith(b"<?xpacket")
@@ -0,0 +1,81 @@
+import copy
+import json
+import pytest
+from pathlib import Path
+from facturxapp.validators.invoice_preflight import (
+    PreflightError,
+    check_invoice,
+    compile_preflight,
+    preflight_invoice,
+)
+
+@pytest.fixture
+def flat_invoice(repo_root):
+    """Load the flat-layout sample invoice shipped with the repository."""
+    with open(repo_root / "sample_invoice.json", "r") as f:
+        return json.load(f)
+
+def test_sample_invoices_pass(repo_root):
+    """Test that the repository sample invoices pass pre-flight."""
+    with open(repo_root / "sample_invoice.json", "r") as f:
+        assert preflight_invoice(json.load(f), layout="flat") == []
+    with open(repo_root / "mustang_invoice.json", "r") as f:
+        assert preflight_invoice(json.load(f), layout="mustang") == []
+    fixture_path = Path(__file__).parent / "fixtures" / "invoice_data.json"
+    with open(fixture_path, "r") as f:
+        assert preflight_invoice(json.load(f), layout="service") == []
+
+def test_missing_buyer_country(flat_invoice):
+    """Test that a missing buyer country is reported for EN16931."""
+    del flat_invoice["buyer"]["country"]
+    issues = preflight_invoice(flat_invoice)
+    assert [issue.field for issue in issues] == ["buyer.country"]
+    # MINIMUM does not require the buyer country
+    assert preflight_invoice(flat_invoice, profile="MINIMUM") == []
+
+def test_empty_items(flat_invoice):
+    """Test that an empty item list is rejected."""
+    flat_invoice["items"] = []
+    issues = preflight_invoice(flat_invoice)
+    assert any(issue.field == "items" for issue in issues)
+
+def test_inconsistent_totals(flat_invoice):
+    """Test that totals not matching the lines are reported."""
+    flat_invoice["total"] = 1300.00
+    flat_invoice["subtotal"] = 900.00
+    fields = {issue.field for issue in preflight_invoice(flat_invoice)}
+    assert fields == {"total", "subtotal"}
+
+def test_types_and_code_lists(flat_invoice):
+    """Test type and code list checks."""
+    broken = copy.deepcopy(flat_invoice)
+    broken["currency"] = "EURO"
+    broken["seller"]["country"] = "XX"
+    broken["issue_date"] = "13/05/2025"
+    broken["items"][0]["quantity"] = "10"
+    broken["items"][1]["unit_of_measure"] = "pcs"
+    fields = {issue.field for issue in preflight_invoice(broken)}
+    assert {"currency", "seller.country", "issue_date", "items[0]", "items[1]"} <= fields
+
+def test_check_invoice_raises(flat_invoice):
+    """Test that check_invoice raises with the collected issues."""
+    del flat_invoice["seller"]
+    with pytest.raises(PreflightError) as excinfo:
+        check_invoice(flat_invoice)
+    assert any(issue.field == "seller.name" for issue in excinfo.value.issues)
+
+def test_compiled_checker_is_cached():
+    """Test that checks are compiled once per layout and profile."""
+    assert compile_preflight("flat", "EN16931") is compile_preflight("flat", "EN16931")
+    with pytest.raises(ValueError):
+        compile_preflight("unknown")
+
+
+def test_basic_and_extended_use_nearest_lower_level(flat_invoice):
+    """Test that BASIC and EXTENDED, which the embedder supports, are checked like BASIC_WL and EN16931."""
+    assert preflight_invoice(flat_invoice, profile="BASIC") == preflight_invoice(flat_invoice, profile="BASIC_WL")
+    assert preflight_invoice(flat_invoice, profile="EXTENDED") == preflight_invoice(flat_invoice, profile="EN16931")
+    del flat_invoice["seller"]["name"]
+    assert any(issue.field == "seller.name" for issue in preflight_invoice(flat_invoice, profile="EXTENDED"))
+    with pytest.raises(ValueError):
+        compile_preflight("flat", "XRECHNUNG")
@@ -0,0 +1,97 @@
+import io
+import random
+import pikepdf
+from pikepdf import Name
+from facturxapp.services.embedding import FACTURX_FILENAME, attach_facturx, find_facturx_filespec
+from facturxapp.services.incremental import IncrementalUpdate
+from facturxapp.utils import name_tree
+
+
+def _check_balanced(node, root=True):
+    """Assert sizes and Limits of every node; return the depth of the tree."""
+    assert (Name.Limits in node) != root
+    kids = node.get(Name.Kids)
+    if kids is not None:
+        assert len(kids) <= name_tree.MAX_KIDS
+        depths = {_check_balanced(kid, False) for kid in kids}
+        assert len(depths) == 1
+        keys = [key for key, _ in name_tree.iter_entries(node)]
+        depth = depths.pop() + 1
+    else:
+        keys = [name_tree.key_text(key) for key in node.Names[::2]]
+        assert len(keys) <= name_tree.MAX_ENTRIES
+        depth = 0
+    assert keys == sorted(keys)
+    if not root:
+        assert [str(limit) for limit in node.Limits] == [keys[0], keys[-1]]
+    return depth
+
+
+def test_insert_keeps_tree_sorted_and_balanced():
+    """Test that many inserts in random order give a sorted, balanced tree."""
+    pdf = pikepdf.new()
+    root = pdf.make_indirect(pikepdf.Dictionary(Names=pikepdf.Array()))
+    keys = [f"attachment_{index:04d}.pdf" for index in range(2000)]
+    random.Random(7).shuffle(keys)
+    for key in keys:
+        name_tree.insert(pdf, root, key, pikepdf.String(key.upper()))
+    name_tree.insert(pdf, root, keys[0], pikepdf.String("replaced"))
+
+    assert _check_balanced(root) == 2
+    assert [key for key, _ in name_tree.iter_entries(root)] == sorted(keys)
+    assert str(name_tree.lookup(root, keys[0])) == "replaced"
+    assert str(name_tree.lookup(root, keys[1])) == keys[1].upper()
+    assert name_tree.lookup(root, "missing.pdf") is None
+
+
+def test_unsorted_flat_array_is_rebuilt():
+    """Test that a legacy unsorted Names array is found and rebuilt on insert."""
+    pdf = pikepdf.new()
+    keys = [f"scan_{index:03d}.pdf" for index in range(100)]
+    random.Random(3).shuffle(keys)
+    names = pikepdf.Array()
+    for key in keys:
+        names.append(Name("/" + key))
+        names.append(pikepdf.String(key))
+    root = pdf.make_indirect(pikepdf.Dictionary(Names=names))
+    assert all(str(name_tree.lookup(root, key)) == key for key in keys)
+
+    name_tree.insert(pdf, root, "zz.pdf", pikepdf.String("zz.pdf"))
+    _check_balanced(root)
+    assert all(str(name_tree.lookup(root, key)) == key for key in [*keys, "zz.pdf"])
+
+
+def test_lookup_kids_without_limits():
+    """Test that Kids lacking Limits are still searched."""
+    pdf = pikepdf.new()
+    kids = [pdf.make_indirect(pikepdf.Dictionary(Names=pikepdf.Array([pikepdf.String(key), pikepdf.String(key)])))
+            for key in ("b.xml", "a.xml")]
+    root = pikepdf.Dictionary(Kids=pikepdf.Array(kids))
+    assert str(name_tree.lookup(root, "a.xml")) == "a.xml"
+    assert name_tree.lookup(root, "c.xml") is None
+
+
+def test_incremental_update_writes_split_nodes():
+    """Test that nodes created by a split are part of the incremental update."""
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    root = pdf.make_indirect(pikepdf.Dictionary(Names=pikepdf.Array()))
+    pdf.Root.Names = pikepdf.Dictionary(EmbeddedFiles=root)
+    for index in range(300):
+        key = f"a{index:03d}.txt"
+        name_tree.insert(pdf, root, key, pdf.make_indirect(pikepdf.Dictionary(F=pikepdf.String(key))))
+    buffer = io.BytesIO()
+    pdf.save(buffer)
+    original = buffer.getvalue()
+
+    with pikepdf.open(io.BytesIO(original)) as document:
+        update = IncrementalUpdate(document)
+        attach_facturx(document, b"<invoice/>")
+        updated = update.write(original)
+    with pikepdf.open(io.BytesIO(updated)) as reopened:
+        tree = reopened.Root.Names.EmbeddedFiles
+        _check_balanced(tree)
+        assert len(list(name_tree.iter_entries(tree))) == 301
+        assert find_facturx_filespec(reopened).EF.F.read_bytes() == b"<invoice/>"
+        assert str(name_tree.lookup(tree, "a123.txt").F) == "a123.txt"
+        assert FACTURX_FILENAME in [key for key, _ in name_tree.iter_entries(tree)]
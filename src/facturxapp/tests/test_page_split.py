@@ -0,0 +1,89 @@
+import pikepdf
+import pytest
+from pikepdf import Name
+from PIL import Image
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from facturxapp.services.ghostscript import ghostscript_version
+from facturxapp.services.page_split import dedupe_resources, merge_pdfa_chunks, split_pdf
+from facturxapp.services.pdfa_backends import GhostscriptCLIBackend
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+@pytest.fixture
+def statement_pdf(tmp_path):
+    """Create a 7-page PDF with an embedded font and the same logo on every page."""
+    pdfmetrics.registerFont(TTFont("Vera", "Vera.ttf"))
+    logo = tmp_path / "logo.png"
+    Image.new("RGB", (64, 64), (200, 30, 30)).save(logo)
+    pdf_path = tmp_path / "statement.pdf"
+    c = canvas.Canvas(str(pdf_path), initialFontName="Vera")
+    for page in range(7):
+        c.setFont("Vera", 12)
+        c.drawString(100, 750, f"Statement page {page + 1}")
+        c.drawImage(str(logo), 100, 600, 64, 64)
+        c.showPage()
+    c.save()
+    return pdf_path
+
+def _count_objects(pdf, predicate):
+    return sum(1 for obj in pdf.objects if isinstance(obj, pikepdf.Stream) and predicate(obj))
+
+def test_split_keeps_page_order(statement_pdf, tmp_path):
+    """Test that ranges cover every page in order."""
+    chunks = split_pdf(statement_pdf, tmp_path, pages_per_chunk=3)
+    assert [len(pikepdf.open(chunk).pages) for chunk in chunks] == [3, 3, 1]
+
+def test_merge_dedupes_and_is_pdfa(statement_pdf, tmp_path):
+    """Test that merged chunks share one logo image and pass the PDF/A checks."""
+    chunks = split_pdf(statement_pdf, tmp_path, pages_per_chunk=3)
+    merged_path = tmp_path / "merged.pdf"
+    replaced = merge_pdfa_chunks(chunks, merged_path)
+    assert replaced > 0
+    with pikepdf.open(merged_path) as merged:
+        assert len(merged.pages) == 7
+        assert check_pdfa3b(merged) == []
+        assert _count_objects(merged, lambda obj: obj.get(Name.Subtype) == Name.Image) == 1
+        assert _count_objects(merged, lambda obj: Name.Length1 in obj) == 1
+
+def test_dedupe_leaves_distinct_resources(statement_pdf):
+    """Test that a single document has nothing to deduplicate."""
+    with pikepdf.open(statement_pdf) as pdf:
+        assert dedupe_resources(pdf) == 0
+
+def test_merge_shares_font_program_under_different_font_dicts(statement_pdf, tmp_path):
+    """Test that a font program is stored once even when the font dictionaries around it differ."""
+    chunks = split_pdf(statement_pdf, tmp_path, pages_per_chunk=3)
+    # A per-chunk subset tag makes the font dictionaries differ
+    with pikepdf.open(chunks[1], allow_overwriting_input=True) as chunk:
+        for font in chunk.pages[0].Resources.Font.values():
+            font.BaseFont = Name("/ABCDEF+" + str(font.BaseFont)[1:])
+        chunk.save(chunks[1])
+    merged_path = tmp_path / "merged.pdf"
+    merge_pdfa_chunks(chunks, merged_path)
+    with pikepdf.open(merged_path) as merged:
+        fonts = {page.Resources.Font[name].objgen for page in merged.pages for name in page.Resources.Font}
+        assert len(fonts) == 2
+        assert _count_objects(merged, lambda obj: Name.Length1 in obj) == 1
+
+@pytest.mark.skipif(ghostscript_version() is None, reason="Ghostscript is not installed")
+def test_merge_converted_chunks(statement_pdf, tmp_path):
+    """Test merging chunks converted by Ghostscript: nothing identical is stored twice."""
+    backend = GhostscriptCLIBackend()
+    converted = []
+    for chunk in split_pdf(statement_pdf, tmp_path, pages_per_chunk=3):
+        output = tmp_path / f"{chunk.stem}_pdfa3b.pdf"
+        assert backend.convert(chunk, output)
+        converted.append(output)
+    merged_path = tmp_path / "merged.pdf"
+    merge_pdfa_chunks(converted, merged_path)
+    with pikepdf.open(merged_path) as merged:
+        assert len(merged.pages) == 7
+        assert check_pdfa3b(merged) == []
+        assert _count_objects(merged, lambda obj: obj.get(Name.Subtype) == Name.Image) == 1
+        # Ghostscript subsets fonts per chunk, so font programs may differ
+        # between chunks, but no two stored streams are identical
+        streams = [obj for obj in merged.objects if isinstance(obj, pikepdf.Stream)]
+        contents = [(sorted((k, repr(v)) for k, v in obj.items() if k != "/Length"), obj.read_raw_bytes())
+                    for obj in streams]
+        assert len({repr(content) for content in contents}) == len(streams)
@@ -0,0 +1,56 @@
+import pikepdf
+from pikepdf import Name
+from reportlab.pdfgen import canvas
+from facturxapp.services.pdf_analyzer import (
+    RECOMPRESS_IMAGE_BYTES,
+    STRATEGY_GS_FULL,
+    STRATEGY_GS_LIGHT,
+    STRATEGY_REPAIR,
+    STRATEGY_SKIP,
+    analyze_pdf,
+    plan_conversion,
+)
+
+def test_pdfa_input_is_skipped(pdfa_path):
+    """Test that a PDF/A-3B input is planned as skip."""
+    profile = analyze_pdf(pdfa_path)
+    assert profile.is_pdfa
+    assert plan_conversion(profile).strategy == STRATEGY_SKIP
+
+def test_missing_output_intent_is_repaired(near_pdfa_path):
+    """Test that metadata-only findings are planned as repair."""
+    profile = analyze_pdf(near_pdfa_path)
+    assert profile.findings == ("output-intent-missing",)
+    assert plan_conversion(profile).strategy == STRATEGY_REPAIR
+
+def test_plain_pdf_uses_light_ghostscript(tmp_path, near_pdfa_path):
+    """Test that unembedded fonts go to the light Ghostscript pass."""
+    pdf_path = tmp_path / "plain.pdf"
+    c = canvas.Canvas(str(pdf_path))
+    c.drawString(100, 750, "Plain")
+    c.save()
+    profile = analyze_pdf(pdf_path)
+    assert profile.font_types == {"Type1": 1}
+    plan = plan_conversion(profile)
+    assert plan.strategy == STRATEGY_GS_LIGHT
+    assert plan.cost > plan_conversion(analyze_pdf(near_pdfa_path)).cost
+
+def test_images_and_transparency(tmp_path):
+    """Test image byte counting, transparency detection and the full pass."""
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    image = pdf.make_stream(b"\0" * (RECOMPRESS_IMAGE_BYTES + 1),
+                            Type=Name.XObject, Subtype=Name.Image, Width=1, Height=1,
+                            ColorSpace=Name.DeviceRGB, BitsPerComponent=8)
+    page = pdf.pages[0].obj
+    page.Resources = pikepdf.Dictionary(
+        XObject=pikepdf.Dictionary(Im0=image),
+        ExtGState=pikepdf.Dictionary(GS0=pikepdf.Dictionary(ca=0.5)),
+    )
+    profile = analyze_pdf(pdf)
+    assert profile.image_count == 1
+    assert profile.image_bytes == RECOMPRESS_IMAGE_BYTES + 1
+    assert profile.transparent_pages == 1
+    # Metadata-only findings are still repaired, whatever the image load
+    assert plan_conversion(profile).strategy == STRATEGY_REPAIR
+    assert plan_conversion(profile._replace(repairable=False)).strategy == STRATEGY_GS_FULL
@@ -0,0 +1,46 @@
+import pytest
+import shutil
+from facturxapp.services.embedding import embed_facturx
+from facturxapp.services.extraction import extract_facturx
+from facturxapp.utils.pdf_io import IO_MODES, open_pdf, write_pdf
+
+
+def test_open_paths_and_buffers(near_pdfa_path):
+    """Test that every mode opens a path and that in-memory buffers are read without copying."""
+    for mode in IO_MODES:
+        with open_pdf(near_pdfa_path, mode) as pdf:
+            assert len(pdf.pages) == 1
+    data = bytearray(near_pdfa_path.read_bytes())
+    for buffer in (bytes(data), data, memoryview(data)):
+        with open_pdf(buffer) as pdf:
+            assert len(pdf.pages) == 1
+    with pytest.raises(ValueError):
+        open_pdf(near_pdfa_path, "unknown")
+
+
+@pytest.mark.parametrize("mode", sorted(IO_MODES))
+def test_save_over_input(tmp_path, mode, near_pdfa_path, minimal_xml):
+    """Test that a document can be saved over the file it was opened from."""
+    path = tmp_path / "invoice.pdf"
+    shutil.copyfile(near_pdfa_path, path)
+    with open_pdf(path, mode) as pdf:
+        pdf.docinfo["/Title"] = mode
+        write_pdf(pdf, path)
+    with open_pdf(path) as pdf:
+        assert str(pdf.docinfo["/Title"]) == mode
+    assert [child.name for child in tmp_path.iterdir()] == ["invoice.pdf"]
+
+    embed_facturx(path, minimal_xml, path, io_mode=mode)
+    assert extract_facturx(path, io_mode=mode) == minimal_xml
+
+
+def test_memory_mode_survives_input_replacement(tmp_path, near_pdfa_path):
+    """Test that a document opened in memory mode stays readable when its file is replaced."""
+    path = tmp_path / "invoice.pdf"
+    shutil.copyfile(near_pdfa_path, path)
+    with open_pdf(path, "memory") as pdf:
+        path.write_bytes(b"not a pdf")
+        assert pdf.pages[0].MediaBox is not None
+        write_pdf(pdf, path)
+    with open_pdf(path) as pdf:
+        assert len(pdf.pages) == 1
@@ -2,6 +2,7 @@ import pytest
 from pathlib import Path
 import shutil
 from ..services.pdf_service import PDFService
+from ..validators.pdfa_checker import check_pdfa3b
 
 def test_pdf_service_initialization():
     """Test PDF service initialization."""
@@ -90,6 +91,9 @@ def test_generate_invoice_with_sample_data():
     assert pdf_path.is_file()
     assert pdf_path.stat().st_size > 0
     
+    # Verify PDF is PDF/A-3B without a Ghostscript pass
+    assert check_pdfa3b(pdf_path) == []
+    
     # Cleanup
     pdf_path.unlink()
     shutil.rmtree(output_dir) 
\ No newline at end of file
@@ -0,0 +1,26 @@
+import pytest
+from reportlab.pdfgen import canvas
+from facturxapp.services.pdfa_backends import BACKENDS, PikepdfRepairBackend, get_backend
+from facturxapp.validators.pdfa_checker import is_pdfa3b
+
+def test_backend_registry():
+    """Test that every backend is registered under its name."""
+    assert sorted(BACKENDS) == ["gs-cli", "gs-lib", "gs-pool", "repair"]
+    with pytest.raises(ValueError):
+        get_backend("acrobat")
+
+def test_repair_backend_fixes_metadata(tmp_path, near_pdfa_path):
+    """Test that the repair backend upgrades a near-compliant PDF."""
+    output_pdf = tmp_path / "out.pdf"
+    with get_backend("repair") as backend:
+        assert backend.convert(near_pdfa_path, output_pdf)
+    assert is_pdfa3b(output_pdf)
+
+def test_repair_backend_rejects_content_findings(tmp_path):
+    """Test that the repair backend does not claim to fix unembedded fonts."""
+    input_pdf = tmp_path / "plain.pdf"
+    c = canvas.Canvas(str(input_pdf))
+    c.drawString(100, 750, "Plain")
+    c.save()
+    assert not PikepdfRepairBackend().convert(input_pdf, tmp_path / "out.pdf")
+    assert not (tmp_path / "out.pdf").exists()
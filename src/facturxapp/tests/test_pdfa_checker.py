@@ -0,0 +1,64 @@
+import pytest
+import pikepdf
+from pikepdf import Name
+from reportlab.pdfgen import canvas
+from facturxapp.utils.pdfa import add_srgb_output_intent
+from facturxapp.validators.pdfa_checker import check_pdfa3b, is_pdfa3b
+
+def _codes(findings):
+    return {finding.code for finding in findings}
+
+@pytest.fixture
+def pdfa_pdf(tmp_path):
+    """Create a minimal PDF that satisfies the structural PDF/A-3B checks."""
+    pdf_path = tmp_path / "minimal_pdfa.pdf"
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    with pdf.open_metadata() as meta:
+        meta["pdfaid:part"] = "3"
+        meta["pdfaid:conformance"] = "B"
+    add_srgb_output_intent(pdf)
+    pdf.save(pdf_path)
+    return pdf_path
+
+def test_minimal_pdfa_passes(pdfa_pdf):
+    """Test that a PDF with XMP, OutputIntent and ID passes."""
+    assert check_pdfa3b(pdfa_pdf) == []
+    assert is_pdfa3b(pdfa_pdf)
+
+def test_reference_pdfa_passes(pdfa_path):
+    """Test that the ZUGFeRD reference PDF/A-3B passes."""
+    assert check_pdfa3b(pdfa_path) == []
+
+def test_plain_reportlab_pdf_fails(tmp_path):
+    """Test that a plain reportlab PDF is reported with every missing piece."""
+    pdf_path = tmp_path / "plain.pdf"
+    c = canvas.Canvas(str(pdf_path))
+    c.drawString(100, 750, "Not PDF/A")
+    c.save()
+    codes = _codes(check_pdfa3b(pdf_path))
+    assert {"xmp-missing", "output-intent-missing", "font-not-embedded"} <= codes
+
+def test_wrong_pdfaid_and_javascript(pdfa_pdf, tmp_path):
+    """Test pdfaid part and JavaScript detection."""
+    with pikepdf.open(pdfa_pdf) as pdf:
+        with pdf.open_metadata() as meta:
+            meta["pdfaid:part"] = "1"
+        pdf.Root.OpenAction = pikepdf.Dictionary(S=Name.JavaScript, JS=pikepdf.String("app.alert(1)"))
+        codes = _codes(check_pdfa3b(pdf))
+    assert codes == {"pdfaid-part", "javascript"}
+
+def test_attachment_without_af(pdfa_pdf):
+    """Test that attachments must carry AFRelationship and be listed in AF."""
+    with pikepdf.open(pdfa_pdf) as pdf:
+        stream = pdf.make_stream(b"<xml/>")
+        filespec = pdf.make_indirect(pikepdf.Dictionary(
+            Type=Name.Filespec,
+            F=pikepdf.String("factur-x.xml"),
+            EF=pikepdf.Dictionary(F=stream),
+        ))
+        pdf.Root.Names = pikepdf.Dictionary(
+            EmbeddedFiles=pikepdf.Dictionary(Names=pikepdf.Array([pikepdf.String("factur-x.xml"), filespec]))
+        )
+        codes = _codes(check_pdfa3b(pdf))
+    assert codes == {"attachment-afrelationship-missing", "attachment-not-in-af", "attachment-subtype-missing"}
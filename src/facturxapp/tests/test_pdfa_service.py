@@ -1,4 +1,6 @@
+import asyncio
 import pytest
+import time
 from pathlib import Path
 import shutil
 from reportlab.pdfgen import canvas
@@ -60,4 +62,194 @@ def test_invalid_pdf(pdfa_service):
         pdfa_service.convert_to_pdfa3b(invalid_pdf)
     
     with pytest.raises(FileNotFoundError):
-        pdfa_service.validate_pdfa3b(invalid_pdf) 
\ No newline at end of file
+        pdfa_service.validate_pdfa3b(invalid_pdf)
+
+
+@pytest.fixture
+def offline_pdfa_service(monkeypatch, tmp_path):
+    """Create a PDF/A service without requiring Ghostscript on the host."""
+    from ..services import pdfa_service as module
+    monkeypatch.setattr(module, "ghostscript_version", lambda: "test")
+    return PDFAService(output_dir=str(tmp_path))
+
+def test_fast_path_for_pdfa_input(offline_pdfa_service, tmp_path, pdfa_path):
+    """Test that an input already PDF/A-3B is copied without conversion."""
+    source = pdfa_path
+    output_pdf, is_valid = offline_pdfa_service.convert_to_pdfa3b(source, tmp_path / "out.pdf")
+    assert is_valid
+    assert output_pdf.read_bytes() == source.read_bytes()
+    assert offline_pdfa_service.stats["fast_path"] == 1
+    assert offline_pdfa_service.stats["converted"] == 0
+
+def test_repair_route_without_ghostscript(offline_pdfa_service, tmp_path, near_pdfa_path):
+    """Test that an input lacking only an OutputIntent is repaired, not re-rendered."""
+    source = near_pdfa_path
+    result = offline_pdfa_service.convert(source, tmp_path / "out.pdf")
+    assert result.route == "repair"
+    assert result.is_valid
+    assert offline_pdfa_service.stats["repaired"] == 1
+    assert offline_pdfa_service.stats["converted"] == 0
+
+def test_convert_split_merges_ranges(offline_pdfa_service, tmp_path, near_pdfa_path):
+    """Test that page ranges are converted separately and merged in order."""
+    import pikepdf
+    source = tmp_path / "statement.pdf"
+    with pikepdf.open(near_pdfa_path) as pdf:
+        for _ in range(4):
+            pdf.pages.append(pdf.pages[0])
+        pdf.save(source)
+    result = offline_pdfa_service.convert_split(source, tmp_path / "out.pdf", pages_per_chunk=2)
+    assert result.route == "split"
+    assert result.is_valid
+    assert offline_pdfa_service.stats["repaired"] == 3
+    with pikepdf.open(result.output_pdf) as merged:
+        assert len(merged.pages) == 5
+
+def test_convert_bytes_fast_path(offline_pdfa_service, pdfa_path):
+    """Test that in-memory PDF/A-3B input is returned unchanged."""
+    source = pdfa_path
+    pdf_bytes = source.read_bytes()
+    output_bytes, is_valid = offline_pdfa_service.convert_bytes_to_pdfa3b(pdf_bytes)
+    assert is_valid
+    assert output_bytes == pdf_bytes
+    assert offline_pdfa_service.stats["fast_path"] == 1
+
+def test_convert_many_streams_results(offline_pdfa_service, tmp_path, pdfa_path):
+    """Test that convert_many yields one result per input with bounded workers."""
+    source = pdfa_path
+    inputs = []
+    for i in range(5):
+        target = tmp_path / f"invoice_{i}.pdf"
+        shutil.copyfile(source, target)
+        inputs.append(target)
+    results = list(offline_pdfa_service.convert_many(inputs, max_workers=2))
+    assert sorted(r[0] for r in results) == inputs
+    assert all(success and output.exists() for _, output, success in results)
+    assert offline_pdfa_service.stats["fast_path"] == 5
+
+def test_unknown_tuning_profile(offline_pdfa_service):
+    """Test that unknown tuning profiles are rejected up front."""
+    with pytest.raises(ValueError):
+        list(offline_pdfa_service.convert_many([], tuning="turbo"))
+
+def test_unknown_preset(monkeypatch, tmp_path):
+    """Test that unknown presets are rejected when the service is created."""
+    from ..services import pdfa_service as module
+    monkeypatch.setattr(module, "ghostscript_version", lambda: "test")
+    with pytest.raises(ValueError):
+        PDFAService(output_dir=str(tmp_path), preset="tiny")
+
+def test_preset_overrides_planned_strategy(monkeypatch, tmp_path, sample_pdf):
+    """Test that an explicit preset replaces the image flags of the planned strategy."""
+    from ..services import pdfa_service as module
+    from ..services.ghostscript import GS_STRATEGY_ARGS, preset_args
+    from ..services.pdfa_backends import PDFABackend
+    monkeypatch.setattr(module, "ghostscript_version", lambda: "test")
+
+    class RecordingBackend(PDFABackend):
+        name = "recording"
+
+        def __init__(self):
+            super().__init__()
+            self.calls = []
+
+        def convert(self, input_pdf, output_pdf, extra_args=()):
+            self.calls.append(tuple(extra_args))
+            return False
+
+    backend = RecordingBackend()
+    service = PDFAService(output_dir=str(tmp_path), backend=backend, preset="lossless")
+    plan = service.plan(sample_pdf)
+    service.convert(sample_pdf, tmp_path / "default.pdf")
+    service.convert(sample_pdf, tmp_path / "archive.pdf", preset="archive")
+    assert backend.calls == [preset_args("lossless"), preset_args("archive")]
+    assert preset_args("lossless") != GS_STRATEGY_ARGS[plan.strategy]
+    shutil.rmtree("test_output")
+
+
+@pytest.fixture
+def slow_gs(monkeypatch, tmp_path):
+    """Replace the Ghostscript executable with a script that sleeps."""
+    from ..services import ghostscript
+    script = tmp_path / "slow-gs"
+    script.write_text("#!/bin/sh\nsleep 0.5\n")
+    script.chmod(0o755)
+    monkeypatch.setattr(ghostscript, "GS_EXECUTABLE", str(script))
+    return script
+
+def test_async_conversion_timeout(offline_pdfa_service, slow_gs, sample_pdf):
+    """Test that the async conversion raises once its deadline passes."""
+    with pytest.raises(TimeoutError):
+        asyncio.run(offline_pdfa_service.convert_to_pdfa3b_async(sample_pdf, timeout=0.1))
+    shutil.rmtree("test_output")
+
+def test_async_concurrency_limit(monkeypatch, tmp_path, slow_gs, sample_pdf):
+    """Test that max_concurrency bounds concurrent Ghostscript runs."""
+    from ..services import pdfa_service as module
+    monkeypatch.setattr(module, "ghostscript_version", lambda: "test")
+    service = PDFAService(output_dir=str(tmp_path), max_concurrency=2)
+
+    async def convert_four():
+        return await asyncio.gather(*(
+            service.convert_to_pdfa3b_async(sample_pdf, tmp_path / f"out_{i}.pdf")
+            for i in range(4)
+        ))
+
+    start = time.monotonic()
+    results = asyncio.run(convert_four())
+    elapsed = time.monotonic() - start
+    # The fake Ghostscript writes nothing, so every conversion fails
+    assert [success for _, success in results] == [False] * 4
+    # Two batches of two 0.5s runs
+    assert elapsed >= 1.0
+    shutil.rmtree("test_output")
+
+
+def test_async_conversion_uses_planner(offline_pdfa_service, tmp_path, near_pdfa_path):
+    """Test that async conversions take the same routes as synchronous ones."""
+    source = near_pdfa_path
+    output_pdf, is_valid = asyncio.run(
+        offline_pdfa_service.convert_to_pdfa3b_async(source, tmp_path / "out.pdf"))
+    assert is_valid
+    assert offline_pdfa_service.stats["repaired"] == 1
+    assert offline_pdfa_service.stats["converted"] == 0
+    assert asyncio.run(offline_pdfa_service.validate_pdfa3b_async(output_pdf))
+
+def test_fallback_output_is_not_cached(monkeypatch, tmp_path, sample_pdf, pdfa_path):
+    """Test that only the full rung's output is cached under the full command's key."""
+    from ..services import pdfa_service as module
+    from ..services.conversion_cache import ConversionCache
+    from ..services.conversion_ladder import RUNG_FULL, RUNG_MINIMAL, ConversionLadder, LadderRung
+    from ..services.pdfa_backends import PDFABackend
+    monkeypatch.setattr(module, "ghostscript_version", lambda: "test")
+    compliant = pdfa_path
+
+    class FlakyBackend(PDFABackend):
+        name = "flaky"
+
+        def __init__(self, succeed):
+            super().__init__()
+            self.succeed = succeed
+            self.calls = 0
+
+        def convert(self, input_pdf, output_pdf, extra_args=()):
+            self.calls += 1
+            if self.succeed:
+                shutil.copyfile(compliant, output_pdf)
+            return self.succeed
+
+    full, minimal = FlakyBackend(False), FlakyBackend(True)
+    ladder = ConversionLadder([LadderRung(RUNG_FULL, full, True),
+                               LadderRung(RUNG_MINIMAL, minimal, False)])
+    service = PDFAService(output_dir=str(tmp_path), backend=full, ladder=ladder,
+                          cache=ConversionCache(tmp_path / "cache"))
+    first = service.convert(sample_pdf, tmp_path / "first.pdf")
+    assert first.route == module.ROUTE_GHOSTSCRIPT and first.rung == RUNG_MINIMAL
+
+    full.succeed = True
+    second = service.convert(sample_pdf, tmp_path / "second.pdf")
+    assert second.route == module.ROUTE_GHOSTSCRIPT and second.rung == RUNG_FULL
+    third = service.convert(sample_pdf, tmp_path / "third.pdf")
+    assert third.route == module.ROUTE_CACHE
+    assert full.calls == 2 and minimal.calls == 1
+    shutil.rmtree("test_output")
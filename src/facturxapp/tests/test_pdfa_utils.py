@@ -0,0 +1,63 @@
+import pikepdf
+from pikepdf import Name
+from facturxapp.utils.pdfa import can_repair, make_pdfa3b, repair_pdfa3b
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+def _codes(findings):
+    return {finding.code for finding in findings}
+
+def _reload(pdf, tmp_path):
+    """Save and reopen so the trailer ID is written."""
+    path = tmp_path / "reloaded.pdf"
+    pdf.save(path)
+    return pikepdf.open(path)
+
+def test_make_pdfa3b_on_blank_document(tmp_path):
+    """Test that a blank document becomes structurally PDF/A-3B."""
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    make_pdfa3b(pdf)
+    with _reload(pdf, tmp_path) as reloaded:
+        assert check_pdfa3b(reloaded) == []
+
+def test_repair_missing_output_intent(tmp_path, near_pdfa_path):
+    """Test that the bundled sample only lacking an OutputIntent is repaired."""
+    with pikepdf.open(near_pdfa_path) as pdf:
+        codes = _codes(check_pdfa3b(pdf))
+        assert codes == {"output-intent-missing"}
+        assert can_repair(pdf, codes)
+        repair_pdfa3b(pdf, codes)
+        with _reload(pdf, tmp_path) as reloaded:
+            assert check_pdfa3b(reloaded) == []
+
+def test_repair_pdfaid_and_attachments(tmp_path):
+    """Test XMP pdfaid and attachment repairs."""
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    make_pdfa3b(pdf)
+    with pdf.open_metadata() as meta:
+        meta["pdfaid:part"] = "1"
+    filespec = pdf.make_indirect(pikepdf.Dictionary(
+        Type=Name.Filespec,
+        F=pikepdf.String("factur-x.xml"),
+        EF=pikepdf.Dictionary(F=pdf.make_stream(b"<xml/>")),
+    ))
+    pdf.Root.Names = pikepdf.Dictionary(
+        EmbeddedFiles=pikepdf.Dictionary(Names=pikepdf.Array([pikepdf.String("factur-x.xml"), filespec]))
+    )
+    codes = _codes(check_pdfa3b(pdf))
+    assert codes == {"pdfaid-part", "document-id-missing", "attachment-afrelationship-missing",
+                     "attachment-not-in-af", "attachment-subtype-missing"}
+    repair_pdfa3b(pdf, codes)
+    with _reload(pdf, tmp_path) as reloaded:
+        assert check_pdfa3b(reloaded) == []
+        assert reloaded.Root.AF[0].EF.F.Subtype == Name("/application/xml")
+
+def test_cannot_repair_content_findings(tmp_path):
+    """Test that unembedded fonts and CMYK content need Ghostscript."""
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    assert not can_repair(pdf, {"font-not-embedded"})
+    pdf.pages[0].obj.Contents = pdf.make_stream(b"0 0 0 1 k 0 0 10 10 re f")
+    assert not can_repair(pdf, {"output-intent-missing"})
+    assert can_repair(pdf, {"pdfaid-part"})
@@ -0,0 +1,36 @@
+import io
+import pytest
+import pikepdf
+from facturxapp.services.embedding import FACTURX_FILENAME, embed_facturx
+from facturxapp.utils.save_profiles import save_options
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+XML = b"<rsm:CrossIndustryInvoice xmlns:rsm='urn:test'>" + b"<line/>" * 200 + b"</rsm:CrossIndustryInvoice>"
+
+
+def test_unknown_save_profile():
+    """Test that unknown save profiles are rejected."""
+    with pytest.raises(ValueError):
+        save_options("tiny")
+
+
+@pytest.mark.parametrize("profile", ["default", "small", "fast", "web"])
+def test_save_profiles_keep_pdfa(profile, pdfa_path, find_filespec):
+    """Test that every profile writes a readable PDF/A-3B with the XML attached."""
+    output = embed_facturx(pdfa_path.read_bytes(), XML, save_profile=profile)
+    with pikepdf.open(io.BytesIO(output)) as pdf:
+        assert not check_pdfa3b(pdf)
+        assert find_filespec(pdf, FACTURX_FILENAME).EF.F.read_bytes() == XML
+        assert pdf.is_linearized == (profile == "web")
+
+
+def test_small_and_fast_profiles(pdfa_path, find_filespec):
+    """Test that "small" compresses the XML and uses object streams, "fast" does neither."""
+    small = embed_facturx(pdfa_path.read_bytes(), XML, save_profile="small")
+    fast = embed_facturx(pdfa_path.read_bytes(), XML, save_profile="fast")
+    assert len(small) < len(fast)
+    assert b"/ObjStm" in small
+    with pikepdf.open(io.BytesIO(small)) as pdf:
+        assert find_filespec(pdf, FACTURX_FILENAME).EF.F.Filter == pikepdf.Name.FlateDecode
+    with pikepdf.open(io.BytesIO(fast)) as pdf:
+        assert pikepdf.Name.Filter not in find_filespec(pdf, FACTURX_FILENAME).EF.F
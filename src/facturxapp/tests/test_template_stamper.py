@@ -0,0 +1,64 @@
+import io
+import pytest
+import pikepdf
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from facturxapp.services.embedding import FACTURX_FILENAME
+from facturxapp.services.pdf_service import FONT_REGULAR, _register_fonts
+from facturxapp.services.template_stamper import TemplateStamper
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+def _overlay(text, pages=1):
+    _register_fonts()
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, initialFontName=FONT_REGULAR)
+    for page in range(pages):
+        c.setFont(FONT_REGULAR, 12)
+        c.drawString(50, 50, f"{text} {page}")
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def test_stamp_clones_template(pdfa_path, minimal_xml, find_filespec):
+    """Test that each invoice keeps the template bytes and gets its own content, XML and ID."""
+    stamper = TemplateStamper(pdfa_path)
+    template = pdfa_path.read_bytes()
+    first = stamper.stamp(_overlay("INV-1"), minimal_xml)
+    second = stamper.stamp(_overlay("INV-2"), b"<other/>")
+    assert first.startswith(template) and second.startswith(template)
+    ids = []
+    for output, xml in ((first, minimal_xml), (second, b"<other/>")):
+        with pikepdf.open(io.BytesIO(output)) as pdf:
+            assert not check_pdfa3b(pdf)
+            assert find_filespec(pdf, FACTURX_FILENAME).EF.F.read_bytes() == xml
+            assert len(pdf.pages[0].Resources.XObject) == 2
+            ids.append(bytes(pdf.trailer.ID[0]))
+    assert ids[0] != ids[1]
+
+
+def test_stamp_repeats_last_template_page(tmp_path, pdfa_path, minimal_xml):
+    """Test that extra overlay pages are drawn onto fresh copies of the last template page."""
+    output = tmp_path / "invoice.pdf"
+    TemplateStamper(pdfa_path).stamp(_overlay("INV-3", pages=3), minimal_xml, output)
+    with pikepdf.open(output) as pdf:
+        assert len(pdf.pages) == 3
+        forms = [set(page.Resources.XObject.keys()) for page in pdf.pages]
+        assert forms[1] != forms[2]
+        assert all(len(keys) == 2 for keys in forms)
+
+
+def test_stamp_many_counts_failures(tmp_path, pdfa_path, minimal_xml):
+    """Test that a bad job is reported without stopping the batch."""
+    stamper = TemplateStamper(pdfa_path)
+    jobs = [(_overlay("ok"), minimal_xml, tmp_path / "ok.pdf"),
+            (b"not a pdf", minimal_xml, tmp_path / "bad.pdf"),
+            (None, minimal_xml, tmp_path / "bare.pdf")]
+    assert stamper.stamp_many(jobs) == (2, 1)
+    assert (tmp_path / "bare.pdf").exists()
+
+
+def test_template_must_be_pdfa(near_pdfa_path):
+    """Test that a template failing the PDF/A-3B checks is rejected up front."""
+    with pytest.raises(ValueError, match="output-intent-missing"):
+        TemplateStamper(near_pdfa_path)
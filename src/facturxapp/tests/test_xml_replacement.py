@@ -0,0 +1,89 @@
+import hashlib
+import shutil
+import pytest
+import pikepdf
+from pikepdf import Name
+from facturxapp.services.embedding import FACTURX_FILENAME, embed_facturx, find_facturx_filespec, replace_facturx_xml
+from facturxapp.services.xml_replacement import pair_by_stem, replace_many
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+@pytest.fixture
+def invoice(tmp_path, pdfa_path):
+    target = tmp_path / "invoice.pdf"
+    embed_facturx(pdfa_path, b"<original/>", target, profile="BASIC_WL")
+    return target
+
+
+def test_replace_in_place(invoice):
+    """Test that the XML, its Params and the XMP are updated by appending only."""
+    original = invoice.read_bytes()
+    replace_facturx_xml(invoice, b"<corrected/>")
+    assert invoice.read_bytes().startswith(original)
+    with pikepdf.open(invoice) as pdf:
+        assert not check_pdfa3b(pdf)
+        filespec = find_facturx_filespec(pdf)
+        stream = filespec.EF.F
+        assert stream.read_bytes() == b"<corrected/>"
+        assert int(stream.Params.Size) == len(b"<corrected/>")
+        assert bytes(stream.Params.CheckSum) == hashlib.md5(b"<corrected/>").digest()
+        # The declared profile is kept
+        assert filespec.AFRelationship == Name.Data
+        xmp = pdf.Root.Metadata.read_bytes()
+        assert b"<fx:ConformanceLevel>BASIC WL</fx:ConformanceLevel>" in xmp
+        assert xmp.count(b"Factur-X PDFA Extension Schema") == 1
+
+
+def test_replace_keeps_document_properties(tmp_path, pdfa_path):
+    """Test that the title and author survive a correction, in the Info dictionary and the XMP."""
+    target = tmp_path / "titled.pdf"
+    with pikepdf.open(pdfa_path) as pdf:
+        pdf.docinfo["/Title"] = "Invoice 42"
+        pdf.docinfo["/Author"] = "ACME Billing"
+        pdf.save(target)
+    embed_facturx(target, b"<original/>", target, merge_info=True)
+    replace_facturx_xml(target, b"<corrected/>")
+    with pikepdf.open(target) as pdf:
+        assert str(pdf.docinfo["/Title"]) == "Invoice 42"
+        assert str(pdf.docinfo["/Author"]) == "ACME Billing"
+        xmp = pdf.Root.Metadata.read_bytes()
+        assert b"Invoice 42" in xmp and b"ACME Billing" in xmp
+        assert find_facturx_filespec(pdf).EF.F.read_bytes() == b"<corrected/>"
+
+
+def test_replace_found_through_name_tree(invoice, tmp_path):
+    """Test that a filespec listed only in the EmbeddedFiles name tree is found."""
+    with pikepdf.open(invoice, allow_overwriting_input=True) as pdf:
+        del pdf.Root[Name.AF]
+        pdf.save(invoice)
+    output = tmp_path / "out.pdf"
+    replace_facturx_xml(invoice, b"<corrected/>", output, profile="EN16931")
+    with pikepdf.open(output) as pdf:
+        [filespec] = pdf.Root.AF
+        assert filespec.EF.F.read_bytes() == b"<corrected/>"
+        assert filespec.AFRelationship == Name.Alternative
+
+
+def test_replace_without_attachment(tmp_path, pdfa_path):
+    """Test that PDFs without factur-x.xml are rejected."""
+    target = tmp_path / "plain.pdf"
+    shutil.copyfile(pdfa_path, target)
+    with pytest.raises(ValueError, match=FACTURX_FILENAME):
+        replace_facturx_xml(target, b"<x/>")
+
+
+def test_replace_many_by_stem(tmp_path, invoice, pdfa_path):
+    """Test that a directory run pairs files by stem and reports each result."""
+    pdf_dir, xml_dir = tmp_path / "pdf", tmp_path / "xml"
+    pdf_dir.mkdir()
+    xml_dir.mkdir()
+    shutil.copyfile(invoice, pdf_dir / "a.pdf")
+    shutil.copyfile(pdfa_path, pdf_dir / "b.pdf")
+    shutil.copyfile(invoice, pdf_dir / "c.pdf")
+    (xml_dir / "a.xml").write_bytes(b"<a/>")
+    (xml_dir / "b.xml").write_bytes(b"<b/>")
+    pairs = pair_by_stem(pdf_dir, xml_dir)
+    assert [pdf.name for pdf, _ in pairs] == ["a.pdf", "b.pdf"]
+    results = list(replace_many(pairs, tmp_path / "out", max_workers=2))
+    assert [result.success for result in results] == [True, False]
+    with pikepdf.open(tmp_path / "out" / "a.pdf") as pdf:
+        assert find_facturx_filespec(pdf).EF.F.read_bytes() == b"<a/>"
@@ -0,0 +1,54 @@
+import io
+import pikepdf
+from datetime import datetime, timezone
+from facturxapp.services.embedding import embed_facturx
+from facturxapp.utils.xmp import (
+    FACTURX_NS,
+    DocumentInfo,
+    FacturXProperties,
+    read_xmp_properties,
+    xmp_packet,
+)
+from facturxapp.validators.pdfa_checker import check_pdfa3b
+
+
+def test_packet_escapes_values():
+    """Test that markup and control characters in values keep the packet well-formed."""
+    created = datetime(2024, 1, 31, 12, 0, tzinfo=timezone.utc)
+    packet = xmp_packet(FacturXProperties("EN 16931", "factur-x.xml", "1.0"),
+                        DocumentInfo(title='Q1 <draft> & "final"\x07', producer="Acme", create_date=created))
+    properties = read_xmp_properties(packet)
+    assert properties["dc:title"] == 'Q1 <draft> & "final"'
+    assert properties["pdf:Producer"] == "Acme"
+    assert properties["xmp:CreateDate"] == "2024-01-31T12:00:00+00:00"
+    assert properties["fx:ConformanceLevel"] == "EN 16931"
+    assert properties["pdfaid:part"] == "3"
+    assert packet.count(b"Factur-X PDFA Extension Schema") == 1
+
+
+def test_read_properties_whatever_the_prefix():
+    """Test that attribute-form properties under another prefix are found by namespace."""
+    packet = (f'<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+              f'<rdf:Description rdf:about="" xmlns:f="{FACTURX_NS}" f:ConformanceLevel="BASIC" '
+              f'xmlns:id="http://www.aiim.org/pdfa/ns/id/"><id:part>3</id:part></rdf:Description>'
+              f'</rdf:RDF></x:xmpmeta>').encode()
+    assert read_xmp_properties(packet) == {"fx:ConformanceLevel": "BASIC", "pdfaid:part": "3"}
+    assert read_xmp_properties(b"<not xmp") == {}
+
+
+def test_info_dropped_unless_merged(pdfa_path, minimal_xml):
+    """Test that the Info dictionary is dropped by default and mirrored in the XMP with merge_info."""
+    with pikepdf.open(io.BytesIO(embed_facturx(pdfa_path.read_bytes(), minimal_xml))) as pdf:
+        assert pikepdf.Name.Info not in pdf.trailer
+        assert "pdf:Producer" not in read_xmp_properties(pdf)
+        assert not check_pdfa3b(pdf)
+
+    for incremental in (False, True):
+        output = embed_facturx(pdfa_path.read_bytes(), minimal_xml, incremental=incremental, merge_info=True)
+        with pikepdf.open(io.BytesIO(output)) as pdf:
+            properties = read_xmp_properties(pdf)
+            assert str(pdf.docinfo.Producer) == properties["pdf:Producer"]
+            assert str(pdf.docinfo.Title) == properties["dc:title"] == "ZUGFeRD 1 Rechnung"
+            assert properties["xmp:CreateDate"] == "2019-05-08T18:18:01+02:00"
+            assert str(pdf.docinfo.CreationDate).startswith("D:20190508181801+02'00")
+            assert properties["fx:ConformanceLevel"] == "EN 16931"
@@ -0,0 +1,235 @@
+"""
+Name trees (ISO 32000-1, 7.9.6), as used for the EmbeddedFiles of a PDF.
+
+lookup() descends through Kids by binary search on their Limits and then
+binary-searches the leaf, so finding one of n attachments reads O(log n)
+nodes. insert() keeps the keys sorted and the tree balanced the way a
+B-tree does: a leaf with more than MAX_ENTRIES entries, or a node with
+more than MAX_KIDS kids, is split in two and the split propagates up;
+the tree grows a level when the root splits. The root dictionary itself
+is never replaced, so references to it stay valid.
+
+Trees written by other tools are not always sorted. lookup() falls back
+to scanning a leaf when the binary search misses, and insert() into a
+root that is a single unsorted or oversized Names array first rebuilds
+it as a balanced tree.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+MAX_ENTRIES = 32
+MAX_KIDS = 32
+
+
+def key_text(key) -> str:
+    """A name tree key as text."""
+    # Some embedders wrote Name objects instead of strings as keys
+    return str(key).lstrip("/")
+
+
+def _limits(node) -> Optional[Tuple[str, str]]:
+    limits = node.get(Name.Limits) if isinstance(node, pikepdf.Dictionary) else None
+    if limits is None or len(limits) != 2:
+        return None
+    return key_text(limits[0]), key_text(limits[1])
+
+
+def _keys(names: pikepdf.Array) -> List[str]:
+    return [key_text(names[index]) for index in range(0, len(names) - 1, 2)]
+
+
+def iter_entries(node) -> Iterator[Tuple[str, pikepdf.Object]]:
+    """Yield (key, value) for every entry of the tree, in tree order."""
+    if not isinstance(node, pikepdf.Dictionary):
+        return
+    names = node.get(Name.Names, ())
+    for index in range(0, len(names) - 1, 2):
+        yield key_text(names[index]), names[index + 1]
+    for kid in node.get(Name.Kids, ()):
+        yield from iter_entries(kid)
+
+
+def _lookup_leaf(names: pikepdf.Array, key: str):
+    keys = _keys(names)
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        return names[2 * index + 1]
+    # The leaf may not be sorted
+    for index, existing in enumerate(keys):
+        if existing == key:
+            return names[2 * index + 1]
+    return None
+
+
+def lookup(node, key: str):
+    """
+    Find key in the tree rooted at node.
+
+    Returns:
+        The value stored under key, or None
+    """
+    if not isinstance(node, pikepdf.Dictionary):
+        return None
+    kids = node.get(Name.Kids)
+    if kids is not None and len(kids):
+        low, high = 0, len(kids) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            limits = _limits(kids[middle])
+            if limits is None:
+                break
+            if key < limits[0]:
+                high = middle - 1
+            elif key > limits[1]:
+                low = middle + 1
+            else:
+                return lookup(kids[middle], key)
+        else:
+            return None
+        # Kids without Limits: try every kid that may hold the key
+        for kid in kids:
+            limits = _limits(kid)
+            if limits is None or limits[0] <= key <= limits[1]:
+                found = lookup(kid, key)
+                if found is not None:
+                    return found
+        return None
+    names = node.get(Name.Names)
+    return _lookup_leaf(names, key) if names is not None else None
+
+
+def _leaf(pdf: Pdf, entries: List[Tuple[str, pikepdf.Object]]) -> pikepdf.Dictionary:
+    names = pikepdf.Array()
+    for key, value in entries:
+        names.append(pikepdf.String(key))
+        names.append(value)
+    return pdf.make_indirect(pikepdf.Dictionary(
+        Names=names,
+        Limits=pikepdf.Array([pikepdf.String(entries[0][0]), pikepdf.String(entries[-1][0])]),
+    ))
+
+
+def _parent(pdf: Pdf, kids: List[pikepdf.Dictionary]) -> pikepdf.Dictionary:
+    return pdf.make_indirect(pikepdf.Dictionary(
+        Kids=pikepdf.Array(kids),
+        Limits=pikepdf.Array([pikepdf.String(_limits(kids[0])[0]), pikepdf.String(_limits(kids[-1])[1])]),
+    ))
+
+
+def _chunks(items: list, size: int) -> List[list]:
+    """Split items into the fewest chunks of at most size, as even as possible."""
+    count = -(-len(items) // size)
+    step, extra = divmod(len(items), count)
+    chunks, start = [], 0
+    for index in range(count):
+        end = start + step + (1 if index < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def _set_root(root: pikepdf.Dictionary, key: Name, value: pikepdf.Array) -> None:
+    for stale in (Name.Names, Name.Kids, Name.Limits):
+        if stale in root:
+            del root[stale]
+    root[key] = value
+
+
+def build(pdf: Pdf, root: pikepdf.Dictionary, entries: Iterable[Tuple[str, pikepdf.Object]]) -> None:
+    """
+    Replace the content of root with a balanced tree of entries.
+
+    Entries are sorted by key; for a repeated key the last one wins.
+    """
+    unique = dict(entries)
+    ordered = [(key, unique[key]) for key in sorted(unique)]
+    if len(ordered) <= MAX_ENTRIES:
+        leaf = pikepdf.Array()
+        for key, value in ordered:
+            leaf.append(pikepdf.String(key))
+            leaf.append(value)
+        _set_root(root, Name.Names, leaf)
+        return
+    level = [_leaf(pdf, chunk) for chunk in _chunks(ordered, MAX_ENTRIES)]
+    while len(level) > MAX_KIDS:
+        level = [_parent(pdf, chunk) for chunk in _chunks(level, MAX_KIDS)]
+    _set_root(root, Name.Kids, pikepdf.Array(level))
+
+
+def _update_limits(node: pikepdf.Dictionary) -> None:
+    kids = node.get(Name.Kids)
+    if kids is not None and len(kids):
+        low, high = _limits(kids[0])[0], _limits(kids[-1])[1]
+    else:
+        keys = _keys(node.Names)
+        low, high = keys[0], keys[-1]
+    node[Name.Limits] = pikepdf.Array([pikepdf.String(low), pikepdf.String(high)])
+
+
+def _split(pdf: Pdf, node: pikepdf.Dictionary, key: Name) -> pikepdf.Dictionary:
+    """Move the upper half of an overfull node into a new right sibling."""
+    items = list(node[key])
+    half = (len(items) // 2) & ~1 if key == Name.Names else len(items) // 2
+    node[key] = pikepdf.Array(items[:half])
+    sibling = pdf.make_indirect(pikepdf.Dictionary({str(key): pikepdf.Array(items[half:])}))
+    _update_limits(node)
+    _update_limits(sibling)
+    return sibling
+
+
+def _insert(pdf: Pdf, node: pikepdf.Dictionary, key: str, value, root: bool) -> Optional[pikepdf.Dictionary]:
+    """Insert below node; return a new right sibling if node had to split."""
+    kids = node.get(Name.Kids)
+    if kids is not None and len(kids):
+        # The last kid starting at or before key, or the first one
+        lows = [(_limits(kid) or ("", ""))[0] for kid in kids]
+        index = max(bisect_right(lows, key) - 1, 0)
+        sibling = _insert(pdf, kids[index], key, value, False)
+        if sibling is not None:
+            kids.insert(index + 1, sibling)
+        if len(kids) > MAX_KIDS:
+            return _split(pdf, node, Name.Kids)
+    else:
+        if Name.Names not in node:
+            node[Name.Names] = pikepdf.Array()
+        keys = _keys(node.Names)
+        if keys != sorted(keys):
+            entries = sorted(zip(keys, list(node.Names)[1::2]), key=lambda entry: entry[0])
+            node[Name.Names] = pikepdf.Array(
+                [item for entry_key, entry_value in entries for item in (pikepdf.String(entry_key), entry_value)])
+            keys = [entry_key for entry_key, _ in entries]
+        names = node.Names
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            names[2 * index + 1] = value
+        else:
+            names.insert(2 * index, pikepdf.String(key))
+            names.insert(2 * index + 1, value)
+        if len(names) > 2 * MAX_ENTRIES:
+            return _split(pdf, node, Name.Names)
+    if not root:
+        _update_limits(node)
+    return None
+
+
+def insert(pdf: Pdf, root: pikepdf.Dictionary, key: str, value) -> None:
+    """
+    Set key to value in the tree rooted at root, keeping it sorted and balanced.
+
+    An existing entry for key is replaced.
+    """
+    names = root.get(Name.Names)
+    if Name.Kids not in root and names is not None:
+        keys = _keys(names)
+        if len(keys) >= MAX_ENTRIES or keys != sorted(keys):
+            build(pdf, root, [*iter_entries(root), (key, value)])
+            return
+    sibling = _insert(pdf, root, key, value, True)
+    if sibling is not None:
+        # The root split: move its first half into a new node below it
+        first = pdf.make_indirect(pikepdf.Dictionary(root))
+        _set_root(root, Name.Kids, pikepdf.Array([first, sibling]))
@@ -0,0 +1,158 @@
+"""
+Named ways of reading PDFs with pikepdf, trading resident memory against isolation.
+
+Every service opens its input with open_pdf(), so one setting decides how
+the input bytes reach QPDF:
+
+- "mmap" (the default): the file is memory-mapped. Its pages are read
+  on demand and belong to the page cache, so they are shared between
+  workers opening the same file and can be dropped under memory pressure
+  instead of counting as private memory of each process. Files that
+  cannot be mapped (pipes, some network filesystems) are read as with
+  "stream".
+- "stream": read through the file descriptor as QPDF needs the bytes.
+- "memory": the whole file is copied into a private buffer first, which
+  is what pikepdf's allow_overwriting_input does. The file can then be
+  replaced or deleted while the document is open.
+
+Inputs already in memory (bytes, bytearray, memoryview) are read through
+a view of the caller's buffer in every mode instead of being copied.
+
+A mapped or streamed input must not be truncated while the document is
+open, so write_pdf() saves to a temporary file next to the output and
+renames it over the input when they are the same file.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from pikepdf import AccessMode, Pdf
+
+DEFAULT_IO_MODE = "mmap"
+
+# access_mode for Pdf.open(); "memory" reads the file itself
+IO_MODES: Dict[str, Optional[AccessMode]] = {
+    "mmap": AccessMode.mmap,
+    "stream": AccessMode.stream,
+    "memory": None,
+}
+
+Buffer = Union[bytes, bytearray, memoryview]
+Source = Union[str, Path, Buffer, BinaryIO]
+
+
+def access_mode(io_mode: Optional[str] = None) -> Optional[AccessMode]:
+    """
+    Return the Pdf.open() access mode of an I/O mode.
+
+    Args:
+        io_mode (Optional[str]): Mode name, defaults to DEFAULT_IO_MODE
+
+    Returns:
+        Optional[AccessMode]: None for "memory", which reads the file up front
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    try:
+        return IO_MODES[io_mode or DEFAULT_IO_MODE]
+    except KeyError:
+        raise ValueError(f"Unknown I/O mode: {io_mode}") from None
+
+
+class _BufferReader(io.RawIOBase):
+    """A seekable, read-only file object over a buffer, without copying it."""
+
+    def __init__(self, buffer: Buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(base + offset, 0)
+        return self._position
+
+    def readinto(self, target) -> int:
+        chunk = self._view[self._position:self._position + len(target)]
+        target[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+def open_pdf(source: Source, io_mode: Optional[str] = None, **kwargs: Any) -> Pdf:
+    """
+    Open a PDF with an I/O mode.
+
+    Args:
+        source: Path to the PDF, the PDF as bytes, bytearray or memoryview,
+            or a readable and seekable binary file object
+        io_mode (Optional[str]): How a file is read (see IO_MODES)
+        **kwargs: Other Pdf.open() arguments, e.g. inherit_page_attributes
+
+    Returns:
+        Pdf: The open document; close it or use it as a context manager
+    """
+    mode = access_mode(io_mode)
+    if isinstance(source, bytes):
+        # BytesIO shares an immutable bytes object until it is written to
+        return Pdf.open(io.BytesIO(source), **kwargs)
+    if isinstance(source, (bytearray, memoryview)):
+        return Pdf.open(_BufferReader(source), **kwargs)
+    if mode is None and isinstance(source, (str, Path)):
+        return Pdf.open(io.BytesIO(Path(source).read_bytes()), **kwargs)
+    if mode is None:
+        return Pdf.open(source, **kwargs)
+    return Pdf.open(source, access_mode=mode, **kwargs)
+
+
+def _same_file(first: str, second: Union[str, Path]) -> bool:
+    try:
+        return os.path.samefile(first, second)
+    except (OSError, ValueError):
+        return False
+
+
+def write_pdf(pdf: Pdf, output: Union[str, Path, BinaryIO], **options: Any) -> None:
+    """
+    Pdf.save(), also when output is the file pdf was opened from.
+
+    In that case the document is saved to a temporary file in the same
+    directory that then replaces the input, so the open file is never
+    truncated under QPDF.
+
+    Args:
+        pdf (Pdf): Document to save
+        output: Path or binary file object to write to
+        **options: Pdf.save() keyword arguments
+    """
+    if not isinstance(output, (str, Path)) or not _same_file(pdf.filename, output):
+        pdf.save(output, **options)
+        return
+    output = Path(output)
+    fd, temp = tempfile.mkstemp(dir=output.parent, prefix=f".{output.stem}-", suffix=".pdf")
+    os.close(fd)
+    try:
+        pdf.save(temp, **options)
+        shutil.copymode(output, temp)
+        os.replace(temp, output)
+    except BaseException:
+        os.unlink(temp)
+        raise
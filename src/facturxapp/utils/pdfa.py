@@ -0,0 +1,181 @@
+"""Helpers for adding PDF/A structures to documents with pikepdf."""
+
+import mimetypes
+import warnings
+from functools import lru_cache
+from typing import Iterable
+
+import pikepdf
+from pikepdf import Name, Pdf
+
+from .name_tree import iter_entries
+
+SRGB_OUTPUT_CONDITION = "sRGB IEC61966-2.1"
+
+
+@lru_cache(maxsize=1)
+def srgb_icc_profile() -> bytes:
+    """Return the bytes of an sRGB ICC profile, built once per process."""
+    from PIL import ImageCms
+
+    profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+    return profile.tobytes()
+
+
+def add_srgb_output_intent(pdf: Pdf) -> None:
+    """
+    Add a GTS_PDFA1 OutputIntent with an embedded sRGB ICC profile.
+
+    Existing OutputIntents are kept; nothing is added if a GTS_PDFA1
+    intent is already present.
+    """
+    intents = pdf.Root.get(Name.OutputIntents)
+    if intents is not None:
+        for intent in intents:
+            if intent.get(Name.S) == Name.GTS_PDFA1:
+                return
+    icc_stream = pdf.make_stream(srgb_icc_profile())
+    icc_stream[Name.N] = 3
+    intent = pdf.make_indirect(pikepdf.Dictionary(
+        Type=Name.OutputIntent,
+        S=Name.GTS_PDFA1,
+        OutputConditionIdentifier=pikepdf.String(SRGB_OUTPUT_CONDITION),
+        Info=pikepdf.String(SRGB_OUTPUT_CONDITION),
+        RegistryName=pikepdf.String("http://www.color.org"),
+        DestOutputProfile=icc_stream,
+    ))
+    if intents is None:
+        pdf.Root[Name.OutputIntents] = pikepdf.Array([intent])
+    else:
+        intents.append(intent)
+
+
+def add_pdfa_metadata(pdf: Pdf, part: str = "3", conformance: str = "B") -> None:
+    """
+    Write an XMP packet declaring PDF/A conformance.
+
+    Values already in the document information dictionary are carried over
+    into the XMP packet so the two stay consistent, as PDF/A requires.
+    """
+    with pdf.open_metadata(set_pikepdf_as_editor=False) as meta:
+        if Name.Metadata not in pdf.Root:
+            with warnings.catch_warnings():
+                # Keys without an XMP equivalent (e.g. /Trapped) are dropped
+                warnings.simplefilter("ignore", UserWarning)
+                meta.load_from_docinfo(pdf.docinfo)
+        meta["pdfaid:part"] = part
+        meta["pdfaid:conformance"] = conformance
+
+
+def make_pdfa3b(pdf: Pdf) -> None:
+    """
+    Add the document-level structures PDF/A-3B requires.
+
+    This covers the sRGB OutputIntent and the XMP pdfaid declaration; the
+    trailer ID is written by pikepdf on save. Page content is not touched,
+    so fonts must already be embedded.
+    """
+    add_srgb_output_intent(pdf)
+    add_pdfa_metadata(pdf)
+
+
+# Checker findings that can be fixed on the object level, without
+# re-rendering any page. Everything else needs Ghostscript.
+REPAIRABLE_FINDINGS = frozenset({
+    "xmp-missing",
+    "xmp-invalid",
+    "pdfaid-part",
+    "pdfaid-conformance",
+    "output-intent-missing",
+    "output-intent-icc-missing",
+    "document-id-missing",
+    "attachment-afrelationship-missing",
+    "attachment-not-in-af",
+    "attachment-subtype-missing",
+})
+
+_OUTPUT_INTENT_FINDINGS = ("output-intent-missing", "output-intent-icc-missing")
+
+
+def uses_device_cmyk(pdf: Pdf) -> bool:
+    """
+    Return True if any page paints in DeviceCMYK.
+
+    An sRGB OutputIntent only covers DeviceRGB and DeviceGray content, so
+    such documents cannot be repaired by adding one.
+    """
+    for page in pdf.pages:
+        resources = page.obj.get(Name.Resources)
+        if isinstance(resources, pikepdf.Dictionary):
+            for colorspace in resources.get(Name.ColorSpace, pikepdf.Dictionary()).values():
+                if colorspace == Name.DeviceCMYK:
+                    return True
+            for xobject in resources.get(Name.XObject, pikepdf.Dictionary()).values():
+                if xobject.get(Name.ColorSpace) == Name.DeviceCMYK:
+                    return True
+                if xobject.get(Name.Subtype) == Name.Form and pikepdf.parse_content_stream(xobject, "k K"):
+                    return True
+        if pikepdf.parse_content_stream(page, "k K"):
+            return True
+    return False
+
+
+def can_repair(pdf: Pdf, codes: Iterable[str]) -> bool:
+    """Return True if every finding can be fixed by repair_pdfa3b."""
+    codes = set(codes)
+    if not codes <= REPAIRABLE_FINDINGS:
+        return False
+    if codes.intersection(_OUTPUT_INTENT_FINDINGS) and uses_device_cmyk(pdf):
+        return False
+    return True
+
+
+def _repair_attachments(pdf: Pdf) -> None:
+    names = pdf.Root.get(Name.Names)
+    if names is None or Name.EmbeddedFiles not in names:
+        return
+    if Name.AF not in pdf.Root:
+        pdf.Root[Name.AF] = pikepdf.Array()
+    af = pdf.Root[Name.AF]
+    af_refs = {filespec.objgen for filespec in af if filespec.is_indirect}
+    for filename, filespec in iter_entries(names.EmbeddedFiles):
+        if Name.AFRelationship not in filespec:
+            filespec[Name.AFRelationship] = Name.Unspecified
+        if filespec.is_indirect and filespec.objgen not in af_refs:
+            af.append(filespec)
+            af_refs.add(filespec.objgen)
+        ef = filespec.get(Name.EF)
+        stream = ef.get(Name.F) if ef is not None else None
+        if stream is not None and Name.Subtype not in stream:
+            mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            stream[Name.Subtype] = Name("/" + mime_type)
+
+
+def repair_pdfa3b(pdf: Pdf, codes: Iterable[str]) -> None:
+    """
+    Fix metadata-level PDF/A-3B findings in place.
+
+    Only the findings listed in REPAIRABLE_FINDINGS are handled; check
+    can_repair first. A missing document ID needs no action here because
+    pikepdf writes one on save.
+
+    Args:
+        pdf: Document to repair
+        codes: Finding codes reported by check_pdfa3b
+    """
+    codes = set(codes)
+    if "xmp-invalid" in codes:
+        # Start over from the Info dictionary
+        del pdf.Root[Name.Metadata]
+    if codes.intersection(("xmp-missing", "xmp-invalid", "pdfaid-part", "pdfaid-conformance")):
+        add_pdfa_metadata(pdf)
+    if "output-intent-icc-missing" in codes:
+        # Drop the unusable GTS_PDFA1 intent so an sRGB one can replace it
+        intents = pdf.Root.OutputIntents
+        pdf.Root.OutputIntents = pikepdf.Array(
+            intent for intent in intents if intent.get(Name.S) != Name.GTS_PDFA1
+        )
+    if codes.intersection(_OUTPUT_INTENT_FINDINGS):
+        add_srgb_output_intent(pdf)
+    if any(code.startswith("attachment-") for code in codes):
+        _repair_attachments(pdf)
@@ -0,0 +1,61 @@
+"""Named pikepdf save settings trading output size against write time."""
+
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from pikepdf import ObjectStreamMode, Pdf, StreamDecodeLevel
+
+from .pdf_io import write_pdf
+
+DEFAULT_SAVE_PROFILE = "default"
+
+# Keyword arguments for Pdf.save(). PDF/A-3 allows object streams and
+# linearization (PDF/A-1 did not), so every profile keeps the document valid.
+SAVE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # pikepdf's defaults: compress unfiltered streams, keep the object layout
+    "default": {},
+    # Pack objects into compressed object streams and re-deflate every
+    # losslessly encoded stream at the highest level
+    "small": {
+        "object_stream_mode": ObjectStreamMode.generate,
+        "compress_streams": True,
+        "stream_decode_level": StreamDecodeLevel.generalized,
+        "recompress_flate": True,
+    },
+    # Copy streams through untouched and leave new streams uncompressed
+    "fast": {
+        "object_stream_mode": ObjectStreamMode.preserve,
+        "compress_streams": False,
+        "stream_decode_level": StreamDecodeLevel.none,
+    },
+    # Linearized so viewers can show the first page before the download ends
+    "web": {
+        "linearize": True,
+    },
+}
+
+
+def save_options(profile: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return the Pdf.save() keyword arguments of a save profile.
+
+    Args:
+        profile (Optional[str]): Profile name, defaults to DEFAULT_SAVE_PROFILE
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    try:
+        return dict(SAVE_PROFILES[profile or DEFAULT_SAVE_PROFILE])
+    except KeyError:
+        raise ValueError(f"Unknown save profile: {profile}") from None
+
+
+def compresses_streams(profile: Optional[str] = None) -> bool:
+    """Whether streams created before saving should be Flate-compressed."""
+    return save_options(profile).get("compress_streams", True)
+
+
+def save_pdf(pdf: Pdf, output: Union[str, Path, BinaryIO], profile: Optional[str] = None) -> None:
+    """Save a document with the settings of a save profile, also over its own input file."""
+    write_pdf(pdf, output, **save_options(profile))
@@ -0,0 +1,307 @@
+"""
+XMP packets for PDF/A-3B and Factur-X, written from a fixed template.
+
+The packet is assembled from byte fragments prepared at import time: the
+pdfaid declaration, the Factur-X properties, the PDF/A extension schema
+describing them and, optionally, the document properties that mirror the
+Info dictionary. Values are XML-escaped and spliced in, and the result is
+written as one new metadata stream. The existing XMP is not parsed or
+edited unless its document properties are asked for.
+
+read_xmp_properties() reads the simple properties of a packet back,
+keyed by their usual prefix (e.g. "fx:ConformanceLevel"), whatever prefix
+the packet itself binds to the namespace.
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Union
+from xml.sax.saxutils import escape
+
+import pikepdf
+from lxml import etree
+from pikepdf import Name, Pdf
+from pikepdf.models.metadata import decode_pdf_date, encode_pdf_date
+
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+PDFAID_NS = "http://www.aiim.org/pdfa/ns/id/"
+PDFA_EXTENSION_NS = "http://www.aiim.org/pdfa/ns/extension/"
+PDFA_SCHEMA_NS = "http://www.aiim.org/pdfa/ns/schema#"
+PDFA_PROPERTY_NS = "http://www.aiim.org/pdfa/ns/property#"
+FACTURX_NS = "urn:factur-x:pdfa:CrossIndustryDocument:invoice:1p0#"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+PDF_NS = "http://ns.adobe.com/pdf/1.3/"
+XMP_NS = "http://ns.adobe.com/xap/1.0/"
+
+# Namespace -> prefix used for the keys of read_xmp_properties()
+_PREFIXES = {
+    PDFAID_NS: "pdfaid",
+    FACTURX_NS: "fx",
+    DC_NS: "dc",
+    PDF_NS: "pdf",
+    XMP_NS: "xmp",
+}
+
+# (name, description) of each Factur-X XMP property, all external Text
+_FACTURX_PROPERTIES = (
+    ("DocumentFileName", "name of the embedded XML invoice file"),
+    ("DocumentType", "INVOICE"),
+    ("Version", "The actual version of the Factur-X XML schema"),
+    ("ConformanceLevel", "The conformance level of the embedded Factur-X data"),
+)
+
+_HEAD = (
+    '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>\n'
+    '<x:xmpmeta xmlns:x="adobe:ns:meta/">\n'
+    f'<rdf:RDF xmlns:rdf="{RDF_NS}">\n'
+).encode("utf-8")
+_TAIL = b'</rdf:RDF>\n</x:xmpmeta>\n<?xpacket end="w"?>'
+
+_PDFAID = (
+    f'<rdf:Description rdf:about="" xmlns:pdfaid="{PDFAID_NS}">\n'
+    '<pdfaid:part>{part}</pdfaid:part>\n'
+    '<pdfaid:conformance>{conformance}</pdfaid:conformance>\n'
+    '</rdf:Description>\n'
+)
+
+_FACTURX = (
+    f'<rdf:Description rdf:about="" xmlns:fx="{FACTURX_NS}">\n'
+    '<fx:DocumentType>{document_type}</fx:DocumentType>\n'
+    '<fx:DocumentFileName>{document_file_name}</fx:DocumentFileName>\n'
+    '<fx:Version>{version}</fx:Version>\n'
+    '<fx:ConformanceLevel>{conformance_level}</fx:ConformanceLevel>\n'
+    '</rdf:Description>\n'
+)
+
+_FACTURX_EXTENSION = (
+    f'<rdf:Description rdf:about="" xmlns:pdfaExtension="{PDFA_EXTENSION_NS}" '
+    f'xmlns:pdfaSchema="{PDFA_SCHEMA_NS}" xmlns:pdfaProperty="{PDFA_PROPERTY_NS}">\n'
+    '<pdfaExtension:schemas>\n<rdf:Bag>\n<rdf:li rdf:parseType="Resource">\n'
+    '<pdfaSchema:schema>Factur-X PDFA Extension Schema</pdfaSchema:schema>\n'
+    f'<pdfaSchema:namespaceURI>{FACTURX_NS}</pdfaSchema:namespaceURI>\n'
+    '<pdfaSchema:prefix>fx</pdfaSchema:prefix>\n'
+    '<pdfaSchema:property>\n<rdf:Seq>\n'
+    + "".join(
+        '<rdf:li rdf:parseType="Resource">\n'
+        f'<pdfaProperty:name>{name}</pdfaProperty:name>\n'
+        '<pdfaProperty:valueType>Text</pdfaProperty:valueType>\n'
+        '<pdfaProperty:category>external</pdfaProperty:category>\n'
+        f'<pdfaProperty:description>{description}</pdfaProperty:description>\n'
+        '</rdf:li>\n'
+        for name, description in _FACTURX_PROPERTIES)
+    + '</rdf:Seq>\n</pdfaSchema:property>\n</rdf:li>\n</rdf:Bag>\n</pdfaExtension:schemas>\n'
+    '</rdf:Description>\n'
+).encode("utf-8")
+
+_DOCUMENT_OPEN = (
+    f'<rdf:Description rdf:about="" xmlns:dc="{DC_NS}" xmlns:pdf="{PDF_NS}" xmlns:xmp="{XMP_NS}">\n'
+).encode("utf-8")
+_DOCUMENT_CLOSE = b'</rdf:Description>\n'
+
+# DocumentInfo field -> (XMP element template, Info dictionary key)
+_DOCUMENT_PROPERTIES = {
+    "title": ('<dc:title><rdf:Alt><rdf:li xml:lang="x-default">{}</rdf:li></rdf:Alt></dc:title>\n', "/Title"),
+    "author": ('<dc:creator><rdf:Seq><rdf:li>{}</rdf:li></rdf:Seq></dc:creator>\n', "/Author"),
+    "subject": ('<dc:description><rdf:Alt><rdf:li xml:lang="x-default">{}</rdf:li></rdf:Alt></dc:description>\n',
+                "/Subject"),
+    "keywords": ('<pdf:Keywords>{}</pdf:Keywords>\n', "/Keywords"),
+    "creator_tool": ('<xmp:CreatorTool>{}</xmp:CreatorTool>\n', "/Creator"),
+    "producer": ('<pdf:Producer>{}</pdf:Producer>\n', "/Producer"),
+    "create_date": ('<xmp:CreateDate>{}</xmp:CreateDate>\n', "/CreationDate"),
+    "modify_date": ('<xmp:ModifyDate>{}</xmp:ModifyDate>\n', "/ModDate"),
+}
+
+# DocumentInfo field -> key in read_xmp_properties()
+_XMP_KEYS = {
+    "title": "dc:title",
+    "author": "dc:creator",
+    "subject": "dc:description",
+    "keywords": "pdf:Keywords",
+    "creator_tool": "xmp:CreatorTool",
+    "producer": "pdf:Producer",
+    "create_date": "xmp:CreateDate",
+    "modify_date": "xmp:ModifyDate",
+}
+
+# Characters XML 1.0 does not allow, which do occur in Info strings
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+class FacturXProperties(NamedTuple):
+    """Values of the fx: XMP properties."""
+    conformance_level: str
+    document_file_name: str
+    version: str
+    document_type: str = "INVOICE"
+
+
+class DocumentInfo(NamedTuple):
+    """Document properties kept in both the XMP packet and the Info dictionary."""
+    title: Optional[str] = None
+    author: Optional[str] = None
+    subject: Optional[str] = None
+    keywords: Optional[str] = None
+    creator_tool: Optional[str] = None
+    producer: Optional[str] = None
+    create_date: Optional[datetime] = None
+    modify_date: Optional[datetime] = None
+
+
+def _text(value: str) -> str:
+    return escape(_INVALID_XML_CHARS.sub("", str(value)), {'"': "&quot;"})
+
+
+def _document_properties(info: DocumentInfo) -> bytes:
+    parts = []
+    for field, value in info._asdict().items():
+        if value is None:
+            continue
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        parts.append(_DOCUMENT_PROPERTIES[field][0].format(_text(value)))
+    if not parts:
+        return b""
+    return _DOCUMENT_OPEN + "".join(parts).encode("utf-8") + _DOCUMENT_CLOSE
+
+
+def xmp_packet(facturx: Optional[FacturXProperties] = None,
+               info: Optional[DocumentInfo] = None,
+               part: str = "3",
+               conformance: str = "B") -> bytes:
+    """
+    Build an XMP packet from the template.
+
+    Args:
+        facturx (Optional[FacturXProperties]): fx: properties; with them the
+            Factur-X extension schema is included too
+        info (Optional[DocumentInfo]): Document properties to include
+        part (str): pdfaid:part
+        conformance (str): pdfaid:conformance
+
+    Returns:
+        bytes: The packet, UTF-8 encoded and wrapped in xpacket instructions
+    """
+    parts = [_HEAD, _PDFAID.format(part=_text(part), conformance=_text(conformance)).encode("utf-8")]
+    if facturx is not None:
+        parts.append(_FACTURX.format(**{key: _text(value) for key, value in facturx._asdict().items()})
+                     .encode("utf-8"))
+    if info is not None:
+        parts.append(_document_properties(info))
+    if facturx is not None:
+        parts.append(_FACTURX_EXTENSION)
+    parts.append(_TAIL)
+    return b"".join(parts)
+
+
+def write_xmp(pdf: Pdf, packet: bytes) -> None:
+    """Set packet as the document's metadata stream."""
+    metadata = pdf.make_stream(packet)
+    metadata[Name.Type] = Name.Metadata
+    metadata[Name.Subtype] = Name.XML
+    pdf.Root[Name.Metadata] = metadata
+
+
+def read_xmp_properties(source: Union[Pdf, bytes]) -> Dict[str, str]:
+    """
+    Read the simple XMP properties of a document or packet.
+
+    Properties may be written as attributes or child elements of any
+    rdf:Description. For an Alt, Seq or Bag the first item is returned.
+    Only the pdfaid, fx, dc, pdf and xmp namespaces are read.
+
+    Args:
+        source: Document with a metadata stream, or the packet itself
+
+    Returns:
+        Dict[str, str]: e.g. {"pdfaid:part": "3", "fx:ConformanceLevel": "EN 16931"};
+            empty if there is no metadata or it cannot be parsed
+    """
+    if isinstance(source, Pdf):
+        metadata = source.Root.get(Name.Metadata)
+        if not isinstance(metadata, pikepdf.Stream):
+            return {}
+        try:
+            source = metadata.read_bytes()
+        except pikepdf.PdfError:
+            return {}
+    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    try:
+        root = etree.fromstring(source, parser)
+    except etree.XMLSyntaxError:
+        return {}
+
+    properties: Dict[str, str] = {}
+
+    def add(tag: str, value: Optional[str]) -> None:
+        namespace, _, name = tag[1:].partition("}")
+        prefix = _PREFIXES.get(namespace)
+        if prefix is not None and value is not None:
+            properties.setdefault(f"{prefix}:{name}", value.strip())
+
+    for description in root.iter(f"{{{RDF_NS}}}Description"):
+        for key, value in description.attrib.items():
+            add(key, value)
+        for child in description:
+            if not isinstance(child.tag, str):
+                continue
+            item = child.find(f"{{{RDF_NS}}}*/{{{RDF_NS}}}li")
+            add(child.tag, item.text if item is not None else child.text)
+    return properties
+
+
+def _pdf_date(value) -> Optional[datetime]:
+    try:
+        return decode_pdf_date(str(value))
+    except ValueError:
+        return None
+
+
+def _xmp_date(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+    except ValueError:
+        return None
+
+
+def document_info(pdf: Pdf) -> DocumentInfo:
+    """
+    The document properties of pdf, from its Info dictionary.
+
+    The XMP packet is only parsed if the document has no Info dictionary.
+    """
+    docinfo = pdf.trailer.get(Name.Info)
+    if isinstance(docinfo, pikepdf.Dictionary) and len(docinfo):
+        values = {}
+        for field, (_, key) in _DOCUMENT_PROPERTIES.items():
+            value = docinfo.get(key)
+            if value is None:
+                continue
+            values[field] = _pdf_date(value) if field.endswith("_date") else str(value)
+        return DocumentInfo(**values)
+
+    properties = read_xmp_properties(pdf)
+    values = {}
+    for field, key in _XMP_KEYS.items():
+        value = properties.get(key)
+        values[field] = _xmp_date(value) if field.endswith("_date") else value
+    return DocumentInfo(**values)
+
+
+def write_document_info(pdf: Pdf, info: Optional[DocumentInfo]) -> None:
+    """
+    Replace the Info dictionary with info, or remove it if info is None.
+
+    PDF/A requires the Info dictionary to agree with the XMP packet; call
+    this with the same info the packet was built from.
+    """
+    if info is None:
+        if Name.Info in pdf.trailer:
+            del pdf.trailer[Name.Info]
+        return
+    docinfo = pikepdf.Dictionary()
+    for field, value in info._asdict().items():
+        if value is None:
+            continue
+        key = _DOCUMENT_PROPERTIES[field][1]
+        docinfo[key] = pikepdf.String(encode_pdf_date(value) if isinstance(value, datetime) else value)
+    pdf.trailer[Name.Info] = pdf.make_indirect(docinfo)
@@ -0,0 +1,398 @@
+"""Pre-flight validation of invoice data before any PDF/A conversion.
+
+The checks are compiled once per (layout, profile) pair into a flat tuple of
+small closures, so validating an invoice is a handful of dictionary lookups
+and comparisons. Call :func:`check_invoice` before Ghostscript or XML
+generation so malformed requests fail fast.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+PROFILES = ("MINIMUM", "BASIC_WL", "EN16931")
+
+# Embeddable profiles without checks of their own use the nearest lower level
+PROFILE_LEVELS = {"BASIC": "BASIC_WL", "EXTENDED": "EN16931"}
+
+# ISO 4217 currency codes
+CURRENCY_CODES = frozenset("""
+AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BHD BIF BMD BND BOB
+BRL BSD BTN BWP BYN BZD CAD CDF CHF CLP CNY COP CRC CUP CVE CZK DJF DKK DOP
+DZD EGP ERN ETB EUR FJD FKP GBP GEL GHS GIP GMD GNF GTQ GYD HKD HNL HTG HUF
+IDR ILS INR IQD IRR ISK JMD JOD JPY KES KGS KHR KMF KPW KRW KWD KYD KZT LAK
+LBP LKR LRD LSL LYD MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MYR MZN
+NAD NGN NIO NOK NPR NZD OMR PAB PEN PGK PHP PKR PLN PYG QAR RON RSD RUB RWF
+SAR SBD SCR SDG SEK SGD SHP SLE SOS SRD SSP STN SYP SZL THB TJS TMT TND TOP
+TRY TTD TWD TZS UAH UGX USD UYU UZS VES VND VUV WST XAF XCD XOF XPF YER ZAR
+ZMW ZWL
+""".split())
+
+# ISO 3166-1 alpha-2 country codes
+COUNTRY_CODES = frozenset("""
+AD AE AF AG AI AL AM AO AQ AR AS AT AU AW AX AZ BA BB BD BE BF BG BH BI BJ BL
+BM BN BO BQ BR BS BT BV BW BY BZ CA CC CD CF CG CH CI CK CL CM CN CO CR CU CV
+CW CX CY CZ DE DJ DK DM DO DZ EC EE EG EH ER ES ET FI FJ FK FM FO FR GA GB GD
+GE GF GG GH GI GL GM GN GP GQ GR GS GT GU GW GY HK HM HN HR HT HU ID IE IL IM
+IN IO IQ IR IS IT JE JM JO JP KE KG KH KI KM KN KP KR KW KY KZ LA LB LC LI LK
+LR LS LT LU LV LY MA MC MD ME MF MG MH MK ML MM MN MO MP MQ MR MS MT MU MV MW
+MX MY MZ NA NC NE NF NG NI NL NO NP NR NU NZ OM PA PE PF PG PH PK PL PM PN PR
+PS PT PW PY QA RE RO RS RU RW SA SB SC SD SE SG SH SI SJ SK SL SM SN SO SR SS
+ST SV SX SY SZ TC TD TF TG TH TJ TK TL TM TN TO TR TT TV TW TZ UA UG UM US UY
+UZ VA VC VE VG VI VN VU WF WS XI YE YT ZA ZM ZW
+""".split())
+
+# Common UN/ECE Recommendation 20/21 unit codes used on invoices
+UNIT_CODES = frozenset("""
+C62 H87 EA XPP PR SET LS XBX XPK XCT XPL
+HUR MIN SEC DAY WEE MON ANN QAN
+GRM KGM TNE LBR
+MMT CMT MTR KMT INH FOT
+MTK KMK HAR
+MLT CLT LTR MTQ
+KWH MWH KWT WHR GWH
+E48 E49 E53
+""".split())
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Rounding tolerance for totals consistency, in currency units
+TOTALS_TOLERANCE = 0.01
+
+# Field paths for each JSON layout in the repository. A path is a
+# tuple of keys; a field may list alternative paths, the first present
+# one wins.
+#   flat    - sample_invoice.json / generate_facturx_xml.py
+#   mustang - mustang_invoice.json / facturx_process.py
+#   service - XMLService / PDFService / FacturXService
+LAYOUTS: Dict[str, Dict[str, Tuple[Tuple[str, ...], ...]]] = {
+    "flat": {
+        "number": (("invoice_number",),),
+        "issue_date": (("issue_date",),),
+        "due_date": (("due_date",),),
+        "currency": (("currency",),),
+        "seller_name": (("seller", "name"),),
+        "seller_country": (("seller", "country"),),
+        "seller_vat": (("seller", "vat_number"),),
+        "buyer_name": (("buyer", "name"),),
+        "buyer_country": (("buyer", "country"),),
+        "items": (("items",),),
+        "item_description": (("description",),),
+        "item_quantity": (("quantity",),),
+        "item_price": (("unit_price",),),
+        "item_vat_rate": (("vat_rate",),),
+        "item_unit": (("unit_of_measure",),),
+        "net_total": (("subtotal",),),
+        "tax_total": (("vat_total",),),
+        "grand_total": (("total",),),
+    },
+    "mustang": {
+        "number": (("invoice", "number"),),
+        "issue_date": (("invoice", "date"),),
+        "due_date": (("invoice", "dueDate"),),
+        "currency": (("invoice", "currency"),),
+        "seller_name": (("seller", "name"),),
+        "seller_country": (("seller", "country"),),
+        "seller_vat": (("seller", "taxID"),),
+        "buyer_name": (("buyer", "name"),),
+        "buyer_country": (("buyer", "country"),),
+        "items": (("items",),),
+        "item_description": (("name",),),
+        "item_quantity": (("quantity",),),
+        "item_price": (("unitPrice",),),
+        "item_vat_rate": (("vatPercent",),),
+        "item_unit": (("unit",),),
+        "net_total": (("totals", "netAmount"),),
+        "tax_total": (("totals", "vatAmount"),),
+        "grand_total": (("totals", "grandTotal"),),
+    },
+    "service": {
+        "number": (("invoice_number",),),
+        "issue_date": (("invoice_date",),),
+        "due_date": (("due_date",),),
+        "currency": (("currency",),),
+        "seller_name": (("seller", "name"),),
+        "seller_country": (("seller", "address", "country"), ("seller", "country")),
+        "seller_vat": (("seller", "vat_number"),),
+        "buyer_name": (("buyer", "name"),),
+        "buyer_country": (("buyer", "address", "country"), ("buyer", "country")),
+        "items": (("line_items",), ("items",)),
+        "item_description": (("description",),),
+        "item_quantity": (("quantity",),),
+        "item_price": (("unit_price",),),
+        "item_vat_rate": (("tax_percent",), ("vat_rate",)),
+        "item_unit": (("unit_code",),),
+        "net_total": (("totals", "net_amount"), ("total_without_tax",), ("amount_untaxed",)),
+        "tax_total": (("totals", "tax_amount"), ("total_tax",), ("amount_tax",)),
+        "grand_total": (("totals", "total_amount"), ("total_with_tax",), ("amount_total",)),
+    },
+}
+
+# Header fields required per profile (each profile includes the previous one)
+_REQUIRED_FIELDS = {
+    "MINIMUM": ("number", "issue_date", "currency", "seller_name", "buyer_name"),
+    "BASIC_WL": ("seller_country", "buyer_country", "seller_vat"),
+    "EN16931": ("due_date", "items"),
+}
+
+# Header amounts required per profile; the service layout computes totals
+# itself, so amounts are only checked there when present.
+_REQUIRED_AMOUNTS = {
+    "MINIMUM": ("grand_total",),
+    "BASIC_WL": ("net_total", "tax_total"),
+    "EN16931": (),
+}
+
+_MISSING = object()
+
+
+class PreflightIssue(NamedTuple):
+    """A single problem found in the invoice data."""
+    field: str
+    message: str
+
+
+class PreflightError(ValueError):
+    """Raised when invoice data fails the pre-flight checks."""
+
+    def __init__(self, issues: List[PreflightIssue]):
+        self.issues = issues
+        details = "; ".join(f"{issue.field}: {issue.message}" for issue in issues)
+        super().__init__(f"Invoice data failed pre-flight checks: {details}")
+
+
+def _getter(paths: Tuple[Tuple[str, ...], ...]) -> Callable[[Any], Any]:
+    """Build a lookup function for a field with alternative paths."""
+    def get(data):
+        for path in paths:
+            value = data
+            for key in path:
+                if not isinstance(value, dict) or key not in value:
+                    value = _MISSING
+                    break
+                value = value[key]
+            if value is not _MISSING:
+                return value
+        return _MISSING
+    return get
+
+
+def _label(paths: Tuple[Tuple[str, ...], ...]) -> str:
+    return ".".join(paths[0])
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_text(value: Any) -> bool:
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _text_check(name: str, get: Callable, required: bool,
+                code_list: Optional[frozenset] = None,
+                pattern: Optional[re.Pattern] = None) -> Callable:
+    def check(data, issues):
+        value = get(data)
+        if value is _MISSING or value is None or value == "":
+            if required:
+                issues.append(PreflightIssue(name, "is required"))
+            return
+        if not _is_text(value):
+            issues.append(PreflightIssue(name, f"must be a non-empty string, got {type(value).__name__}"))
+        elif code_list is not None and value not in code_list:
+            issues.append(PreflightIssue(name, f"unknown code {value!r}"))
+        elif pattern is not None and not pattern.match(value):
+            issues.append(PreflightIssue(name, f"must be a YYYY-MM-DD date, got {value!r}"))
+    return check
+
+
+def _amount_check(name: str, get: Callable, required: bool) -> Callable:
+    def check(data, issues):
+        value = get(data)
+        if value is _MISSING or value is None:
+            if required:
+                issues.append(PreflightIssue(name, "is required"))
+        elif not _is_number(value):
+            issues.append(PreflightIssue(name, f"must be a number, got {type(value).__name__}"))
+    return check
+
+
+def _items_check(layout: Dict[str, Tuple[Tuple[str, ...], ...]], required: bool) -> Callable:
+    label = _label(layout["items"])
+    get_items = _getter(layout["items"])
+    get_description = _getter(layout["item_description"])
+    get_quantity = _getter(layout["item_quantity"])
+    get_price = _getter(layout["item_price"])
+    get_rate = _getter(layout["item_vat_rate"])
+    get_unit = _getter(layout["item_unit"])
+
+    def check(data, issues):
+        items = get_items(data)
+        if items is _MISSING or items is None:
+            if required:
+                issues.append(PreflightIssue(label, "is required"))
+            return
+        if not isinstance(items, list):
+            issues.append(PreflightIssue(label, f"must be a list, got {type(items).__name__}"))
+            return
+        if not items and required:
+            issues.append(PreflightIssue(label, "must contain at least one line item"))
+        for idx, item in enumerate(items):
+            prefix = f"{label}[{idx}]"
+            if not isinstance(item, dict):
+                issues.append(PreflightIssue(prefix, "must be an object"))
+                continue
+            if not _is_text(get_description(item)):
+                issues.append(PreflightIssue(prefix, "description is required"))
+            quantity = get_quantity(item)
+            if not _is_number(quantity):
+                issues.append(PreflightIssue(prefix, "quantity must be a number"))
+            price = get_price(item)
+            if not _is_number(price):
+                issues.append(PreflightIssue(prefix, "unit price must be a number"))
+            rate = get_rate(item)
+            if rate is not _MISSING and not (_is_number(rate) and 0 <= rate <= 100):
+                issues.append(PreflightIssue(prefix, f"VAT rate must be between 0 and 100, got {rate!r}"))
+            unit = get_unit(item)
+            if unit is not _MISSING and unit not in UNIT_CODES:
+                issues.append(PreflightIssue(prefix, f"unknown unit code {unit!r}"))
+    return check
+
+
+def _totals_check(layout: Dict[str, Tuple[Tuple[str, ...], ...]]) -> Callable:
+    get_items = _getter(layout["items"])
+    get_quantity = _getter(layout["item_quantity"])
+    get_price = _getter(layout["item_price"])
+    get_rate = _getter(layout["item_vat_rate"])
+    get_net = _getter(layout["net_total"])
+    get_tax = _getter(layout["tax_total"])
+    get_grand = _getter(layout["grand_total"])
+    net_label = _label(layout["net_total"])
+    tax_label = _label(layout["tax_total"])
+    grand_label = _label(layout["grand_total"])
+
+    def check(data, issues):
+        net = get_net(data)
+        tax = get_tax(data)
+        grand = get_grand(data)
+        net_ok = _is_number(net)
+        tax_ok = _is_number(tax)
+
+        if net_ok and tax_ok and _is_number(grand) and abs(net + tax - grand) > TOTALS_TOLERANCE:
+            issues.append(PreflightIssue(grand_label, f"{grand} does not equal net {net} + tax {tax}"))
+
+        items = get_items(data)
+        if not isinstance(items, list) or not items:
+            return
+        line_net = 0.0
+        line_tax = 0.0
+        has_rates = True
+        for item in items:
+            if not isinstance(item, dict):
+                return
+            quantity = get_quantity(item)
+            price = get_price(item)
+            if not (_is_number(quantity) and _is_number(price)):
+                return
+            amount = quantity * price
+            line_net += amount
+            rate = get_rate(item)
+            if _is_number(rate):
+                line_tax += amount * rate / 100.0
+            else:
+                has_rates = False
+
+        # Each line is rounded separately, so allow one cent per line
+        tolerance = TOTALS_TOLERANCE * len(items)
+        if net_ok and abs(line_net - net) > tolerance:
+            issues.append(PreflightIssue(net_label, f"{net} does not match the sum of line amounts {line_net:.2f}"))
+        if tax_ok and has_rates and abs(line_tax - tax) > tolerance:
+            issues.append(PreflightIssue(tax_label, f"{tax} does not match the VAT computed from lines {line_tax:.2f}"))
+    return check
+
+
+@lru_cache(maxsize=None)
+def compile_preflight(layout: str = "flat", profile: str = "EN16931") -> Callable[[Dict[str, Any]], List[PreflightIssue]]:
+    """
+    Compile the pre-flight checks for a JSON layout and Factur-X profile.
+
+    Args:
+        layout (str): Invoice JSON layout ("flat", "mustang" or "service")
+        profile (str): Factur-X profile (MINIMUM, BASIC_WL, BASIC, EN16931, EXTENDED)
+
+    Returns:
+        Callable: Function taking the invoice dict and returning the list of issues
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown invoice layout: {layout}")
+    profile = PROFILE_LEVELS.get(profile, profile)
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown Factur-X profile: {profile}")
+
+    fields = LAYOUTS[layout]
+    levels = PROFILES[:PROFILES.index(profile) + 1]
+    required = {name for level in levels for name in _REQUIRED_FIELDS[level]}
+    required_amounts = set()
+    if layout != "service":
+        required_amounts = {name for level in levels for name in _REQUIRED_AMOUNTS[level]}
+
+    code_lists = {
+        "currency": CURRENCY_CODES,
+        "seller_country": COUNTRY_CODES,
+        "buyer_country": COUNTRY_CODES,
+    }
+    checks = []
+    for name in ("number", "issue_date", "due_date", "currency", "seller_name",
+                 "seller_country", "seller_vat", "buyer_name", "buyer_country"):
+        paths = fields[name]
+        pattern = _DATE_RE if name.endswith("_date") else None
+        checks.append(_text_check(_label(paths), _getter(paths), name in required,
+                                  code_list=code_lists.get(name), pattern=pattern))
+    for name in ("net_total", "tax_total", "grand_total"):
+        paths = fields[name]
+        checks.append(_amount_check(_label(paths), _getter(paths), name in required_amounts))
+    checks.append(_items_check(fields, "items" in required))
+    checks.append(_totals_check(fields))
+    checks = tuple(checks)
+
+    def run(data: Dict[str, Any]) -> List[PreflightIssue]:
+        issues: List[PreflightIssue] = []
+        if not isinstance(data, dict):
+            return [PreflightIssue("invoice", "must be a JSON object")]
+        for check in checks:
+            check(data, issues)
+        return issues
+
+    return run
+
+
+def preflight_invoice(invoice_data: Dict[str, Any],
+                      profile: str = "EN16931",
+                      layout: str = "flat") -> List[PreflightIssue]:
+    """
+    Run the pre-flight checks and return every issue found.
+
+    Args:
+        invoice_data (Dict[str, Any]): Invoice data dictionary
+        profile (str): Factur-X profile (MINIMUM, BASIC_WL, BASIC, EN16931, EXTENDED)
+        layout (str): Invoice JSON layout ("flat", "mustang" or "service")
+
+    Returns:
+        List[PreflightIssue]: Issues found, empty if the data is acceptable
+    """
+    return compile_preflight(layout, profile)(invoice_data)
+
+
+def check_invoice(invoice_data: Dict[str, Any],
+                  profile: str = "EN16931",
+                  layout: str = "flat") -> None:
+    """
+    Run the pre-flight checks and raise if any issue is found.
+
+    Raises:
+        PreflightError: If the invoice data is not acceptable
+    """
+    issues = compile_preflight(layout, profile)(invoice_data)
+    if issues:
+        raise PreflightError(issues)
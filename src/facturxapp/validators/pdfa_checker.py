@@ -0,0 +1,235 @@
+"""Structural PDF/A-3B checks implemented with pikepdf.
+
+This is not a full veraPDF validation. It checks the document-level
+constraints the Factur-X pipeline relies on, without re-rendering any page:
+
+- XMP metadata declares pdfaid:part = 3 and a conformance level
+- an OutputIntent with an embedded ICC profile is present
+- the trailer carries a document ID
+- the document is not encrypted and contains no JavaScript
+- every font used by the pages is embedded
+- every embedded file has an AFRelationship, a MIME subtype and is
+  referenced from an AF array
+"""
+
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Set, Tuple, Union
+
+import pikepdf
+from lxml import etree
+from pikepdf import Name, Pdf
+
+from facturxapp.utils.name_tree import iter_entries
+from facturxapp.utils.pdf_io import open_pdf
+
+PDFAID_NS = "http://www.aiim.org/pdfa/ns/id/"
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+
+# Conformance levels that satisfy the B level
+ACCEPTED_CONFORMANCE = ("A", "B", "U")
+
+_FONT_FILE_KEYS = (Name.FontFile, Name.FontFile2, Name.FontFile3)
+
+
+class PDFAFinding(NamedTuple):
+    """A PDF/A-3B constraint violation."""
+    code: str
+    message: str
+
+
+def _read_pdfaid(pdf: Pdf) -> Tuple[str, str]:
+    """Read pdfaid:part and pdfaid:conformance straight from the XMP stream."""
+    metadata = pdf.Root.get(Name.Metadata)
+    if metadata is None or not isinstance(metadata, pikepdf.Stream):
+        return None, None
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, recover=True)
+    root = etree.fromstring(metadata.read_bytes(), parser)
+    if root is None:
+        return None, None
+    part = conformance = None
+    for description in root.iter(f"{{{RDF_NS}}}Description"):
+        # Properties may be written as attributes or as child elements
+        part = part or description.get(f"{{{PDFAID_NS}}}part")
+        conformance = conformance or description.get(f"{{{PDFAID_NS}}}conformance")
+        for child in description:
+            if child.tag == f"{{{PDFAID_NS}}}part":
+                part = part or (child.text or "").strip()
+            elif child.tag == f"{{{PDFAID_NS}}}conformance":
+                conformance = conformance or (child.text or "").strip()
+    return part, conformance
+
+
+def _check_metadata(pdf: Pdf, findings: List[PDFAFinding]) -> None:
+    if Name.Metadata not in pdf.Root:
+        findings.append(PDFAFinding("xmp-missing", "Catalog has no XMP metadata stream"))
+        return
+    try:
+        part, conformance = _read_pdfaid(pdf)
+    except (etree.XMLSyntaxError, pikepdf.PdfError) as e:
+        findings.append(PDFAFinding("xmp-invalid", f"XMP metadata cannot be parsed: {e}"))
+        return
+    if part != "3":
+        findings.append(PDFAFinding("pdfaid-part", f"XMP pdfaid:part is {part!r}, expected '3'"))
+    if conformance not in ACCEPTED_CONFORMANCE:
+        findings.append(PDFAFinding("pdfaid-conformance",
+                                    f"XMP pdfaid:conformance is {conformance!r}, expected 'B'"))
+
+
+def _check_output_intent(pdf: Pdf, findings: List[PDFAFinding]) -> None:
+    intents = pdf.Root.get(Name.OutputIntents)
+    if not intents:
+        findings.append(PDFAFinding("output-intent-missing", "Catalog has no OutputIntents"))
+        return
+    for intent in intents:
+        if intent.get(Name.S) == Name.GTS_PDFA1:
+            profile = intent.get(Name.DestOutputProfile)
+            if not isinstance(profile, pikepdf.Stream):
+                findings.append(PDFAFinding("output-intent-icc-missing",
+                                            "GTS_PDFA1 OutputIntent has no ICC DestOutputProfile"))
+            return
+    findings.append(PDFAFinding("output-intent-missing", "No OutputIntent with subtype GTS_PDFA1"))
+
+
+def _check_trailer(pdf: Pdf, findings: List[PDFAFinding]) -> None:
+    if pdf.is_encrypted:
+        findings.append(PDFAFinding("encrypted", "Document is encrypted"))
+    if Name.ID not in pdf.trailer:
+        findings.append(PDFAFinding("document-id-missing", "Trailer has no document ID"))
+
+
+def _is_javascript_action(action) -> bool:
+    return isinstance(action, pikepdf.Dictionary) and action.get(Name.S) == Name.JavaScript
+
+
+def _check_javascript(pdf: Pdf, findings: List[PDFAFinding]) -> None:
+    root = pdf.Root
+    names = root.get(Name.Names)
+    has_js = (
+        (names is not None and Name.JavaScript in names)
+        or _is_javascript_action(root.get(Name.OpenAction))
+        or Name.AA in root
+    )
+    if not has_js:
+        for page in pdf.pages:
+            if Name.AA in page.obj:
+                has_js = True
+                break
+            for annot in page.obj.get(Name.Annots, ()):
+                if _is_javascript_action(annot.get(Name.A)) or Name.AA in annot:
+                    has_js = True
+                    break
+            if has_js:
+                break
+    if has_js:
+        findings.append(PDFAFinding("javascript", "Document contains JavaScript or additional actions"))
+
+
+def _iter_resource_fonts(resources, seen: Set[Tuple[int, int]]) -> Iterator[Tuple[str, pikepdf.Dictionary]]:
+    """Yield (resource name, font) for fonts reachable from a resource dictionary."""
+    if not isinstance(resources, pikepdf.Dictionary):
+        return
+    fonts = resources.get(Name.Font)
+    if isinstance(fonts, pikepdf.Dictionary):
+        for key, font in fonts.items():
+            if font.is_indirect:
+                if font.objgen in seen:
+                    continue
+                seen.add(font.objgen)
+            yield key, font
+    xobjects = resources.get(Name.XObject)
+    if isinstance(xobjects, pikepdf.Dictionary):
+        for xobject in xobjects.values():
+            if xobject.is_indirect:
+                if xobject.objgen in seen:
+                    continue
+                seen.add(xobject.objgen)
+            if xobject.get(Name.Subtype) == Name.Form:
+                yield from _iter_resource_fonts(xobject.get(Name.Resources), seen)
+
+
+def _font_is_embedded(font: pikepdf.Dictionary) -> bool:
+    subtype = font.get(Name.Subtype)
+    if subtype == Name.Type3:
+        return True
+    if subtype == Name.Type0:
+        descendants = font.get(Name.DescendantFonts)
+        return bool(descendants) and all(_font_is_embedded(d) for d in descendants)
+    descriptor = font.get(Name.FontDescriptor)
+    if descriptor is None:
+        return False
+    return any(key in descriptor for key in _FONT_FILE_KEYS)
+
+
+def _check_fonts(pdf: Pdf, findings: List[PDFAFinding]) -> None:
+    seen: Set[Tuple[int, int]] = set()
+    missing = set()
+    for page in pdf.pages:
+        for _, font in _iter_resource_fonts(page.obj.get(Name.Resources), seen):
+            if not _font_is_embedded(font):
+                missing.add(str(font.get(Name.BaseFont, "unknown")).lstrip("/"))
+    for base_font in sorted(missing):
+        findings.append(PDFAFinding("font-not-embedded", f"Font {base_font} is not embedded"))
+
+
+def _check_attachments(pdf: Pdf, findings: List[PDFAFinding]) -> None:
+    names = pdf.Root.get(Name.Names)
+    if names is None or Name.EmbeddedFiles not in names:
+        return
+    af_refs = set()
+    for filespec in pdf.Root.get(Name.AF, ()):
+        if filespec.is_indirect:
+            af_refs.add(filespec.objgen)
+    for page in pdf.pages:
+        for filespec in page.obj.get(Name.AF, ()):
+            if filespec.is_indirect:
+                af_refs.add(filespec.objgen)
+
+    for name, filespec in iter_entries(names.EmbeddedFiles):
+        if Name.AFRelationship not in filespec:
+            findings.append(PDFAFinding("attachment-afrelationship-missing",
+                                        f"Embedded file {name} has no AFRelationship"))
+        if not filespec.is_indirect or filespec.objgen not in af_refs:
+            findings.append(PDFAFinding("attachment-not-in-af",
+                                        f"Embedded file {name} is not referenced from an AF array"))
+        ef = filespec.get(Name.EF)
+        stream = ef.get(Name.F) if ef is not None else None
+        if stream is None:
+            findings.append(PDFAFinding("attachment-stream-missing", f"Embedded file {name} has no stream"))
+        elif Name.Subtype not in stream:
+            findings.append(PDFAFinding("attachment-subtype-missing",
+                                        f"Embedded file {name} has no MIME Subtype"))
+
+
+def _run_checks(pdf: Pdf) -> List[PDFAFinding]:
+    findings: List[PDFAFinding] = []
+    _check_trailer(pdf, findings)
+    _check_metadata(pdf, findings)
+    _check_output_intent(pdf, findings)
+    _check_javascript(pdf, findings)
+    _check_fonts(pdf, findings)
+    _check_attachments(pdf, findings)
+    return findings
+
+
+def check_pdfa3b(source: Union[str, Path, Pdf]) -> List[PDFAFinding]:
+    """
+    Check a PDF against the structural PDF/A-3B constraints.
+
+    Args:
+        source: Path to the PDF, or an already opened pikepdf.Pdf
+
+    Returns:
+        List[PDFAFinding]: Violations found, empty if none
+    """
+    if isinstance(source, Pdf):
+        return _run_checks(source)
+    try:
+        with open_pdf(source) as pdf:
+            return _run_checks(pdf)
+    except pikepdf.PasswordError:
+        return [PDFAFinding("encrypted", "Document is encrypted")]
+
+
+def is_pdfa3b(source: Union[str, Path, Pdf]) -> bool:
+    """Return True if the PDF passes every structural PDF/A-3B check."""
+    return not check_pdfa3b(source)
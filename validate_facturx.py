@@ -10,75 +10,42 @@ This script validates if a PDF is Factur-X compliant by checking:
 
 import os
 import argparse
-import pikepdf
-from pikepdf import Pdf, Name
 import xml.etree.ElementTree as ET
-import tempfile
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from facturxapp.services.embedding import declared_profile
+from facturxapp.services.extraction import extract_facturx
+from facturxapp.utils.pdf_io import open_pdf
+from facturxapp.utils.xmp import read_xmp_properties
 
 def extract_xml(pdf_path):
     """Extract embedded XML from PDF"""
     try:
-        with Pdf.open(pdf_path) as pdf:
-            # Check if EmbeddedFiles exists
-            if "/Names" not in pdf.Root or "/EmbeddedFiles" not in pdf.Root.Names:
-                return None, "No embedded files found in PDF"
-            
-            # Get EmbeddedFiles
-            embedded_files = pdf.Root.Names.EmbeddedFiles
-            
-            # Check if Names array exists
-            if "Names" not in embedded_files:
-                return None, "No embedded file names found"
-            
-            # Find "factur-x.xml" in the Names array
-            names_array = embedded_files.Names
-            xml_index = None
-            
-            for i, item in enumerate(names_array):
-                if isinstance(item, str) and item == "factur-x.xml":
-                    xml_index = i
-                    break
-                if isinstance(item, Name) and str(item) == "/factur-x.xml":
-                    xml_index = i
-                    break
-            
-            if xml_index is None:
-                return None, "factur-x.xml not found in embedded files"
-            
-            # Get filespec
-            filespec = names_array[xml_index + 1]
-            
-            # Get embedded file stream
-            if "EF" not in filespec or "F" not in filespec.EF:
-                return None, "Embedded file stream not found"
-            
-            xml_stream = filespec.EF.F
-            xml_content = xml_stream.read_bytes()
-            
-            # Write to temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xml")
-            temp_file.write(xml_content)
-            temp_file.close()
-            
-            return temp_file.name, "Successfully extracted XML"
-    
+        xml_content = extract_facturx(pdf_path)
     except Exception as e:
         return None, f"Error extracting XML: {e}"
+    
+    if xml_content is None:
+        return None, "factur-x.xml not found in embedded files"
+    
+    return xml_content, "Successfully extracted XML"
 
 def check_pdfa_compliance(pdf_path):
     """Check if PDF is PDF/A-3B compliant"""
     try:
-        with Pdf.open(pdf_path) as pdf:
+        with open_pdf(pdf_path) as pdf:
             # Check metadata for PDF/A-3B compliance
-            with pdf.open_metadata() as meta:
-                # Check PDF/A part
-                part = meta.get("pdfaid:part", "")
-                conformance = meta.get("pdfaid:conformance", "")
-                
-                if part == "3" and conformance == "B":
-                    return True, "PDF is PDF/A-3B compliant"
-                else:
-                    return False, f"PDF is not PDF/A-3B compliant. Found: part={part}, conformance={conformance}"
+            meta = read_xmp_properties(pdf)
+            # Check PDF/A part
+            part = meta.get("pdfaid:part", "")
+            conformance = meta.get("pdfaid:conformance", "")
+            
+            if part == "3" and conformance == "B":
+                return True, "PDF is PDF/A-3B compliant"
+            else:
+                return False, f"PDF is not PDF/A-3B compliant. Found: part={part}, conformance={conformance}"
     
     except Exception as e:
         return False, f"Error checking PDF/A compliance: {e}"
@@ -86,28 +53,27 @@ def check_pdfa_compliance(pdf_path):
 def check_facturx_metadata(pdf_path):
     """Check if PDF has Factur-X metadata"""
     try:
-        with Pdf.open(pdf_path) as pdf:
-            with pdf.open_metadata() as meta:
-                # Check Factur-X metadata
-                conformance = meta.get("fx:conformance", "")
-                filename = meta.get("fx:documentfilename", "")
-                doctype = meta.get("fx:documenttype", "")
-                version = meta.get("fx:version", "")
-                
-                if conformance and filename == "factur-x.xml" and doctype == "INVOICE":
-                    return True, f"PDF has Factur-X metadata. Profile: {conformance}, Version: {version}"
-                else:
-                    return False, "PDF is missing required Factur-X metadata"
+        with open_pdf(pdf_path) as pdf:
+            meta = read_xmp_properties(pdf)
+            # Check Factur-X metadata
+            conformance = meta.get("fx:ConformanceLevel", "")
+            filename = meta.get("fx:DocumentFileName", "")
+            doctype = meta.get("fx:DocumentType", "")
+            version = meta.get("fx:Version", "")
+            
+            if conformance and filename == "factur-x.xml" and doctype == "INVOICE":
+                return True, f"PDF has Factur-X metadata. Profile: {conformance}, Version: {version}"
+            else:
+                return False, "PDF is missing required Factur-X metadata"
     
     except Exception as e:
         return False, f"Error checking Factur-X metadata: {e}"
 
-def validate_xml_structure(xml_path, profile="EN16931"):
+def validate_xml_structure(xml_content, profile="EN16931"):
     """Validate the XML structure based on the profile"""
     try:
         # Parse XML
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
+        root = ET.fromstring(xml_content)
         
         # Define namespaces
         ns = {
@@ -181,24 +147,20 @@ def validate_facturx_pdf(pdf_path):
     results.append(("Factur-X Metadata", metadata_valid, metadata_message))
     
     # Step 3: Extract and validate XML
-    xml_path, extract_message = extract_xml(pdf_path)
-    if xml_path:
+    xml_content, extract_message = extract_xml(pdf_path)
+    if xml_content:
         results.append(("XML Extraction", True, extract_message))
         
         # Step 4: Validate XML structure
         profile = "EN16931"  # Default to EN16931 profile
         try:
-            with Pdf.open(pdf_path) as pdf:
-                with pdf.open_metadata() as meta:
-                    profile = meta.get("fx:conformance", "EN16931")
+            with open_pdf(pdf_path) as pdf:
+                profile = declared_profile(pdf) or "EN16931"
         except:
             pass
         
-        xml_valid, xml_message = validate_xml_structure(xml_path, profile)
+        xml_valid, xml_message = validate_xml_structure(xml_content, profile)
         results.append(("XML Structure", xml_valid, xml_message))
-        
-        # Clean up temporary file
-        os.unlink(xml_path)
     else:
         results.append(("XML Extraction", False, extract_message))
     
@@ -233,12 +195,11 @@ def main():
     
     # Extract XML if requested
     if args.extract_xml:
-        xml_path, extract_message = extract_xml(pdf_file)
-        if xml_path:
+        xml_content, extract_message = extract_xml(pdf_file)
+        if xml_content:
             xml_output = args.xml_output or "factur-x_extracted.xml"
-            import shutil
-            shutil.copy(xml_path, xml_output)
-            os.unlink(xml_path)
+            with open(xml_output, 'wb') as f:
+                f.write(xml_content)
             print(f"\nExtracted XML saved to: {xml_output}")
         else:
             print(f"\nFailed to extract XML: {extract_message}")